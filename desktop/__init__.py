@@ -6,11 +6,20 @@ Contains the main desktop application components for Wellness at Work.
 __version__ = "1.0.0"
 __author__ = "Wellness at Work Team"
 
-# Import main components for easy access
-try:
-    from .main_window import MainWindow
-    from .eye_tracker import EyeTracker
-    from .auth_window import AuthWindow
-except ImportError:
-    # Components may not be implemented yet
-    pass
+# Main components are imported on first access so Qt-free tools
+# (e.g. desktop.tracking.batch) can use the package without loading PyQt
+_COMPONENTS = {
+    'MainWindow': '.main_window',
+    'EyeTracker': '.eye_tracker',
+    'MultiCameraTracker': '.multi_tracker',
+    'AuthWindow': '.auth_window',
+}
+
+
+def __getattr__(name):
+    module_name = _COMPONENTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+    return getattr(import_module(module_name, __name__), name)
@@ -3,13 +3,15 @@ Database Module for Eye Tracker Desktop Application
 Provides local SQLite storage with auto-session creation and real-time blink logging
 """
 
-from .models import LocalSession, BlinkData, PerformanceLog, SyncQueue
+from .models import LocalSession, BlinkData, PerformanceLog, FatigueLog, DetectorParams, SyncQueue
 from .sqlite_manager import SQLiteManager
 
 __all__ = [
     'LocalSession',
     'BlinkData', 
     'PerformanceLog',
+    'FatigueLog',
+    'DetectorParams',
     'SyncQueue',
     'SQLiteManager'
 ]
@@ -113,12 +113,38 @@ class BlinkData:
     blink_rate: float = 0.0
     eye_aspect_ratio: Optional[float] = None
     is_synced: bool = False
+    # Per-blink event fields (see tracking.blink_events.BlinkEvent)
+    start_ns: Optional[int] = None  # Monotonic frame timestamps of the closure
+    end_ns: Optional[int] = None
+    duration_ms: Optional[float] = None
+    closed_frames: Optional[int] = None
+    min_ear: Optional[float] = None
+    closing_velocity: Optional[float] = None  # EAR units per second
+    opening_velocity: Optional[float] = None
     
     def __post_init__(self):
         """Initialize default values"""
         if self.timestamp is None:
             self.timestamp = datetime.now()
     
+    @classmethod
+    def from_event(cls, event, session_id: int, user_id: Optional[str] = None,
+                   blink_rate: float = 0.0) -> 'BlinkData':
+        """Create a record from a tracker BlinkEvent"""
+        return cls(
+            session_id=session_id,
+            user_id=user_id,
+            blink_count=event.index,
+            blink_rate=blink_rate,
+            start_ns=event.start_ns,
+            end_ns=event.end_ns,
+            duration_ms=round(event.duration_ms, 1),
+            closed_frames=event.closed_frames,
+            min_ear=event.min_ear,
+            closing_velocity=event.closing_velocity,
+            opening_velocity=event.opening_velocity
+        )
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for database operations"""
         return {
@@ -129,7 +155,14 @@ class BlinkData:
             'blink_count': self.blink_count,
             'blink_rate': self.blink_rate,
             'eye_aspect_ratio': self.eye_aspect_ratio,
-            'is_synced': self.is_synced
+            'is_synced': self.is_synced,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'duration_ms': self.duration_ms,
+            'closed_frames': self.closed_frames,
+            'min_ear': self.min_ear,
+            'closing_velocity': self.closing_velocity,
+            'opening_velocity': self.opening_velocity
         }
     
     @classmethod
@@ -182,6 +215,86 @@ class PerformanceLog:
         
         return cls(**data)
 
+@dataclass
+class FatigueLog:
+    """Per-minute fatigue metrics model"""
+    id: Optional[int] = None
+    session_id: int = 0
+    user_id: Optional[str] = None  # Google user ID from OAuth
+    timestamp: Optional[datetime] = None
+    perclos: float = 0.0  # Percentage of frames with the eyes closed over the last 60 s
+    incomplete_blink_ratio: float = 0.0  # Share of eyelid movements that did not close the eye
+    incomplete_blinks: int = 0
+    eyelid_movements: int = 0
+    
+    def __post_init__(self):
+        """Initialize default values"""
+        if self.timestamp is None:
+            self.timestamp = datetime.now()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for database operations"""
+        return {
+            'id': self.id,
+            'session_id': self.session_id,
+            'user_id': self.user_id,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'perclos': self.perclos,
+            'incomplete_blink_ratio': self.incomplete_blink_ratio,
+            'incomplete_blinks': self.incomplete_blinks,
+            'eyelid_movements': self.eyelid_movements
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FatigueLog':
+        """Create instance from dictionary"""
+        if data.get('timestamp') and isinstance(data['timestamp'], str):
+            try:
+                data['timestamp'] = datetime.fromisoformat(data['timestamp'])
+            except (ValueError, TypeError):
+                data['timestamp'] = None
+        
+        return cls(**data)
+
+@dataclass
+class DetectorParams:
+    """Per-user blink detector parameters from threshold tuning"""
+    id: Optional[int] = None
+    user_id: Optional[str] = None  # Google user ID from OAuth
+    ear_thresh: float = 0.21  # EAR below which the eyes count as closed
+    consec_frames: int = 2  # Closed frames required to confirm a blink
+    f1: float = 0.0  # Blink event F1 on the tuning recordings
+    frames: int = 0  # Labeled frames the parameters were tuned on
+    created_at: Optional[datetime] = None
+    
+    def __post_init__(self):
+        """Initialize default values"""
+        if self.created_at is None:
+            self.created_at = datetime.now()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for database operations"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'ear_thresh': self.ear_thresh,
+            'consec_frames': self.consec_frames,
+            'f1': self.f1,
+            'frames': self.frames,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DetectorParams':
+        """Create instance from dictionary"""
+        if data.get('created_at') and isinstance(data['created_at'], str):
+            try:
+                data['created_at'] = datetime.fromisoformat(data['created_at'])
+            except (ValueError, TypeError):
+                data['created_at'] = None
+        
+        return cls(**data)
+
 @dataclass
 class SyncQueue:
     """Sync queue item for offline capability"""
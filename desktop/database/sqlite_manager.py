@@ -13,7 +13,7 @@ from pathlib import Path
 import queue
 import time
 
-from .models import LocalSession, BlinkData, PerformanceLog, SyncQueue
+from .models import LocalSession, BlinkData, PerformanceLog, FatigueLog, DetectorParams, SyncQueue
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +23,17 @@ class SQLiteManager:
     Implements connection pooling, batch operations, and automatic cleanup.
     """
     
+    # blink_data columns holding per-blink event details (added to older databases on startup)
+    BLINK_EVENT_COLUMNS = [
+        ('start_ns', 'INTEGER'),
+        ('end_ns', 'INTEGER'),
+        ('duration_ms', 'REAL'),
+        ('closed_frames', 'INTEGER'),
+        ('min_ear', 'REAL'),
+        ('closing_velocity', 'REAL'),
+        ('opening_velocity', 'REAL')
+    ]
+    
     def __init__(self, db_path: str = "eye_tracker.db", user_data: Optional[Dict[str, Any]] = None):
         """
         Initialize SQLite manager with database path and user data
@@ -120,6 +131,13 @@ class SQLiteManager:
                     blink_rate REAL NOT NULL,
                     eye_aspect_ratio REAL,
                     is_synced BOOLEAN DEFAULT FALSE,
+                    start_ns INTEGER NULL,
+                    end_ns INTEGER NULL,
+                    duration_ms REAL NULL,
+                    closed_frames INTEGER NULL,
+                    min_ear REAL NULL,
+                    closing_velocity REAL NULL,
+                    opening_velocity REAL NULL,
                     FOREIGN KEY (session_id) REFERENCES local_sessions(id) ON DELETE CASCADE
                 )
             """)
@@ -138,6 +156,34 @@ class SQLiteManager:
                 )
             """)
             
+            # Create fatigue_logs table (per-minute PERCLOS and incomplete-blink ratio)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fatigue_logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id INTEGER NOT NULL,
+                    user_id TEXT NULL,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    perclos REAL,
+                    incomplete_blink_ratio REAL,
+                    incomplete_blinks INTEGER,
+                    eyelid_movements INTEGER,
+                    FOREIGN KEY (session_id) REFERENCES local_sessions(id) ON DELETE CASCADE
+                )
+            """)
+            
+            # Create detector_params table (tuned blink detector parameters, newest row wins)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS detector_params (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NULL,
+                    ear_thresh REAL NOT NULL,
+                    consec_frames INTEGER NOT NULL,
+                    f1 REAL,
+                    frames INTEGER,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
             # Create sync_queue table with user association
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS sync_queue (
@@ -156,6 +202,8 @@ class SQLiteManager:
             conn.execute("CREATE INDEX IF NOT EXISTS idx_blink_data_session_id ON blink_data(session_id)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_blink_data_timestamp ON blink_data(timestamp)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_blink_data_synced ON blink_data(is_synced)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_fatigue_logs_session_id ON fatigue_logs(session_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_detector_params_user_id ON detector_params(user_id)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_start_time ON local_sessions(start_time)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_synced ON local_sessions(is_synced)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_sync_queue_synced ON sync_queue(synced_at)")
@@ -190,6 +238,12 @@ class SQLiteManager:
                     logger.info("Adding user_id column to blink_data table")
                     conn.execute("ALTER TABLE blink_data ADD COLUMN user_id TEXT NULL")
                 
+                # Per-blink event columns
+                for column, column_type in self.BLINK_EVENT_COLUMNS:
+                    if column not in columns:
+                        logger.info(f"Adding {column} column to blink_data table")
+                        conn.execute(f"ALTER TABLE blink_data ADD COLUMN {column} {column_type} NULL")
+                
                 # Check if user_id column exists in performance_logs
                 cursor = conn.execute("PRAGMA table_info(performance_logs)")
                 columns = [column[1] for column in cursor.fetchall()]
@@ -270,15 +324,24 @@ class SQLiteManager:
                 for blink_data in blink_data_list:
                     conn.execute("""
                         INSERT INTO blink_data 
-                        (session_id, timestamp, blink_count, blink_rate, eye_aspect_ratio, is_synced)
-                        VALUES (?, ?, ?, ?, ?, ?)
+                        (session_id, user_id, timestamp, blink_count, blink_rate, eye_aspect_ratio, is_synced,
+                         start_ns, end_ns, duration_ms, closed_frames, min_ear, closing_velocity, opening_velocity)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """, (
                         blink_data.session_id,
+                        blink_data.user_id,
                         blink_data.timestamp.isoformat(),
                         blink_data.blink_count,
                         blink_data.blink_rate,
                         blink_data.eye_aspect_ratio,
-                        blink_data.is_synced
+                        blink_data.is_synced,
+                        blink_data.start_ns,
+                        blink_data.end_ns,
+                        blink_data.duration_ms,
+                        blink_data.closed_frames,
+                        blink_data.min_ear,
+                        blink_data.closing_velocity,
+                        blink_data.opening_velocity
                     ))
                 
                 conn.commit()
@@ -339,36 +402,46 @@ class SQLiteManager:
                 logger.error(f"Error auto-creating session: {e}")
                 raise
     
-    def log_blink(self, blink_count: int, blink_rate: float, eye_aspect_ratio: Optional[float] = None):
+    def log_blink(self, event, blink_rate: float = 0.0):
         """
-        Log blink data in real-time with minimal latency.
+        Log one blink event in real-time with minimal latency.
         Uses background batch processing for efficiency.
         
         Args:
-            blink_count: Current total blink count
+            event: BlinkEvent from the tracker (timing, closed frames, minimum EAR, velocities)
+            blink_rate: Current blink rate (blinks per minute)
+        """
+        self.log_blink_events([event], blink_rate)
+    
+    def log_blink_events(self, events: List[Any], blink_rate: float = 0.0):
+        """
+        Log a batch of blink events, as emitted by EyeTracker.blink_events.
+        
+        Each event becomes one blink_data row; session totals are updated once per batch.
+        
+        Args:
+            events: BlinkEvent records in blink order
             blink_rate: Current blink rate (blinks per minute)
-            eye_aspect_ratio: Optional eye aspect ratio value
         """
         if self._current_session_id is None:
             logger.warning("No active session for blink logging")
             return
+        if not events:
+            return
         
         try:
-            blink_data = BlinkData(
-                session_id=self._current_session_id,
-                user_id=self.user_id,
-                blink_count=blink_count,
-                blink_rate=blink_rate,
-                eye_aspect_ratio=eye_aspect_ratio
-            )
-            
-            # Add to processing queue (non-blocking)
-            self.blink_queue.put(blink_data, block=False)
+            for event in events:
+                blink_data = BlinkData.from_event(event, self._current_session_id,
+                                                  self.user_id, blink_rate)
+                
+                # Add to processing queue (non-blocking)
+                self.blink_queue.put(blink_data, block=False)
             
             # Update session totals immediately
+            blink_count = events[-1].index
             self._update_session_totals(blink_count, blink_rate)
             
-            logger.debug(f"Blink logged: count={blink_count}, rate={blink_rate:.1f}")
+            logger.debug(f"Blinks logged: {len(events)} events, count={blink_count}, rate={blink_rate:.1f}")
             
         except queue.Full:
             logger.warning("Blink queue full, dropping blink data")
@@ -425,6 +498,107 @@ class SQLiteManager:
             except Exception as e:
                 logger.error(f"Error logging performance: {e}")
     
+    def log_fatigue(self, perclos: float, incomplete_blink_ratio: float,
+                    incomplete_blinks: int = 0, eyelid_movements: int = 0):
+        """Log one minute's fatigue metrics (PERCLOS and incomplete-blink ratio)"""
+        if self._current_session_id is None:
+            return
+        
+        fatigue = FatigueLog(
+            session_id=self._current_session_id,
+            user_id=self.user_id,
+            perclos=perclos,
+            incomplete_blink_ratio=incomplete_blink_ratio,
+            incomplete_blinks=incomplete_blinks,
+            eyelid_movements=eyelid_movements
+        )
+        
+        with self._lock:
+            conn = self._get_connection()
+            
+            try:
+                conn.execute("""
+                    INSERT INTO fatigue_logs 
+                    (session_id, user_id, timestamp, perclos, incomplete_blink_ratio,
+                     incomplete_blinks, eyelid_movements)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    fatigue.session_id,
+                    fatigue.user_id,
+                    fatigue.timestamp.isoformat(),
+                    fatigue.perclos,
+                    fatigue.incomplete_blink_ratio,
+                    fatigue.incomplete_blinks,
+                    fatigue.eyelid_movements
+                ))
+                
+                conn.commit()
+                
+            except Exception as e:
+                logger.error(f"Error logging fatigue metrics: {e}")
+    
+    def save_detector_params(self, ear_thresh: float, consec_frames: int,
+                             f1: float = 0.0, frames: int = 0) -> Optional[int]:
+        """
+        Store tuned blink detector parameters for the current user
+        
+        Returns:
+            Row ID, or None on failure
+        """
+        params = DetectorParams(
+            user_id=self.user_id,
+            ear_thresh=ear_thresh,
+            consec_frames=consec_frames,
+            f1=f1,
+            frames=frames
+        )
+        
+        with self._lock:
+            conn = self._get_connection()
+            
+            try:
+                cursor = conn.execute("""
+                    INSERT INTO detector_params 
+                    (user_id, ear_thresh, consec_frames, f1, frames, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (
+                    params.user_id,
+                    params.ear_thresh,
+                    params.consec_frames,
+                    params.f1,
+                    params.frames,
+                    params.created_at.isoformat()
+                ))
+                
+                conn.commit()
+                logger.info(f"Saved detector parameters: EAR threshold {ear_thresh}, "
+                            f"{consec_frames} closed frames (F1 {f1})")
+                return cursor.lastrowid
+                
+            except Exception as e:
+                logger.error(f"Error saving detector parameters: {e}")
+                return None
+    
+    def get_detector_params(self) -> Optional[DetectorParams]:
+        """Get the most recently tuned blink detector parameters for the current user"""
+        with self._lock:
+            conn = self._get_connection()
+            
+            try:
+                cursor = conn.execute("""
+                    SELECT * FROM detector_params WHERE user_id IS ?
+                    ORDER BY id DESC LIMIT 1
+                """, (self.user_id,))
+                
+                row = cursor.fetchone()
+                if row:
+                    return DetectorParams.from_dict(dict(row))
+                return None
+                
+            except Exception as e:
+                logger.error(f"Error getting detector parameters: {e}")
+                return None
+    
     def end_current_session(self) -> Optional[LocalSession]:
         """
         End the current active session
@@ -515,7 +689,9 @@ class SQLiteManager:
                         AVG(blink_rate) as avg_rate,
                         MAX(blink_rate) as max_rate,
                         MIN(timestamp) as first_blink,
-                        MAX(timestamp) as last_blink
+                        MAX(timestamp) as last_blink,
+                        AVG(duration_ms) as avg_duration_ms,
+                        MAX(duration_ms) as max_duration_ms
                     FROM blink_data 
                     WHERE session_id = ?
                 """, (session_id,))
@@ -534,10 +710,23 @@ class SQLiteManager:
                 
                 perf_stats = cursor.fetchone()
                 
+                # Get fatigue summary
+                cursor = conn.execute("""
+                    SELECT 
+                        AVG(perclos) as avg_perclos,
+                        MAX(perclos) as max_perclos,
+                        AVG(incomplete_blink_ratio) as avg_incomplete_blink_ratio
+                    FROM fatigue_logs 
+                    WHERE session_id = ?
+                """, (session_id,))
+                
+                fatigue_stats = cursor.fetchone()
+                
                 return {
                     'session': session.to_dict(),
                     'blink_stats': dict(blink_stats) if blink_stats else {},
                     'performance_stats': dict(perf_stats) if perf_stats else {},
+                    'fatigue_stats': dict(fatigue_stats) if fatigue_stats else {},
                     'duration_minutes': session.session_duration / 60 if session.session_duration else 0
                 }
                 
@@ -4,14 +4,133 @@ Transforms the original eye_blink.py into a threaded component for desktop appli
 """
 
 import cv2
-import mediapipe as mp
 import numpy as np
 import json
 import logging
-from PyQt6.QtCore import QThread, Qt, pyqtSignal, QMutex, QTimer
+import threading
+import time
+from PyQt6.QtCore import QThread, pyqtSignal, QMutex, QTimer
 from PyQt6.QtGui import QImage, QPixmap
 from PyQt6.QtWidgets import QLabel
-from typing import Optional, Tuple
+from typing import Optional, Tuple, Union
+
+from .tracking.capture import CaptureThread, FrameRingBuffer
+from .tracking.frame_source import FrameSource, open_frame_source
+from .tracking.inference_worker import SharedMemoryInference
+from .tracking.roi import FaceROITracker
+from .tracking.eye_flow import EyePointFlowTracker
+from .tracking.blink_detector import EAR_THRESH, CONSEC_FRAMES, BlinkDetector
+from .tracking.blink_rate import BlinkRateWindow
+from .tracking.blink_events import BlinkEventBuilder, BlinkEventBatch
+from .tracking.fatigue import FatigueMetrics
+from .tracking.calibration import EARCalibrator
+from .tracking.watchdog import CaptureWatchdog
+from .tracking.presence import PresenceMonitor
+from .tracking.gaze import (GazeClassifier, new_gaze_buffer, extract_gaze_points, gaze_features,
+                            DIRECTIONS, STRAIGHT, UNKNOWN)
+from .tracking.backends import LandmarkBackend, LandmarkResult, BackendBudget, create_backend
+from .tracking.profiling import PipelineProfiler
+from .tracking.warmup import VisionPrewarmer
+from .tracking.landmark_stream import LandmarkStreamWriter, read_landmark_stream
+from .tracking.landmarks import (LEFT_EYE, RIGHT_EYE, new_eye_buffer,
+                                 extract_eye_points, eye_aspect_ratios)
+
+
+class FramePacer:
+    """
+    Adaptive frame-pacing scheduler for the tracking loop.
+    
+    Sleeps only for what is left of the frame period after processing, and
+    lowers the processing rate under high CPU load or on battery power without
+    going below ``min_fps`` (the rate still needed for CONSEC_FRAMES blink
+    confirmation).
+    """
+    
+    def __init__(self, target_fps: float = 30.0, min_fps: float = 15.0,
+                 cpu_high: float = 80.0, cpu_low: float = 50.0, battery_factor: float = 0.5):
+        self.min_fps = min_fps
+        self.cpu_high = cpu_high  # Throttle down above this CPU percentage
+        self.cpu_low = cpu_low    # Recover towards target below this CPU percentage
+        self.battery_factor = battery_factor  # Rate ceiling multiplier while discharging
+        self.target_fps = target_fps
+        self.current_fps = target_fps  # Rate after load adaptation
+        self.on_battery = False
+        
+        # Achieved rate / jitter, tracked as exponential moving averages
+        self._smoothing = 0.1
+        self._frame_start: Optional[float] = None
+        self._interval_avg: Optional[float] = None
+        self._jitter = 0.0
+    
+    def set_target_fps(self, fps: float):
+        """Change the configured processing rate"""
+        self.target_fps = max(fps, 1.0)
+        self.min_fps = min(self.min_fps, self.target_fps)
+        self.current_fps = max(self.min_fps, self._rate_ceiling())
+    
+    def _rate_ceiling(self) -> float:
+        if self.on_battery:
+            return max(self.min_fps, self.target_fps * self.battery_factor)
+        return self.target_fps
+    
+    def apply_system_load(self, cpu_percent: Optional[float], on_battery: bool = False):
+        """Adapt the processing rate to the latest SystemMonitor readings"""
+        self.on_battery = on_battery
+        ceiling = self._rate_ceiling()
+        
+        if cpu_percent is not None and cpu_percent >= self.cpu_high:
+            self.current_fps *= 0.8
+        elif cpu_percent is None or cpu_percent <= self.cpu_low:
+            self.current_fps *= 1.1
+        
+        self.current_fps = max(self.min_fps, min(self.current_fps, ceiling))
+    
+    def frame_started(self):
+        """Mark the start of a frame's work (updates achieved rate and jitter)"""
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            interval = now - self._frame_start
+            if self._interval_avg is None:
+                self._interval_avg = interval
+            else:
+                deviation = abs(interval - self._interval_avg)
+                self._jitter += self._smoothing * (deviation - self._jitter)
+                self._interval_avg += self._smoothing * (interval - self._interval_avg)
+        self._frame_start = now
+    
+    def time_until_next_frame(self) -> float:
+        """Seconds left in the current frame period once the work is done"""
+        if self._frame_start is None:
+            return 0.0
+        elapsed = time.perf_counter() - self._frame_start
+        return max(0.0, 1.0 / self.current_fps - elapsed)
+    
+    def reset(self):
+        """Forget timing history (e.g. after a pause)"""
+        self._frame_start = None
+        self._interval_avg = None
+        self._jitter = 0.0
+    
+    @property
+    def achieved_fps(self) -> float:
+        if not self._interval_avg:
+            return 0.0
+        return 1.0 / self._interval_avg
+    
+    @property
+    def jitter_ms(self) -> float:
+        return self._jitter * 1000.0
+    
+    def get_stats(self) -> dict:
+        """Get pacing statistics"""
+        return {
+            'target_fps': self.target_fps,
+            'paced_fps': round(self.current_fps, 1),
+            'achieved_fps': round(self.achieved_fps, 1),
+            'jitter_ms': round(self.jitter_ms, 2),
+            'on_battery': self.on_battery
+        }
+
 
 class EyeTracker(QThread):
     """
@@ -21,45 +140,191 @@ class EyeTracker(QThread):
     
     # Signals for UI updates
     blink_detected = pyqtSignal(int, float)  # count, rate
+    blink_events = pyqtSignal(list)         # batch of BlinkEvent records
     frame_updated = pyqtSignal(QPixmap)     # camera frame
     status_changed = pyqtSignal(str)        # tracking status
     error_occurred = pyqtSignal(str)        # error messages
+    profile_updated = pyqtSignal(dict)      # per-stage latency summary
+    presence_changed = pyqtSignal(bool)     # user in front of the camera or away
     
-    def __init__(self, camera_index: int = 0):
+    # Tracking loop stages timed by the pipeline profiler
+    PROFILE_STAGES = ['capture', 'color_convert', 'inference', 'optical_flow', 'landmarks_ear',
+                      'overlay', 'preview', 'emit', 'frame_total']
+    
+    def __init__(self, camera_index: int = 0, target_fps: float = 30.0, roi_mode: bool = False,
+                 frame_source: Union[FrameSource, str, None] = None,
+                 record_path: Optional[str] = None, replay_path: Optional[str] = None,
+                 profile_dump_path: Optional[str] = None, preview_fps: float = 15.0,
+                 inference_mode: str = 'thread', absence_timeout: float = 10.0,
+                 probe_fps: float = 2.0, max_skip: int = 0, backend: str = 'facemesh',
+                 fallback_backend: Optional[str] = 'opencv', landmarker_model: Optional[str] = None,
+                 gaze_iris: bool = False, prewarmer: Optional[VisionPrewarmer] = None,
+                 ear_thresh: float = EAR_THRESH, consec_frames: int = CONSEC_FRAMES,
+                 adaptive_threshold: bool = False, auto_camera_mode: bool = False):
         super().__init__()
         self.camera_index = camera_index
+        # Probe the camera's modes and request the cheapest usable one (default: 640x480@30)
+        self.auto_camera_mode = auto_camera_mode
+        # Optional frame source (video file, image directory, synthetic); defaults to the camera
+        self.frame_source = frame_source
+        
+        # Landmark stream recording (per-frame eye landmarks/EAR) and inference-free replay
+        self.record_path = record_path
+        self.replay_path = replay_path
+        self.recorder: Optional[LandmarkStreamWriter] = None
         self.running = False
         self.paused = False
         
-        # Eye tracking parameters (from original eye_blink.py)
+        # Eye tracking parameters: defaults from original eye_blink.py (EAR threshold 0.21,
+        # 2 closed frames to confirm a blink), or the user's tuned values
         self.blink_count = 0
         self.blink_state = False
-        self.EAR_THRESH = 0.21  # Threshold for blink detection
-        self.CONSEC_FRAMES = 2  # Frames required to confirm a blink
-        self.frame_counter = 0
-        
-        # MediaPipe initialization
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.mp_drawing = mp.solutions.drawing_utils
+        self.blink_detector = BlinkDetector(ear_thresh, consec_frames)
         
         # Eye landmark indices (from original eye_blink.py)
-        self.LEFT_EYE = [33, 160, 158, 133, 153, 144]
-        self.RIGHT_EYE = [362, 385, 387, 263, 373, 380]
+        self.LEFT_EYE = LEFT_EYE
+        self.RIGHT_EYE = RIGHT_EYE
+        
+        # Preallocated (2, 6, 2) buffer reused for every frame's eye landmarks
+        self._eye_points = new_eye_buffer()
+        
+        # Reused image buffers: RGB input for MediaPipe and the downscaled BGR preview
+        self._rgb_buffer: Optional[np.ndarray] = None
+        self._preview_buffer: Optional[np.ndarray] = None
+        
+        # Preview is rendered at its own capped rate, independent of inference
+        self.preview_size = (400, 300)
+        self.preview_fps = preview_fps
+        self._last_preview = 0.0
+        
+        # ROI mode (opt-in): run FaceMesh on a padded crop around the last detected face
+        self.roi_mode = roi_mode
+        self.roi_tracker = FaceROITracker()
+        
+        # Skip-frame mode: FaceMesh every k-th frame (k <= max_skip, adapted to motion),
+        # eye landmarks propagated with optical flow in between. Opt-in (max_skip=0 disables
+        # it): blink recall with flow has not been measured on labeled recordings yet
+        self.eye_flow: Optional[EyePointFlowTracker] = None
+        if max_skip > 1:
+            self.eye_flow = EyePointFlowTracker(max_skip=max_skip, ear_guard=self.EAR_THRESH + 0.05)
+        
+        # Presence: after absence_timeout seconds without a face, drop to a low-rate,
+        # low-resolution probe until a face is seen again
+        self.presence = PresenceMonitor(absence_timeout)
+        self.probe_fps = probe_fps
+        self.probe_width = 320
+        self.face_found = False  # Whether the last processed frame had a face
+        self._probe_buffer: Optional[np.ndarray] = None
         
         # Threading control
         self.mutex = QMutex()
-        self.cap: Optional[cv2.VideoCapture] = None
-        self.face_mesh: Optional[mp.solutions.face_mesh.FaceMesh] = None
+        self.cap: Optional[FrameSource] = None
+        self._offline_frame: Optional[np.ndarray] = None
+        self.capture_thread: Optional[CaptureThread] = None
+        self._release_thread: Optional[threading.Thread] = None  # Releases a source stuck in a read
+        self.last_frame_timestamp_ns = 0  # Capture time (monotonic) or media time of the last processed frame
+        
+        # Landmark backend ('facemesh', 'landmarker' or 'opencv'); under CPU/battery
+        # pressure the tracker steps down to the cheaper fallback and back up later
+        self.backend: Optional[LandmarkBackend] = None
+        self.backend_options = {'landmarker': {'model_path': landmarker_model},
+                                'facemesh': {'refine_landmarks': gaze_iris}}
+        self.fallback_backend = fallback_backend
+        self.backend_budget = self._make_budget(backend)
+        self._requested_backend: Optional[str] = None
+        
+        # Camera and backend opened in the background before tracking starts (claimed once)
+        self.prewarmer = prewarmer
+        
+        # Inference mode: 'thread' runs FaceMesh in this QThread, 'process' in a
+        # supervised worker process fed through shared memory (keeps the GIL free)
+        self.inference_mode = inference_mode
+        self.inference: Optional[SharedMemoryInference] = None
+        self.inference_skipped = 0  # Frames dropped while the worker was unavailable
         
         # Performance tracking
-        self.session_start_time = None
+        self.session_start_ns: Optional[int] = None  # time.monotonic_ns() at session start
+        
+        # Blink timestamps (monotonic ns) for sliding-window rates over 60 s and 5 min
+        self.blink_window = BlinkRateWindow()
+        
+        # Per-blink event records, emitted in batches at most once per second
+        self.blink_builder = BlinkEventBuilder()
+        self.event_batch = BlinkEventBatch(interval=1.0)
+        
+        # Gaze direction from the same landmarks (head pose, plus iris points with gaze_iris);
+        # time spent looking anywhere but straight at the screen is accumulated
+        self.gaze = GazeClassifier()
+        self._gaze_points = new_gaze_buffer()
+        self.gaze_direction = UNKNOWN
+        self.looking_away_ns = 0
+        self._last_gaze_ns: Optional[int] = None
+        
+        # Fatigue signals over the last 60 s of frames: PERCLOS and incomplete-blink ratio
+        self.fatigue = FatigueMetrics(window=60.0, closed_ear=self.EAR_THRESH,
+                                      partial_ear=self.EAR_THRESH + 0.05)
+        
+        # Opt-in adaptive threshold from the user's open-eye baseline and closed-eye floor;
+        # ear_thresh is used until it has converged. Kept across sessions of this tracker.
+        # Off by default, so thresholds tuned against labeled recordings are not overridden
+        self.calibrator: Optional[EARCalibrator] = None
+        if adaptive_threshold:
+            self.calibrator = EARCalibrator(default_thresh=ear_thresh)
         self.fps_counter = 0
         self.fps_timer = QTimer()
         self.fps_timer.timeout.connect(self._update_fps)
         self.current_fps = 0
         
+        # Frame pacing, adapted to system load reported by SystemMonitor
+        self.pacer = FramePacer(target_fps=target_fps)
+        self.system_monitor = None
+        self.load_check_interval = 2.0  # seconds, matches SystemMonitor update interval
+        
+        # Live camera supervision: read failures, stalls and frame-time spikes reopen
+        # the capture in place with backoff instead of ending the session
+        self.watchdog = CaptureWatchdog()
+        self._last_load_check = 0.0
+        
+        # Per-stage latency instrumentation (fixed-size histograms)
+        self.profiler = PipelineProfiler(self.PROFILE_STAGES)
+        self.profile_dump_path = profile_dump_path  # Optional JSON dump written on stop
+        self.profile_interval = 1.0  # seconds between profile_updated emissions
+        self._last_profile_emit = 0.0
+        
         # Logging
         self.logger = logging.getLogger(__name__)
+        if self.eye_flow is not None:
+            self.logger.warning(f"Experimental skip-frame mode enabled (max_skip={max_skip}); "
+                                "blink recall is unvalidated")
+    
+    @property
+    def EAR_THRESH(self) -> float:
+        """Threshold for blink detection"""
+        return self.blink_detector.ear_thresh
+    
+    @EAR_THRESH.setter
+    def EAR_THRESH(self, value: float):
+        # The fatigue metrics and the skip-frame guard follow the blink threshold
+        self.blink_detector.ear_thresh = value
+        self.fatigue.closed_ear = value
+        self.fatigue.partial_ear = value + 0.05
+        if self.eye_flow is not None:
+            self.eye_flow.ear_guard = value + 0.05
+    
+    @property
+    def CONSEC_FRAMES(self) -> int:
+        """Frames required to confirm a blink"""
+        return self.blink_detector.consec_frames
+    
+    @CONSEC_FRAMES.setter
+    def CONSEC_FRAMES(self, value: int):
+        self.blink_detector.consec_frames = value
+    
+    def _calibration_stats(self) -> dict:
+        """EAR calibration estimates (threshold only when adaptation is off)"""
+        if self.calibrator is None:
+            return {'ear_threshold': self.EAR_THRESH, 'ear_calibrated': False}
+        return self.calibrator.get_stats()
     
     def start_tracking(self):
         """Start eye tracking session"""
@@ -67,9 +332,23 @@ class EyeTracker(QThread):
         try:
             if not self.running:
                 self.running = True
-                self.session_start_time = np.datetime64('now')
+                self.session_start_ns = time.monotonic_ns()
+                self.blink_window.reset(self.session_start_ns)
+                self.blink_builder.reset()
+                self.event_batch.clear()
+                self.fatigue.reset()
+                self.gaze.reset()
+                self.gaze_direction = UNKNOWN
+                self.looking_away_ns = 0
+                self._last_gaze_ns = None
                 self.blink_count = 0
-                self.frame_counter = 0
+                self.blink_detector.reset()
+                self.roi_tracker.reset()
+                if self.eye_flow:
+                    self.eye_flow.reset()
+                self.profiler.reset()
+                self.watchdog.reset()
+                self.presence.reset()
                 self.status_changed.emit("Starting camera...")
                 self.start()
                 self.fps_timer.start(1000)  # Update FPS every second
@@ -84,6 +363,9 @@ class EyeTracker(QThread):
             self.running = False
             self.paused = False
             self.fps_timer.stop()
+            if self.presence.end_absence(self._now_ns()):
+                # Listeners paused for the absence must not stay paused after tracking ends
+                self.presence_changed.emit(True)
             self.status_changed.emit("Stopped")
             self.logger.info("Eye tracking stopped")
         finally:
@@ -94,6 +376,8 @@ class EyeTracker(QThread):
         self.mutex.lock()
         try:
             self.paused = True
+            if self.capture_thread:
+                self.capture_thread.pause()
             self.status_changed.emit("Paused")
             self.logger.info("Eye tracking paused")
         finally:
@@ -104,6 +388,8 @@ class EyeTracker(QThread):
         self.mutex.lock()
         try:
             self.paused = False
+            if self.capture_thread:
+                self.capture_thread.resume()
             self.status_changed.emit("Live Tracking")
             self.logger.info("Eye tracking resumed")
         finally:
@@ -114,8 +400,13 @@ class EyeTracker(QThread):
         self.mutex.lock()
         try:
             self.blink_count = 0
-            self.frame_counter = 0
-            self.session_start_time = np.datetime64('now')
+            self.blink_detector.reset()
+            self.session_start_ns = time.monotonic_ns()
+            self.blink_window.reset(self._now_ns())
+            self.blink_builder.reset()
+            self.event_batch.clear()
+            self.fatigue.reset()
+            self.looking_away_ns = 0
             self.logger.info("Session reset")
         finally:
             self.mutex.unlock()
@@ -124,52 +415,386 @@ class EyeTracker(QThread):
         """Get current session statistics"""
         self.mutex.lock()
         try:
-            if self.session_start_time is None:
-                return {
+            if self.session_start_ns is None:
+                stats = {
                     'blink_count': 0,
                     'blink_rate': 0.0,
                     'session_duration': 0,
-                    'fps': self.current_fps
+                    'fps': self.current_fps,
+                    'dropped_frames': 0
                 }
+                stats.update(BlinkRateWindow().get_stats())
+                stats.update(FatigueMetrics().get_stats())
+                stats.update({'gaze_direction': 'Unknown', 'looking_away_seconds': 0.0})
+                stats.update(self._calibration_stats())
+                return stats
             
-            current_time = np.datetime64('now')
-            elapsed_timedelta = current_time - self.session_start_time
-            elapsed_seconds = elapsed_timedelta.astype('timedelta64[s]').astype(float)
+            # The frames' clock (see _now_ns), so offline sources report media
+            # time here just like the sliding-window rates below
+            now_ns = self._now_ns()
+            start_ns = self.blink_window.start_ns
+            elapsed_seconds = max(0.0, (now_ns - start_ns) / 1e9) if start_ns is not None else 0.0
             elapsed_minutes = elapsed_seconds / 60.0
             
+            # Cumulative rate over the whole session
             blink_rate = self.blink_count / elapsed_minutes if elapsed_minutes > 0 else 0.0
             
-            return {
+            stats = {
                 'blink_count': self.blink_count,
                 'blink_rate': round(blink_rate, 1),
                 'session_duration': int(elapsed_seconds),
-                'fps': self.current_fps
+                'fps': self.current_fps,
+                'dropped_frames': self.get_capture_stats()['frames_dropped'],
+                'achieved_fps': round(self.pacer.achieved_fps, 1),
+                'frame_jitter_ms': round(self.pacer.jitter_ms, 2),
+                'user_present': self.user_present,
+                'away_seconds': int(self.presence.away_seconds(now_ns))
             }
+            # Sliding-window counts and rates (blinks_60s, blink_rate_60s, ..._300s)
+            stats.update(self.blink_window.get_stats(now_ns))
+            # PERCLOS and incomplete-blink ratio (perclos_60s, incomplete_blink_ratio_60s, ...)
+            stats.update(self.fatigue.get_stats(now_ns))
+            stats['gaze_direction'] = self.get_gaze_direction()
+            stats['looking_away_seconds'] = round(self.looking_away_ns / 1e9, 1)
+            # Camera stalls, read failures and in-place recoveries
+            stats.update(self.watchdog.get_stats())
+            # Open-eye baseline, closed-eye floor and the threshold in use
+            stats.update(self._calibration_stats())
+            return stats
         finally:
             self.mutex.unlock()
     
-    def _initialize_camera(self) -> bool:
-        """Initialize camera and MediaPipe face mesh"""
+    def set_system_monitor(self, system_monitor):
+        """Use a SystemMonitor's CPU/battery readings to adapt the frame rate"""
+        self.system_monitor = system_monitor
+    
+    def set_target_fps(self, fps: float):
+        """Set the target processing rate (frames per second)"""
+        self.pacer.set_target_fps(fps)
+    
+    def get_pacing_stats(self) -> dict:
+        """Get target, paced and achieved processing rate plus frame jitter"""
+        return self.pacer.get_stats()
+    
+    def _update_pacing_budget(self):
+        """Feed the latest system metrics into the frame pacer"""
+        now = time.monotonic()
+        if self.system_monitor is None or now - self._last_load_check < self.load_check_interval:
+            return
+        self._last_load_check = now
+        
         try:
-            # Initialize camera with optimized settings
-            self.cap = cv2.VideoCapture(self.camera_index)
-            if not self.cap.isOpened():
-                self.error_occurred.emit("Camera not available")
-                return False
+            metrics = self.system_monitor.get_current_metrics()
+            if metrics:
+                on_battery = metrics.battery_plugged is False
+                self.pacer.apply_system_load(metrics.cpu_percent, on_battery)
+                
+                # Pacing alone can't shed more load once at its minimum rate: switch backend
+                if self.backend is not None and len(self.backend_budget.chain) > 1:
+                    rate_at_minimum = self.pacer.current_fps <= self.pacer.min_fps + 0.01
+                    wanted = self.backend_budget.update(metrics.cpu_percent, on_battery,
+                                                        metrics.battery_percent, rate_at_minimum)
+                    if wanted != self.backend.name and not self._open_backend(wanted):
+                        # Unavailable here - stop trying it
+                        self.backend_budget = BackendBudget([self.backend.name])
+        except Exception as e:
+            self.logger.error(f"Pacing budget update failed: {e}")
+    
+    def _make_budget(self, backend: str) -> BackendBudget:
+        chain = [backend]
+        if self.fallback_backend and self.fallback_backend != backend:
+            chain.append(self.fallback_backend)
+        return BackendBudget(chain)
+    
+    def _open_backend(self, name: str) -> bool:
+        """Switch to another landmark backend (tracking thread only); False keeps the current one"""
+        try:
+            options = self.backend_options.get(name, {})
+            backend = self.prewarmer.take_backend(name, options) if self.prewarmer else None
+            if backend is not None:
+                self.logger.info(f"Using pre-warmed landmark backend '{name}'")
+            else:
+                backend = create_backend(name, **options)
+                if not backend.open():
+                    self.logger.warning(f"Landmark backend '{name}' is not available")
+                    return False
+        except Exception as e:
+            self.logger.error(f"Could not open landmark backend '{name}': {e}")
+            return False
+        
+        previous, self.backend = self.backend, backend
+        if previous is not None:
+            previous.close()
+            self.logger.info(f"Landmark backend switched: {previous.name} -> {name}")
+        self._rgb_buffer = None
+        self.roi_tracker.reset()
+        if self.eye_flow:
+            self.eye_flow.reset()
+        return True
+    
+    def set_backend(self, name: str):
+        """Request a landmark backend ('facemesh', 'landmarker' or 'opencv'); applied on the next frame"""
+        self._requested_backend = name
+    
+    def get_backend_stats(self) -> dict:
+        """Get the active landmark backend and the budget policy's chain and switch count"""
+        stats = self.backend_budget.get_stats()
+        if self.inference is not None:
+            stats['active'] = 'facemesh-process'
+        else:
+            stats['active'] = self.backend.name if self.backend else None
+        return stats
+    
+    @property
+    def user_present(self) -> bool:
+        return self.presence.present
+    
+    @property
+    def absence_timeout(self) -> float:
+        return self.presence.absence_timeout
+    
+    def _now_ns(self) -> int:
+        """Current time on the frames' clock: monotonic for live capture, else the last frame's time"""
+        if self.capture_thread is not None:
+            return time.monotonic_ns()
+        return self.last_frame_timestamp_ns
+    
+    def get_presence_stats(self) -> dict:
+        """Get presence state, number of absences and total time away"""
+        stats = self.presence.get_stats(self._now_ns())
+        stats['probe_fps'] = self.probe_fps
+        return stats
+    
+    def _set_presence(self, present: bool):
+        """Switch between full-rate tracking and the low-rate presence probe"""
+        if present:
+            if self.capture_thread:
+                self.capture_thread.set_rate_limit(None)
+            self.blink_detector.reset()
+            self.logger.info("Face detected - resuming full-rate tracking")
+            self.status_changed.emit("User present")
+        else:
+            if self.capture_thread:
+                self.capture_thread.set_rate_limit(self.probe_fps)
+            self.roi_tracker.reset()
+            if self.eye_flow:
+                self.eye_flow.reset()
+            self.logger.info(f"No face for {self.absence_timeout:.0f}s - probing at {self.probe_fps:g} Hz")
+            self.status_changed.emit("User away")
+        self.pacer.reset()
+        self.presence_changed.emit(present)
+    
+    def _update_presence(self, face_found: bool, timestamp_ns: int):
+        """Advance the presence state machine with the latest frame's result"""
+        changed = self.presence.update(face_found, timestamp_ns)
+        if changed is not None:
+            self._set_presence(changed)
+    
+    def _probe_frame(self, frame: np.ndarray) -> bool:
+        """Cheap presence check: face detection on a downscaled frame, nothing else"""
+        try:
+            h, w = frame.shape[:2]
+            scale = min(1.0, self.probe_width / w)
+            size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            if self._probe_buffer is None or self._probe_buffer.shape[:2] != (size[1], size[0]):
+                self._probe_buffer = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            small = cv2.resize(frame, size, dst=self._probe_buffer, interpolation=cv2.INTER_AREA)
             
-            # Set camera properties for better performance and faster initialization
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            self.cap.set(cv2.CAP_PROP_FPS, 30)
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer size for lower latency
+            if self.inference is not None:
+                rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self.inference.input_buffer(small.shape))
+                results = self.inference.process(rgb)
+                return bool(results is not None and results.multi_face_landmarks)
             
-            # Initialize MediaPipe Face Mesh with optimized settings
-            self.face_mesh = self.mp_face_mesh.FaceMesh(
-                max_num_faces=1,
-                refine_landmarks=False,  # Disable refinement for faster processing
-                min_detection_confidence=0.3,  # Lower confidence for faster detection
-                min_tracking_confidence=0.3
+            converted = cv2.cvtColor(small, self.backend.input_color)
+            return self.backend.process(converted, self.last_frame_timestamp_ns // 1_000_000).face_found
+            
+        except Exception as e:
+            self.logger.error(f"Presence probe error: {e}")
+            return False
+    
+    def get_roi_stats(self) -> dict:
+        """Get ROI tracking counters (crop vs full-frame inferences, tracking losses)"""
+        stats = self.roi_tracker.get_stats()
+        stats['roi_mode'] = self.roi_mode
+        return stats
+    
+    def get_skip_stats(self) -> dict:
+        """Get skip-frame counters (current k, inferences vs optical-flow frames, re-anchors)"""
+        if self.eye_flow is None:
+            return {'enabled': False}
+        stats = self.eye_flow.get_stats()
+        stats['enabled'] = True
+        return stats
+    
+    def get_pipeline_profile(self) -> dict:
+        """Get per-stage latency summaries (count, mean and percentiles in ms)"""
+        return self.profiler.snapshot()
+    
+    def _emit_profile(self):
+        """Emit the pipeline profile at most once per profile_interval"""
+        now = time.monotonic()
+        if now - self._last_profile_emit >= self.profile_interval:
+            self._last_profile_emit = now
+            self.profile_updated.emit(self.profiler.snapshot())
+    
+    def get_inference_stats(self) -> dict:
+        """Get inference mode and worker supervision counters"""
+        inference = self.inference
+        stats = inference.get_stats() if inference is not None else {}
+        stats.update({'mode': 'process' if inference is not None else 'thread',
+                      'skipped_frames': self.inference_skipped})
+        return stats
+    
+    def get_capture_stats(self) -> dict:
+        """Get camera capture counters (captured, processed and dropped frames)"""
+        capture_thread = self.capture_thread
+        if capture_thread is None:
+            return {'frames_captured': 0, 'frames_processed': 0, 'frames_dropped': 0}
+        stats = capture_thread.ring.get_stats()
+        # Mode the camera driver negotiated (live cameras only)
+        stats['camera_mode'] = getattr(self.cap, 'mode', None)
+        return stats
+    
+    def _open_capture(self, ring: Optional[FrameRingBuffer] = None) -> bool:
+        """Open the frame source and, for live sources, start the capture thread"""
+        # Frame source (camera with optimized settings by default), taking over
+        # the camera the pre-warm step opened (waiting for it while still opening)
+        self.cap = None
+        if self.prewarmer is not None and self.frame_source is None:
+            self.cap = self.prewarmer.take_camera(self.camera_index)
+        if self.cap is not None:
+            self.logger.info("Using pre-warmed camera")
+        else:
+            self.cap = open_frame_source(
+                self.frame_source if self.frame_source is not None else self.camera_index,
+                auto_mode=self.auto_camera_mode
             )
+            if not self.cap.open():
+                self.cap.release()
+                self.cap = None
+                return False
+        
+        if self.cap.realtime:
+            # Decouple capture from inference: a producer thread keeps the newest frame ready
+            self.capture_thread = CaptureThread(self.cap, ring or FrameRingBuffer(slots=3))
+            if self.paused:
+                self.capture_thread.pause()
+            if not self.user_present:
+                self.capture_thread.set_rate_limit(self.probe_fps)
+            self.capture_thread.start()
+        else:
+            # Offline replay: process every frame, as fast as possible
+            self.capture_thread = None
+        return True
+    
+    def _close_capture(self) -> bool:
+        """
+        Stop the capture thread and release the frame source (the backend stays loaded).
+        
+        Returns False if the thread is still blocked in a read after the stop timeout;
+        its source is then released by a helper thread once the read returns, never under it.
+        """
+        thread, cap = self.capture_thread, self.cap
+        self.cap = None
+        if thread:
+            thread.stop()
+            if thread.is_alive():
+                self.logger.warning("Capture thread still blocked in a read - "
+                                    "releasing the camera once it returns")
+                self._release_thread = threading.Thread(target=self._release_when_stopped,
+                                                        args=(thread, cap), daemon=True,
+                                                        name="CameraRelease")
+                self._release_thread.start()
+                return False
+        if cap:
+            cap.release()
+        return True
+    
+    @staticmethod
+    def _release_when_stopped(thread: CaptureThread, cap: Optional[FrameSource]):
+        thread.join()
+        if cap:
+            cap.release()
+    
+    def _expected_frame_interval(self) -> float:
+        """Nominal seconds between captured frames (longer while probing for presence)"""
+        fps = self.probe_fps if not self.user_present else self.cap.fps if self.cap else 0.0
+        return 1.0 / fps if fps > 0 else 1.0 / 30.0
+    
+    def _recover_capture(self, reason: str) -> bool:
+        """
+        Reopen the camera in place after a read failure, stall or frame-time spikes,
+        backing off between attempts. The session, blink counts, rates and pending
+        events are kept. Returns False if tracking was stopped meanwhile.
+        """
+        self.logger.warning(f"Camera {reason.replace('_', ' ')} - reopening the capture")
+        self.status_changed.emit("Reconnecting camera...")
+        self.watchdog.recovery_started(reason, time.monotonic_ns())
+        old_thread = self.capture_thread
+        stopped = self._close_capture()
+        # Keep the ring (and its counters) only once its producer has really exited;
+        # a thread still stuck in a read gets a fresh ring for its successor
+        ring = old_thread.ring if old_thread is not None and stopped else None
+        
+        # Frames on either side of the outage are not consecutive: drop the
+        # closure in progress and the ROI/optical-flow state
+        self.blink_detector.reset()
+        self.blink_builder.reset()
+        self.roi_tracker.reset()
+        if self.eye_flow:
+            self.eye_flow.reset()
+        
+        while self.running:
+            deadline = time.monotonic() + self.watchdog.backoff_delay()
+            while self.running and time.monotonic() < deadline:
+                self.msleep(50)
+            if not self.running:
+                return False
+            if (not stopped and self.frame_source is not None
+                    and self._release_thread is not None and self._release_thread.is_alive()):
+                # The same source object would be reopened: wait until the stuck read returns
+                continue
+            
+            try:
+                opened = self._open_capture(ring)
+            except Exception as e:
+                self.logger.error(f"Camera reopen failed: {e}")
+                opened = False
+            self.watchdog.attempt_finished(opened, time.monotonic_ns())
+            if opened:
+                self.pacer.reset()
+                self.logger.info(f"Camera recovered (recoveries: {self.watchdog.recoveries})")
+                self.status_changed.emit("Live Tracking")
+                return True
+            self.status_changed.emit(
+                f"Camera unavailable - retrying in {self.watchdog.backoff_delay():.0f}s")
+        return False
+    
+    def _initialize_camera(self) -> bool:
+        """Load the landmark backend, then open the camera; nothing stays open on failure"""
+        try:
+            if self.inference_mode == 'process':
+                self.inference = SharedMemoryInference()
+                if not self.inference.start():
+                    self.logger.warning("Inference worker unavailable, running FaceMesh in-thread")
+                    self.inference.close()
+                    self.inference = None
+            
+            if self.inference is None:
+                # Landmark backend, falling back along the chain if one is unavailable
+                chain = self.backend_budget.chain
+                while not self._open_backend(self.backend_budget.current):
+                    if self.backend_budget.level >= len(chain) - 1:
+                        self.error_occurred.emit("No landmark detector available")
+                        self._cleanup_camera()
+                        return False
+                    self.backend_budget.level += 1
+            
+            # Open the camera last, so it is not held while a model loads or fails to
+            if not self._open_capture():
+                self.error_occurred.emit("Camera not available")
+                self._cleanup_camera()
+                return False
             
             self.status_changed.emit("Camera initialized")
             return True
@@ -177,77 +802,149 @@ class EyeTracker(QThread):
         except Exception as e:
             self.error_occurred.emit(f"Camera initialization failed: {str(e)}")
             self.logger.error(f"Camera initialization failed: {e}")
+            self._cleanup_camera()
             return False
     
     def _cleanup_camera(self):
-        """Clean up camera and MediaPipe resources"""
+        """Clean up camera and landmark backend resources"""
         try:
-            if self.face_mesh:
-                self.face_mesh.close()
-                self.face_mesh = None
+            self._close_capture()
             
-            if self.cap:
-                self.cap.release()
-                self.cap = None
+            if self.backend:
+                self.backend.close()
+                self.backend = None
+            
+            if self.inference:
+                self.inference.close()
+                self.inference = None
+            self._offline_frame = None
                 
         except Exception as e:
             self.logger.error(f"Camera cleanup error: {e}")
     
-    def _euclidean_dist(self, pt1: Tuple[int, int], pt2: Tuple[int, int]) -> float:
-        """Calculate Euclidean distance between two points"""
-        return np.linalg.norm(np.array(pt1) - np.array(pt2))
+    def _next_frame(self) -> Tuple[Optional[np.ndarray], int]:
+        """
+        Get the next frame to process.
+        
+        Live sources return the newest captured frame stamped with its monotonic
+        capture time; offline sources return every frame stamped with its media time.
+        """
+        if self.capture_thread is not None:
+            return self.capture_thread.ring.read_latest(timeout=0.5)
+        
+        ret, frame = self.cap.read(self._offline_frame)
+        if not ret:
+            return None, 0
+        self._offline_frame = frame
+        return frame, int(self.cap.frames_read * 1_000_000_000 / self.cap.fps)
     
-    def _eye_aspect_ratio(self, eye_landmarks: list) -> float:
-        """Compute the eye aspect ratio (EAR) - from original eye_blink.py"""
-        A = self._euclidean_dist(eye_landmarks[1], eye_landmarks[5])
-        B = self._euclidean_dist(eye_landmarks[2], eye_landmarks[4])
-        C = self._euclidean_dist(eye_landmarks[0], eye_landmarks[3])
-        ear = (A + B) / (2.0 * C)
-        return ear
+    def _update_blink_state(self, ear: float) -> bool:
+        """Advance the blink state machine by one frame; returns True when a blink completes"""
+        timestamp_ns = self.last_frame_timestamp_ns
+        if self.calibrator is not None:
+            self.calibrator.update(ear)
+            # Only move the threshold between closures, so no closure is cut in two
+            if self.calibrator.threshold != self.blink_detector.ear_thresh and not self.blink_detector.closed:
+                self.EAR_THRESH = self.calibrator.threshold
+        self.fatigue.update(ear, timestamp_ns)
+        blink_detected = self.blink_detector.update(ear, timestamp_ns)
+        if self.blink_detector.closed:
+            self.blink_builder.closed(ear, timestamp_ns)
+            return False
+        
+        if blink_detected:
+            self.blink_count += 1
+            # Frame time: monotonic capture time live, media time for offline sources and replay
+            self.blink_window.record(timestamp_ns)
+        event = self.blink_builder.opened(ear, timestamp_ns, self.blink_count if blink_detected else None)
+        if event is not None:
+            self.event_batch.add(event)
+        return blink_detected
     
-    def _process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, bool]:
-        """Process a single frame for eye tracking"""
+    def _flush_blink_events(self, force: bool = False):
+        """Emit pending blink events as one batch when due (or unconditionally on force)"""
+        if self.event_batch.due() or (force and len(self.event_batch)):
+            self.blink_events.emit(self.event_batch.take())
+    
+    def current_blink_rate(self) -> float:
+        """Blinks per minute over the last 60 seconds (of media time for offline sources)"""
+        return round(self.blink_window.rate(60, self._now_ns()), 1)
+    
+    def _process_frame(self, frame: np.ndarray, draw_overlay: bool = True) -> Tuple[np.ndarray, bool]:
+        """Process a single frame for eye tracking (overlays are drawn only when requested)"""
         try:
-            # Convert BGR to RGB for MediaPipe (optimized)
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.face_mesh.process(rgb)
+            profiler = self.profiler
+            t = profiler.start()
+            
+            # Skip-frame mode: carry the eye landmarks forward with optical flow when allowed
+            if self.eye_flow is not None and self.eye_flow.flow_due():
+                eyes = self.eye_flow.track(frame, out=self._eye_points)
+                t = profiler.lap('optical_flow', t)
+                if eyes is not None:
+                    self.face_found = True
+                    return frame, self._handle_eye_points(frame, eyes, draw_overlay, t)
+                # Flow lost the eyes - re-anchor with FaceMesh on this frame
+            
+            # Run inference on the face ROI once tracking, else on the full frame
+            if self.roi_mode:
+                source, origin = self.roi_tracker.select(frame)
+            else:
+                source, origin = frame, (0, 0)
+            
+            if self.inference is not None:
+                # Convert straight into the worker's shared memory slot
+                rgb = cv2.cvtColor(source, cv2.COLOR_BGR2RGB,
+                                   dst=self.inference.input_buffer(source.shape))
+                t = profiler.lap('color_convert', t)
+                results = self.inference.process(rgb)
+                t = profiler.lap('inference', t)
+                if results is None:
+                    # Worker down or restarting - skip the frame without touching blink state
+                    self.inference_skipped += 1
+                    self.face_found = True  # Unknown, so don't count towards absence
+                    return frame, False
+                result = LandmarkResult.from_face_mesh(results)
+            else:
+                # Convert once, into a reused buffer, to the backend's input format
+                backend = self.backend
+                shape = source.shape if backend.input_color == cv2.COLOR_BGR2RGB else source.shape[:2]
+                if self._rgb_buffer is None or self._rgb_buffer.shape != shape:
+                    self._rgb_buffer = np.empty(shape, dtype=np.uint8)
+                converted = cv2.cvtColor(source, backend.input_color, dst=self._rgb_buffer)
+                t = profiler.lap('color_convert', t)
+                result = backend.process(converted, self.last_frame_timestamp_ns // 1_000_000)
+                t = profiler.lap('inference', t)
             
             blink_detected = False
+            self.face_found = result.face_found
             
-            if results.multi_face_landmarks:
-                h, w, _ = frame.shape
+            if result.landmarks is not None:
+                h, w = source.shape[:2]
                 
-                for face_landmarks in results.multi_face_landmarks:
-                    # Get eye landmarks (optimized)
-                    left_eye = [(int(face_landmarks.landmark[i].x * w), 
-                                int(face_landmarks.landmark[i].y * h)) for i in self.LEFT_EYE]
-                    right_eye = [(int(face_landmarks.landmark[i].x * w), 
-                                 int(face_landmarks.landmark[i].y * h)) for i in self.RIGHT_EYE]
-                    
-                    # Draw eye landmarks (only if not paused for better performance)
-                    if not self.paused:
-                        for pt in left_eye + right_eye:
-                            cv2.circle(frame, pt, 2, (0, 255, 0), -1)
-                    
-                    # Calculate EAR
-                    left_ear = self._eye_aspect_ratio(left_eye)
-                    right_ear = self._eye_aspect_ratio(right_eye)
-                    ear = (left_ear + right_ear) / 2.0
-                    
-                    # Blink detection logic (from original eye_blink.py)
-                    if ear < self.EAR_THRESH:
-                        self.frame_counter += 1
-                    else:
-                        if self.frame_counter >= self.CONSEC_FRAMES:
-                            self.blink_count += 1
-                            blink_detected = True
-                        self.frame_counter = 0
-                    
-                    # Draw detection overlay (only if not paused)
-                    if not self.paused:
-                        cv2.rectangle(frame, (left_eye[0][0] - 10, left_eye[0][1] - 10),
-                                     (right_eye[3][0] + 10, right_eye[3][1] + 10),
-                                     (0, 255, 0), 2)
+                # Get eye landmarks (mapped back to frame coordinates) into the preallocated buffer
+                eyes = extract_eye_points(result.landmarks, w, h, out=self._eye_points, origin=origin)
+                
+                if self.roi_mode:
+                    self.roi_tracker.update(result.landmarks, origin, (w, h),
+                                            (frame.shape[1], frame.shape[0]))
+                if self.eye_flow is not None:
+                    self.eye_flow.anchor(frame, eyes)
+                self._update_gaze(result.landmarks, w, h, origin, eyes)
+                
+                blink_detected = self._handle_eye_points(frame, eyes, draw_overlay, t)
+            
+            elif result.ears is not None:
+                # Openness-only backend: no landmarks for ROI, optical flow or overlay
+                blink_detected = self._handle_eye_points(frame, None, draw_overlay, t, ears=result.ears)
+            
+            else:
+                if self.recorder:
+                    self.recorder.write(self.last_frame_timestamp_ns)
+                if self.roi_mode:
+                    # Tracking lost - go back to full-frame detection
+                    self.roi_tracker.lost()
+                if self.eye_flow is not None:
+                    self.eye_flow.reset()
             
             return frame, blink_detected
             
@@ -255,21 +952,80 @@ class EyeTracker(QThread):
             self.logger.error(f"Frame processing error: {e}")
             return frame, False
     
+    def _update_gaze(self, landmarks, width: int, height: int, origin: Tuple[int, int],
+                     eyes: np.ndarray):
+        """Classify the gaze direction from this frame's landmarks and count looking-away time"""
+        timestamp_ns = self.last_frame_timestamp_ns
+        if self._last_gaze_ns is not None and self.gaze_direction not in (STRAIGHT, UNKNOWN):
+            # Credit the time since the previous inference to its direction (gaps over 1 s ignored)
+            elapsed_ns = timestamp_ns - self._last_gaze_ns
+            if 0 < elapsed_ns <= 1_000_000_000:
+                self.looking_away_ns += elapsed_ns
+        self._last_gaze_ns = timestamp_ns
+        
+        points = extract_gaze_points(landmarks, width, height, out=self._gaze_points, origin=origin)
+        self.gaze_direction = self.gaze.update(gaze_features(eyes, points))
+    
+    def get_gaze_direction(self) -> str:
+        """Direction of the last classified frame ('Unknown' before the first face)"""
+        return DIRECTIONS[self.gaze_direction] if self.gaze_direction != UNKNOWN else 'Unknown'
+    
+    def _handle_eye_points(self, frame: np.ndarray, eyes: Optional[np.ndarray], draw_overlay: bool,
+                           t: int, ears: Optional[np.ndarray] = None) -> bool:
+        """EAR, recording, blink state and overlay for one frame's eye points; returns blink_detected"""
+        profiler = self.profiler
+        
+        # Calculate EAR for both eyes in one vectorized pass (unless the backend estimated it)
+        if ears is None:
+            ears = eye_aspect_ratios(eyes)
+        ear = float(ears.mean())
+        if self.eye_flow is not None:
+            self.eye_flow.note_ear(ear)
+        
+        if self.recorder:
+            self.recorder.write(self.last_frame_timestamp_ns, eyes, ears)
+        
+        blink_detected = self._update_blink_state(ear)
+        t = profiler.lap('landmarks_ear', t)
+        
+        # Draw eye landmarks and detection overlay (only for previewed frames)
+        if draw_overlay and not self.paused and eyes is not None:
+            pts = eyes.astype(np.int32)
+            for x, y in pts.reshape(-1, 2):
+                cv2.circle(frame, (int(x), int(y)), 2, (0, 255, 0), -1)
+            cv2.rectangle(frame, (int(pts[0, 0, 0]) - 10, int(pts[0, 0, 1]) - 10),
+                         (int(pts[1, 3, 0]) + 10, int(pts[1, 3, 1]) + 10),
+                         (0, 255, 0), 2)
+            profiler.lap('overlay', t)
+        
+        return blink_detected
+    
+    def _preview_due(self) -> bool:
+        """Check whether a preview frame should be rendered now (caps the preview rate)"""
+        now = time.monotonic()
+        if self.preview_fps <= 0 or now - self._last_preview < 1.0 / self.preview_fps:
+            return False
+        self._last_preview = now
+        return True
+    
     def _cv_to_qpixmap(self, cv_image: np.ndarray) -> QPixmap:
         """Convert OpenCV image to QPixmap for PyQt6 display"""
         try:
-            # Convert BGR to RGB
-            rgb_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
+            # Downscale (keeping aspect ratio) into a reused buffer with a cheap linear filter
+            h, w = cv_image.shape[:2]
+            scale = min(self.preview_size[0] / w, self.preview_size[1] / h)
+            size = (max(1, int(w * scale)), max(1, int(h * scale)))
+            if self._preview_buffer is None or self._preview_buffer.shape[:2] != (size[1], size[0]):
+                self._preview_buffer = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            preview = cv2.resize(cv_image, size, dst=self._preview_buffer,
+                                 interpolation=cv2.INTER_LINEAR)
             
-            # Convert to QImage
-            h, w, ch = rgb_image.shape
-            bytes_per_line = ch * w
-            q_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
+            # Wrap the BGR buffer without copying or color conversion
+            ph, pw = preview.shape[:2]
+            q_image = QImage(preview.data, pw, ph, preview.strides[0], QImage.Format.Format_BGR888)
             
-            # Convert to QPixmap and scale for display
-            pixmap = QPixmap.fromImage(q_image)
-            return pixmap.scaled(400, 300, Qt.AspectRatioMode.KeepAspectRatio, 
-                               Qt.TransformationMode.SmoothTransformation)
+            # QPixmap.fromImage makes the one copy the display needs
+            return QPixmap.fromImage(q_image)
             
         except Exception as e:
             self.logger.error(f"Image conversion error: {e}")
@@ -281,27 +1037,125 @@ class EyeTracker(QThread):
         self.current_fps = self.fps_counter
         self.fps_counter = 0
     
+    def start_recording(self, path: str):
+        """Record per-frame eye landmarks, EAR and timestamps to a landmark stream file"""
+        self.stop_recording()
+        try:
+            self.recorder = LandmarkStreamWriter(path)
+            self.record_path = path
+            self.logger.info(f"Recording landmark stream to {path}")
+        except Exception as e:
+            self.error_occurred.emit(f"Could not start recording: {str(e)}")
+            self.logger.error(f"Could not start recording: {e}")
+    
+    def stop_recording(self):
+        """Close the landmark stream file if recording"""
+        recorder, self.recorder = self.recorder, None
+        if recorder:
+            recorder.close()
+    
+    def _run_replay(self):
+        """Feed a recorded landmark stream straight into the blink state machine"""
+        try:
+            stream = read_landmark_stream(self.replay_path)
+        except Exception as e:
+            self.error_occurred.emit(f"Replay failed: {str(e)}")
+            self.logger.error(f"Replay failed: {e}")
+            return
+        
+        self.status_changed.emit("Replaying")
+        start_ns = stream.start_ns
+        self.blink_window.reset(start_ns)  # Rates run on the recording's clock
+        for t_ns, face, ear in zip(stream.t_ns.tolist(), stream.face_found.tolist(), stream.ear.tolist()):
+            if not self.running:
+                break
+            if not face:
+                continue
+            self.last_frame_timestamp_ns = start_ns + t_ns
+            self.fps_counter += 1
+            if self._update_blink_state(ear):
+                self.blink_detected.emit(self.blink_count, self.current_blink_rate())
+            self._flush_blink_events()
+        
+        self._flush_blink_events(force=True)
+        self.logger.info(f"Replay finished: {self.blink_count} blinks in {len(stream)} records")
+        self.status_changed.emit("End of stream")
+    
     def run(self):
         """Main tracking loop - runs in separate thread"""
+        if self.replay_path:
+            try:
+                self._run_replay()
+            finally:
+                self.status_changed.emit("Stopped")
+            return
+        
         if not self._initialize_camera():
             return
+        if self.capture_thread is None:
+            # Offline source: rates run on media time, starting at its first frame
+            self.blink_window.start_ns = None
+        
+        if self.record_path and self.recorder is None:
+            self.start_recording(self.record_path)
         
         self.status_changed.emit("Live Tracking")
         
         try:
             while self.running:
                 if self.paused:
+                    self.pacer.reset()
+                    self.watchdog.rearm()  # No frames are expected while paused
                     self.msleep(50)  # Faster response when paused
                     continue
                 
-                # Capture frame
-                ret, frame = self.cap.read()
-                if not ret:
-                    self.error_occurred.emit("Failed to capture frame")
-                    break
+                if self._requested_backend and self.inference is None:
+                    name, self._requested_backend = self._requested_backend, None
+                    if self._open_backend(name):
+                        self.backend_budget = self._make_budget(name)
+                
+                # Take the next frame (for live sources older unprocessed frames are dropped)
+                t = self.profiler.start()
+                frame, frame_timestamp_ns = self._next_frame()
+                if frame is None:
+                    if self.cap.ended:
+                        self.status_changed.emit("End of stream")
+                        break
+                    if self.capture_thread is None:
+                        self.error_occurred.emit("Failed to capture frame")
+                        break
+                    # Live camera: reopen in place on a failed read or a stall
+                    failed = self.capture_thread.failed or not self.capture_thread.is_alive()
+                    reason = self.watchdog.check(time.monotonic_ns(), failed,
+                                                 self._expected_frame_interval())
+                    if reason and not self._recover_capture(reason):
+                        break
+                    continue
+                if self.capture_thread is not None:
+                    reason = self.watchdog.frame_arrived(frame_timestamp_ns,
+                                                         self.capture_thread.ring.frames_written,
+                                                         self._expected_frame_interval())
+                    if reason:
+                        if not self._recover_capture(reason):
+                            break
+                        continue
+                self.last_frame_timestamp_ns = frame_timestamp_ns
+                if self.blink_window.start_ns is None:
+                    self.blink_window.reset(frame_timestamp_ns)
+                
+                if not self.user_present:
+                    # Nobody in front of the camera: low-rate probe, no preview or blink work
+                    if not self._probe_frame(frame):
+                        continue
+                    self._update_presence(True, frame_timestamp_ns)
+                
+                self.pacer.frame_started()
+                frame_start = self.profiler.lap('capture', t)
                 
-                # Process frame
-                processed_frame, blink_detected = self._process_frame(frame)
+                # Process frame (overlays only when a preview frame is due)
+                preview_due = self._preview_due()
+                processed_frame, blink_detected = self._process_frame(frame, draw_overlay=preview_due)
+                self._update_presence(self.face_found, frame_timestamp_ns)
                 
                 # Update FPS counter
                 self.fps_counter += 1
@@ -311,21 +1165,38 @@ class EyeTracker(QThread):
                     # Log blink to terminal
                     self.logger.info(f"BLINK DETECTED! Total blinks: {self.blink_count}")
                     
-                    # Emit blink count (rate will be calculated by main window timer)
-                    self.blink_detected.emit(self.blink_count, 0.0)
+                    # Emit blink count with the 60-second sliding-window rate
+                    self.blink_detected.emit(self.blink_count, self.current_blink_rate())
+                self._flush_blink_events()
                 
-                # Convert and emit frame
-                pixmap = self._cv_to_qpixmap(processed_frame)
-                self.frame_updated.emit(pixmap)
+                # Convert and emit frame at the capped preview rate
+                if preview_due:
+                    t = self.profiler.start()
+                    pixmap = self._cv_to_qpixmap(processed_frame)
+                    t = self.profiler.lap('preview', t)
+                    self.frame_updated.emit(pixmap)
+                    self.profiler.lap('emit', t)
+                self.profiler.lap('frame_total', frame_start)
+                self._emit_profile()
                 
-                # Optimized frame rate - reduced sleep for faster response
-                self.msleep(25)  # ~40 FPS for better responsiveness
+                # Sleep only for what is left of the paced frame period
+                self._update_pacing_budget()
+                sleep_seconds = self.pacer.time_until_next_frame() if self.cap.realtime else 0.0
+                if sleep_seconds > 0:
+                    self.usleep(int(sleep_seconds * 1_000_000))
                 
         except Exception as e:
             self.error_occurred.emit(f"Tracking error: {str(e)}")
             self.logger.error(f"Tracking error: {e}")
         
         finally:
+            self._flush_blink_events(force=True)
+            self.stop_recording()
+            if self.profile_dump_path:
+                try:
+                    self.profiler.dump(self.profile_dump_path)
+                except Exception as e:
+                    self.logger.error(f"Could not write pipeline profile: {e}")
             self._cleanup_camera()
             self.status_changed.emit("Stopped")
     
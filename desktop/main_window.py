@@ -14,8 +14,7 @@ import time
 import logging
 from datetime import datetime, timedelta
 
-# Import the real EyeTracker
-from .eye_tracker import EyeTracker
+# EyeTracker (OpenCV/MediaPipe) is imported when tracking starts, keeping app launch light
 # Import database manager
 from .database import SQLiteManager
 # Import the real SystemMonitor
@@ -71,15 +70,18 @@ class MainWindow(QMainWindow):
     
     logout_requested = pyqtSignal()
     
-    def __init__(self, user_data):
+    def __init__(self, user_data, prewarmer=None):
         super().__init__()
         self.user_data = user_data
+        self.prewarmer = prewarmer  # Optional VisionPrewarmer started during login
         self.eye_tracker = None
         self.system_monitor = None
         self.system_monitor_thread = None
         self.session_timer = QTimer()
         self.session_start_time = None
         self.is_tracking = False
+        self.last_blink_rate = 0.0  # Latest 60 s rate, stored with logged blink events
+        self.last_fatigue_minute = 0  # Session minute of the last persisted fatigue metrics
         self.tray_icon = None
         
         # Initialize database manager with user data
@@ -783,12 +785,28 @@ class MainWindow(QMainWindow):
     def start_tracking(self):
         """Start eye tracking"""
         if not self.eye_tracker:
-            self.eye_tracker = EyeTracker()
+            from .eye_tracker import EyeTracker
+            # Blink detector parameters tuned for this user, if any
+            params = self.db_manager.get_detector_params() if self.db_manager else None
+            # Without tuned parameters, calibrate the threshold online from the user's EAR
+            detector_options = {'adaptive_threshold': True}
+            if params:
+                detector_options = {'ear_thresh': params.ear_thresh, 'consec_frames': params.consec_frames}
+                self.logger.info(f"Using tuned detector parameters: {detector_options}")
+            self.eye_tracker = EyeTracker(prewarmer=self.prewarmer, **detector_options)
+            self.eye_tracker.set_system_monitor(self.system_monitor)
             self.eye_tracker.blink_detected.connect(self.update_blink_stats)
+            self.eye_tracker.blink_events.connect(self.log_blink_events)
             self.eye_tracker.frame_updated.connect(self.update_camera_frame)
             self.eye_tracker.status_changed.connect(self.update_tracking_status)
             self.eye_tracker.error_occurred.connect(self.handle_tracking_error)
+            self.eye_tracker.presence_changed.connect(self.handle_presence_change)
         
+        # The tracker starts out seeing the user; resume anything an earlier absence paused
+        if self.session_manager:
+            self.session_manager.set_user_present(True)
+        # A new tracking session counts its minutes from zero again
+        self.last_fatigue_minute = 0
         self.eye_tracker.start_tracking()
         # Don't start timer yet - wait for camera initialization
         self.is_tracking = True
@@ -873,6 +891,7 @@ class MainWindow(QMainWindow):
             self.eye_tracker.reset_session()
         
         self.session_start_time = datetime.now() if self.is_tracking else None
+        self.last_fatigue_minute = 0
         
         # Reset UI
         self.count_widget.value_label.setText("0")
@@ -884,19 +903,21 @@ class MainWindow(QMainWindow):
 
     
     def update_blink_stats(self, count, rate):
-        """Update blink statistics display and log to database"""
+        """Update blink statistics display"""
         # Update session manager with new stats
         self.session_manager.update_session_stats(count, rate)
+        self.last_blink_rate = rate
         
-        # Log blink data to database in real-time
+        # Don't update rate here - it's updated every second in update_session_time
+    
+    def log_blink_events(self, events):
+        """Persist a batch of per-blink event records"""
         if self.db_manager and self.is_tracking:
             try:
-                self.db_manager.log_blink(count, rate)
-                self.logger.debug(f"Blink logged to database: count={count}, rate={rate:.1f}")
+                self.db_manager.log_blink_events(events, self.last_blink_rate)
+                self.logger.debug(f"Logged {len(events)} blink events to database")
             except Exception as e:
                 self.logger.error(f"Error logging blink to database: {e}")
-        
-        # Don't update rate here - it's updated every second in update_session_time
     
     def update_camera_frame(self, pixmap):
         """Update camera display with new frame"""
@@ -907,11 +928,33 @@ class MainWindow(QMainWindow):
         # Update session stats from session manager
         self.update_session_stats()
         
-        # Update blink rate every second based on elapsed time
+        # Update blink rate every second (trailing 60 s window, cumulative as fallback)
         if self.eye_tracker:
             stats = self.eye_tracker.get_session_stats()
-            blink_rate = stats.get('blink_rate', 0.0)
+            blink_rate = stats.get('blink_rate_60s', stats.get('blink_rate', 0.0))
             self.rate_widget.value_label.setText(f"{blink_rate:.1f}")
+            self.log_fatigue_stats(stats)
+    
+    def log_fatigue_stats(self, stats):
+        """Persist PERCLOS and the incomplete-blink ratio once per minute of tracking"""
+        if not (self.db_manager and self.is_tracking) or stats.get('session_duration', 0) < 60:
+            return
+        # Nothing measured in the last minute (user away, no face): no row
+        if stats.get('user_present') is False or not stats.get('perclos_frames_60s'):
+            return
+        minute = stats['session_duration'] // 60
+        if minute == self.last_fatigue_minute:
+            return
+        self.last_fatigue_minute = minute
+        try:
+            self.db_manager.log_fatigue(
+                perclos=stats.get('perclos_60s', 0.0),
+                incomplete_blink_ratio=stats.get('incomplete_blink_ratio_60s', 0.0),
+                incomplete_blinks=stats.get('incomplete_blinks_60s', 0),
+                eyelid_movements=stats.get('eyelid_movements_60s', 0)
+            )
+        except Exception as e:
+            self.logger.error(f"Error logging fatigue metrics to database: {e}")
     
     @pyqtSlot(dict)
     def update_performance_stats(self, stats):
@@ -1002,6 +1045,10 @@ class MainWindow(QMainWindow):
                                          QSystemTrayIcon.MessageIcon.Information, 3000)
         elif status == "Paused":
             self.update_status("Paused", "#ffc107")
+        elif status == "User away":
+            self.update_status("Away", "#6c757d")
+        elif status == "User present":
+            self.update_status("Live", "#28a745")
         elif status == "Stopped":
             self.update_status("Inactive", "#6c757d")  # Changed to "Inactive"
         elif status == "Starting camera...":
@@ -1013,6 +1060,11 @@ class MainWindow(QMainWindow):
         else:
             self.update_status("Inactive", "#6c757d")  # Default to inactive
     
+    def handle_presence_change(self, present):
+        """Pause session time while the user is away from the camera"""
+        self.session_manager.set_user_present(present)
+        self.update_session_ui()
+    
     def handle_tracking_error(self, error_message):
         """Handle eye tracking errors"""
         self.update_status("Error", "#dc3545")
@@ -0,0 +1,489 @@
+"""
+Multi-Camera Eye Tracking
+Tracks several frame sources (kiosk / shared-desk setups) against one bounded
+pool of FaceMesh worker threads or processes instead of a tracker per camera.
+"""
+
+import cv2
+import mediapipe as mp
+import numpy as np
+import queue
+import logging
+import threading
+import time
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+from typing import Optional, Tuple, List, Union
+
+from .tracking.capture import CaptureThread, FrameRingBuffer
+from .tracking.frame_source import FrameSource, open_frame_source
+from .tracking.inference_worker import SharedMemoryInference, DEFAULT_FACE_MESH_OPTIONS
+from .tracking.backends import LandmarkResult
+from .tracking.roi import FaceROITracker
+from .tracking.blink_detector import BlinkDetector
+from .tracking.blink_rate import BlinkRateWindow
+from .tracking.presence import PresenceMonitor
+from .tracking.landmarks import new_eye_buffer, extract_eye_points, eye_aspect_ratios
+
+logger = logging.getLogger(__name__)
+
+# Pool workers serve frames from different cameras back to back, so FaceMesh must not
+# carry tracking state between calls. What tracking there is lives per stream in
+# StreamTracker (ROI crop, blink and presence state), outside the shared models.
+POOL_FACE_MESH_OPTIONS = dict(DEFAULT_FACE_MESH_OPTIONS, static_image_mode=True)
+
+
+class _ThreadBackend:
+    """FaceMesh owned by one pool worker thread"""
+
+    def __init__(self):
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(**POOL_FACE_MESH_OPTIONS)
+        self._rgb: Optional[np.ndarray] = None
+
+    def infer(self, image: np.ndarray):
+        if self._rgb is None or self._rgb.shape != image.shape:
+            self._rgb = np.empty(image.shape, dtype=np.uint8)
+        return self.face_mesh.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._rgb))
+
+    def close(self):
+        self.face_mesh.close()
+
+
+class _ProcessBackend:
+    """Shared-memory worker process owned by one pool worker thread"""
+
+    def __init__(self):
+        self.inference = SharedMemoryInference(options=POOL_FACE_MESH_OPTIONS)
+        if not self.inference.start():
+            self.inference.close()
+            raise RuntimeError("Inference worker failed to start")
+
+    def infer(self, image: np.ndarray):
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self.inference.input_buffer(image.shape))
+        return self.inference.process(rgb)
+
+    def close(self):
+        self.inference.close()
+
+
+class StreamTracker(QObject):
+    """
+    One tracked frame source: its capture, ROI, blink and presence state, and
+    signals matching EyeTracker's so UI code can connect either. Frames are
+    processed on whichever pool worker is free.
+    """
+
+    blink_detected = pyqtSignal(int, float)  # count, rate
+    frame_updated = pyqtSignal(QPixmap)     # camera frame
+    status_changed = pyqtSignal(str)        # tracking status
+    error_occurred = pyqtSignal(str)        # error messages
+    presence_changed = pyqtSignal(bool)     # user present / away
+
+    def __init__(self, stream_id: int, source: Union[FrameSource, int, str],
+                 max_fps: float = 30.0, roi_mode: bool = False, preview_fps: float = 10.0,
+                 absence_timeout: float = 10.0):
+        super().__init__()
+        self.stream_id = stream_id
+        self.source = source
+        self.max_fps = max_fps  # Dispatch cap for this stream (0 = uncapped)
+
+        # Blink detection parameters (from original eye_blink.py)
+        self.blink_count = 0
+        self.blink_detector = BlinkDetector()
+        self.blink_window = BlinkRateWindow()
+        self.presence = PresenceMonitor(absence_timeout)
+
+        self.roi_mode = roi_mode
+        self.roi_tracker = FaceROITracker()
+        self._eye_points = new_eye_buffer()
+
+        self.cap: Optional[FrameSource] = None
+        self.capture_thread: Optional[CaptureThread] = None
+        self._offline_frame: Optional[np.ndarray] = None
+        self.finished = False
+        self.last_frame_timestamp_ns = 0
+
+        # Scheduling state (one frame in flight per stream keeps the pool fair)
+        self.in_flight = False
+        self.last_dispatch = 0.0
+
+        # Preview
+        self.preview_size = (400, 300)
+        self.preview_fps = preview_fps
+        self._last_preview = 0.0
+        self._preview_buffer: Optional[np.ndarray] = None
+
+        # Rate tracking
+        self.frames_processed = 0
+        self.fps = 0.0
+        self._fps_window_start = time.monotonic()
+        self._fps_window_frames = 0
+
+    @property
+    def name(self) -> str:
+        return self.cap.name if self.cap else str(self.source)
+
+    def open(self) -> bool:
+        """Open the frame source (and its capture thread for live sources)"""
+        self.reset()
+        try:
+            self.cap = open_frame_source(self.source)
+            if not self.cap.open():
+                self.error_occurred.emit("Camera not available")
+                return False
+
+            if self.cap.realtime:
+                self.capture_thread = CaptureThread(self.cap, FrameRingBuffer(slots=3))
+                self.capture_thread.name = f"CameraCapture-{self.stream_id}"
+                self.capture_thread.start()
+
+            self.status_changed.emit("Live Tracking")
+            return True
+
+        except Exception as e:
+            self.error_occurred.emit(f"Camera initialization failed: {str(e)}")
+            logger.error(f"Stream {self.stream_id} initialization failed: {e}")
+            return False
+
+    def reset(self):
+        """Clear blink, presence and ROI state (new session)"""
+        self.blink_count = 0
+        self.blink_detector.reset()
+        self.blink_window.start_ns = None  # Restarted on the first frame's timestamp
+        self.presence.reset()
+        self.roi_tracker.reset()
+        self.frames_processed = 0
+
+    def close(self):
+        """Stop capture and release the frame source"""
+        if self.capture_thread:
+            self.capture_thread.stop()
+            self.capture_thread = None
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+        self._offline_frame = None
+
+    def dispatch_due(self, now: float) -> bool:
+        """Check whether this stream may submit another frame"""
+        if self.finished or self.in_flight:
+            return False
+        return self.max_fps <= 0 or now - self.last_dispatch >= 1.0 / self.max_fps
+
+    def next_frame(self) -> Tuple[Optional[np.ndarray], int]:
+        """
+        Take the next frame without blocking.
+
+        Live sources return the newest captured frame (the view stays valid until
+        the next call); offline sources return every frame with its media time.
+        """
+        if self.capture_thread is not None:
+            frame, timestamp_ns = self.capture_thread.ring.read_latest(timeout=0)
+            if frame is None and (self.capture_thread.failed or not self.capture_thread.is_alive()):
+                self.finished = True
+                self.error_occurred.emit("Failed to capture frame")
+            return frame, timestamp_ns
+
+        ret, frame = self.cap.read(self._offline_frame)
+        if not ret:
+            self.finished = True
+            self.status_changed.emit("End of stream" if self.cap.ended else "Stopped")
+            return None, 0
+        self._offline_frame = frame
+        return frame, int(self.cap.frames_read * 1_000_000_000 / self.cap.fps)
+
+    @property
+    def queue_depth(self) -> int:
+        """Frames waiting for or inside the inference pool"""
+        pending = self.capture_thread.ring.pending if self.capture_thread is not None else 0
+        return pending + (1 if self.in_flight else 0)
+
+    def _update_blink_state(self, ear: float, timestamp_ns: int) -> bool:
+        """Advance the blink state machine by one frame; returns True when a blink completes"""
+        blink_detected = self.blink_detector.update(ear, timestamp_ns)
+        if blink_detected:
+            self.blink_count += 1
+            self.blink_window.record(timestamp_ns)
+        return blink_detected
+
+    def _update_presence(self, face_found: bool, timestamp_ns: int):
+        changed = self.presence.update(face_found, timestamp_ns)
+        if changed is None:
+            return
+        if changed:
+            self.blink_detector.reset()
+            self.status_changed.emit("User present")
+        else:
+            self.status_changed.emit("User away")
+        self.presence_changed.emit(changed)
+
+    def process_frame(self, frame: np.ndarray, timestamp_ns: int, backend):
+        """Run one frame through inference and the blink state machine (pool worker thread)"""
+        if self.blink_window.start_ns is None:
+            self.blink_window.reset(timestamp_ns)
+
+        if self.roi_mode:
+            source, origin = self.roi_tracker.select(frame)
+        else:
+            source, origin = frame, (0, 0)
+
+        results = backend.infer(source)
+        if results is None:
+            return  # Worker process restarting - skip without touching blink state
+
+        result = LandmarkResult.from_face_mesh(results)
+        self._update_presence(result.face_found, timestamp_ns)
+        preview_due = self._preview_due()
+        if result.landmarks is not None:
+            h, w = source.shape[:2]
+            eyes = extract_eye_points(result.landmarks, w, h, out=self._eye_points, origin=origin)
+            if self.roi_mode:
+                self.roi_tracker.update(result.landmarks, origin, (w, h), (frame.shape[1], frame.shape[0]))
+
+            ear = float(eye_aspect_ratios(eyes).mean())
+            if self._update_blink_state(ear, timestamp_ns):
+                self.blink_detected.emit(self.blink_count,
+                                         round(self.blink_window.rate(60, timestamp_ns), 1))
+
+            if preview_due:
+                for x, y in eyes.astype(np.int32).reshape(-1, 2):
+                    cv2.circle(frame, (int(x), int(y)), 2, (0, 255, 0), -1)
+
+        elif self.roi_mode:
+            self.roi_tracker.lost()
+
+        if preview_due:
+            self.frame_updated.emit(self._to_qpixmap(frame))
+        self._count_frame()
+
+    def _count_frame(self):
+        self.frames_processed += 1
+        self._fps_window_frames += 1
+        now = time.monotonic()
+        elapsed = now - self._fps_window_start
+        if elapsed >= 1.0:
+            self.fps = self._fps_window_frames / elapsed
+            self._fps_window_start = now
+            self._fps_window_frames = 0
+
+    def _preview_due(self) -> bool:
+        """Check whether a preview frame should be rendered now (caps the preview rate)"""
+        if self.preview_fps <= 0 or self.receivers(self.frame_updated) == 0:
+            return False
+        now = time.monotonic()
+        if now - self._last_preview < 1.0 / self.preview_fps:
+            return False
+        self._last_preview = now
+        return True
+
+    def _to_qpixmap(self, image: np.ndarray) -> QPixmap:
+        """Downscale into a reused buffer and wrap it for display"""
+        h, w = image.shape[:2]
+        scale = min(self.preview_size[0] / w, self.preview_size[1] / h)
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        if self._preview_buffer is None or self._preview_buffer.shape[:2] != (size[1], size[0]):
+            self._preview_buffer = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        preview = cv2.resize(image, size, dst=self._preview_buffer, interpolation=cv2.INTER_LINEAR)
+        q_image = QImage(preview.data, size[0], size[1], preview.strides[0], QImage.Format.Format_BGR888)
+        return QPixmap.fromImage(q_image)
+
+    def get_stats(self) -> dict:
+        """Get per-stream rate, queue depth, capture, blink and presence counters"""
+        now_ns = self.last_frame_timestamp_ns
+        stats = {
+            'stream_id': self.stream_id,
+            'source': self.name,
+            'fps': round(self.fps, 1),
+            'queue_depth': self.queue_depth,
+            'frames_processed': self.frames_processed,
+            'blink_count': self.blink_count,
+            'finished': self.finished
+        }
+        if self.blink_window.start_ns is not None:
+            stats.update(self.blink_window.get_stats(now_ns))
+        stats.update(self.presence.get_stats(now_ns))
+        if self.capture_thread is not None:
+            stats.update(self.capture_thread.ring.get_stats())
+        return stats
+
+
+class MultiCameraTracker(QObject):
+    """
+    Tracker manager for several frame sources sharing a bounded inference pool.
+
+    A dispatcher thread visits the streams round-robin and submits at most one
+    frame per stream at a time, so a fast camera can never queue ahead of the
+    others; live cameras keep only their newest frame while waiting. Each of the
+    ``workers`` threads owns one static-image FaceMesh (inside a shared-memory
+    worker process with ``inference_mode='process'``), so the number of model
+    copies follows ``workers``, not the number of cameras. With ``roi_mode``
+    each stream's crop around its last face keeps that per-frame detection cheap.
+    """
+
+    stats_updated = pyqtSignal(dict)  # per-stream and pool statistics
+
+    def __init__(self, sources: List[Union[FrameSource, int, str]], workers: int = 2,
+                 inference_mode: str = 'thread', max_fps: float = 30.0, roi_mode: bool = False):
+        super().__init__()
+        self.streams = [StreamTracker(i, source, max_fps=max_fps, roi_mode=roi_mode)
+                        for i, source in enumerate(sources)]
+        self.workers = max(1, min(workers, len(self.streams)))
+        self.inference_mode = inference_mode
+        self.stats_interval = 1.0  # seconds between stats_updated emissions
+
+        self.running = False
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._completed = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._busy_workers = 0
+        self._failed_workers = 0
+        self._busy_lock = threading.Lock()
+        self._next_stream = 0
+
+    def stream(self, stream_id: int) -> StreamTracker:
+        """Get a stream by id (to connect its signals)"""
+        return self.streams[stream_id]
+
+    def start(self):
+        """Open all sources and start the worker pool and dispatcher"""
+        if self.running:
+            return
+        self.running = True
+        self._jobs = queue.Queue()
+        self._failed_workers = 0
+
+        for stream in self.streams:
+            stream.finished = not stream.open()
+            stream.in_flight = False
+
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, daemon=True,
+                                      name=f"FaceMeshPool-{index}")
+            thread.start()
+            self._threads.append(thread)
+
+        dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True, name="StreamDispatcher")
+        dispatcher.start()
+        self._threads.append(dispatcher)
+        logger.info(f"Multi-camera tracking started: {len(self.streams)} streams, "
+                    f"{self.workers} inference workers")
+
+    def stop(self):
+        """Stop dispatching, shut the pool down and release all sources"""
+        if not self.running:
+            return
+        self.running = False
+        for _ in range(self.workers):
+            self._jobs.put(None)
+        self._completed.set()
+
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+        self._threads = []
+
+        for stream in self.streams:
+            stream.close()
+            stream.status_changed.emit("Stopped")
+        logger.info("Multi-camera tracking stopped")
+
+    def _create_backend(self):
+        if self.inference_mode == 'process':
+            return _ProcessBackend()
+        return _ThreadBackend()
+
+    def _worker_loop(self):
+        """Pool worker: owns one model instance and serves frames from any stream"""
+        try:
+            backend = self._create_backend()
+        except Exception as e:
+            logger.error(f"Inference worker failed to start: {e}")
+            with self._busy_lock:
+                self._failed_workers += 1
+                pool_down = self._failed_workers == self.workers
+            if pool_down:
+                # No worker left to serve frames: end every stream instead of queueing forever
+                for stream in self.streams:
+                    stream.finished = True
+                    stream.in_flight = False
+                    stream.error_occurred.emit(f"Inference worker failed to start: {str(e)}")
+                self._completed.set()
+            return
+
+        try:
+            while True:
+                job = self._jobs.get()
+                if job is None:
+                    break
+
+                stream, frame, timestamp_ns = job
+                with self._busy_lock:
+                    self._busy_workers += 1
+                try:
+                    stream.process_frame(frame, timestamp_ns, backend)
+                except Exception as e:
+                    logger.error(f"Stream {stream.stream_id} frame processing error: {e}")
+                finally:
+                    with self._busy_lock:
+                        self._busy_workers -= 1
+                    stream.in_flight = False
+                    self._completed.set()
+        finally:
+            backend.close()
+
+    def _dispatch_loop(self):
+        """Round-robin frame dispatcher"""
+        last_stats = time.monotonic()
+        count = len(self.streams)
+
+        while self.running:
+            now = time.monotonic()
+            dispatched = False
+
+            for offset in range(count):
+                stream = self.streams[(self._next_stream + offset) % count]
+                if not stream.dispatch_due(now):
+                    continue
+                try:
+                    frame, timestamp_ns = stream.next_frame()
+                except Exception as e:
+                    logger.error(f"Stream {stream.stream_id} read error: {e}")
+                    stream.finished = True
+                    stream.error_occurred.emit(f"Tracking error: {str(e)}")
+                    continue
+                if frame is None:
+                    continue
+
+                stream.last_frame_timestamp_ns = timestamp_ns
+                stream.last_dispatch = now
+                stream.in_flight = True
+                self._jobs.put((stream, frame, timestamp_ns))
+                dispatched = True
+
+            # Start the next round at the following stream
+            self._next_stream = (self._next_stream + 1) % count
+
+            if now - last_stats >= self.stats_interval:
+                last_stats = now
+                self.stats_updated.emit(self.get_stats())
+
+            if all(stream.finished for stream in self.streams) and not any(
+                    stream.in_flight for stream in self.streams):
+                logger.info("All streams finished")
+                break
+
+            if not dispatched:
+                self._completed.wait(0.005)
+                self._completed.clear()
+
+    def get_stats(self) -> dict:
+        """Get per-stream FPS/queue depth and inference pool occupancy"""
+        return {
+            'streams': [stream.get_stats() for stream in self.streams],
+            'pool': {
+                'workers': self.workers,
+                'busy_workers': self._busy_workers,
+                'queued_jobs': self._jobs.qsize(),
+                'inference_mode': self.inference_mode
+            },
+            'total_blinks': sum(stream.blink_count for stream in self.streams)
+        }
@@ -40,6 +40,16 @@ class SessionInfo:
     blink_rate: float = 0.0
     duration_seconds: int = 0
     is_synced: bool = False
+    paused_seconds: float = 0.0  # Time spent paused, excluded from duration
+    paused_at: Optional[datetime] = None
+    
+    def active_seconds(self, until: Optional[datetime] = None) -> int:
+        """Session duration excluding paused time"""
+        until = until or datetime.now()
+        paused = self.paused_seconds
+        if self.paused_at is not None:
+            paused += (until - self.paused_at).total_seconds()
+        return max(0, int((until - self.start_time).total_seconds() - paused))
 
 class SessionManager:
     """
@@ -64,6 +74,10 @@ class SessionManager:
         self._cloud_session: Optional[SessionInfo] = None
         self._session_lock = threading.RLock()
         
+        # Sessions paused because the eye tracker lost the user (resumed when they return)
+        self._presence_paused: set = set()
+        self.user_present = True
+        
         # Callbacks for UI updates
         self._state_change_callbacks: list[Callable] = []
         self._session_update_callbacks: list[Callable] = []
@@ -91,6 +105,7 @@ class SessionManager:
                     start_time=datetime.now(),
                     is_synced=False
                 )
+                self._reset_presence()
                 
                 logger.info(f"Local session auto-started: {session_id}")
                 self._notify_state_change()
@@ -125,6 +140,7 @@ class SessionManager:
                     start_time=datetime.now(),
                     is_synced=True
                 )
+                self._reset_presence()
                 
                 logger.info(f"Cloud session started: {cloud_session_id}")
                 self._notify_state_change()
@@ -149,12 +165,14 @@ class SessionManager:
                 if session_type == SessionType.LOCAL:
                     if self._local_session and self._local_session.state == SessionState.ACTIVE:
                         self._local_session.state = SessionState.PAUSED
+                        self._local_session.paused_at = datetime.now()
                         logger.info("Local session paused")
                         self._notify_state_change()
                         return True
                 elif session_type == SessionType.CLOUD:
                     if self._cloud_session and self._cloud_session.state == SessionState.ACTIVE:
                         self._cloud_session.state = SessionState.PAUSED
+                        self._cloud_session.paused_at = datetime.now()
                         logger.info("Cloud session paused")
                         self._notify_state_change()
                         return True
@@ -180,12 +198,14 @@ class SessionManager:
                 if session_type == SessionType.LOCAL:
                     if self._local_session and self._local_session.state == SessionState.PAUSED:
                         self._local_session.state = SessionState.ACTIVE
+                        self._end_pause(self._local_session)
                         logger.info("Local session resumed")
                         self._notify_state_change()
                         return True
                 elif session_type == SessionType.CLOUD:
                     if self._cloud_session and self._cloud_session.state == SessionState.PAUSED:
                         self._cloud_session.state = SessionState.ACTIVE
+                        self._end_pause(self._cloud_session)
                         logger.info("Cloud session resumed")
                         self._notify_state_change()
                         return True
@@ -196,6 +216,41 @@ class SessionManager:
             logger.error(f"Error resuming {session_type.value} session: {e}")
             return False
     
+    def _end_pause(self, session: SessionInfo):
+        """Add the pause that just ended to the session's paused time"""
+        if session.paused_at is not None:
+            session.paused_seconds += (datetime.now() - session.paused_at).total_seconds()
+            session.paused_at = None
+    
+    def _reset_presence(self):
+        """Forget presence pauses: a session that starts or stops begins from 'user present'"""
+        self._presence_paused.clear()
+        self.user_present = True
+    
+    def set_user_present(self, present: bool):
+        """
+        Pause active sessions while the user is away from the camera
+        
+        Args:
+            present: False when the eye tracker stopped seeing a face, True when it returns
+        """
+        with self._session_lock:
+            if present == self.user_present:
+                return
+            self.user_present = present
+            
+            if not present:
+                for session_type in (SessionType.LOCAL, SessionType.CLOUD):
+                    if self.pause_session(session_type):
+                        self._presence_paused.add(session_type)
+                logger.info("User away - active sessions paused")
+            else:
+                # Only resume what presence paused, never a manual pause
+                for session_type in list(self._presence_paused):
+                    self.resume_session(session_type)
+                self._presence_paused.clear()
+                logger.info("User returned - sessions resumed")
+    
     def stop_session(self, session_type: SessionType) -> bool:
         """
         Stop specified session type
@@ -212,8 +267,8 @@ class SessionManager:
                     if self._local_session:
                         self._local_session.state = SessionState.ENDED
                         self._local_session.end_time = datetime.now()
-                        self._local_session.duration_seconds = int(
-                            (self._local_session.end_time - self._local_session.start_time).total_seconds()
+                        self._local_session.duration_seconds = self._local_session.active_seconds(
+                            self._local_session.end_time
                         )
                         
                         # End session in database
@@ -222,6 +277,7 @@ class SessionManager:
                             self._local_session.total_blinks = ended_session.total_blinks
                             self._local_session.blink_rate = ended_session.avg_blink_rate
                         
+                        self._reset_presence()
                         logger.info(f"Local session ended: {self._local_session.total_blinks} blinks")
                         self._notify_state_change()
                         return True
@@ -230,10 +286,11 @@ class SessionManager:
                     if self._cloud_session:
                         self._cloud_session.state = SessionState.ENDED
                         self._cloud_session.end_time = datetime.now()
-                        self._cloud_session.duration_seconds = int(
-                            (self._cloud_session.end_time - self._cloud_session.start_time).total_seconds()
+                        self._cloud_session.duration_seconds = self._cloud_session.active_seconds(
+                            self._cloud_session.end_time
                         )
                         
+                        self._reset_presence()
                         logger.info("Cloud session ended")
                         self._notify_state_change()
                         return True
@@ -323,17 +380,13 @@ class SessionManager:
                 if self._local_session and self._local_session.state == SessionState.ACTIVE:
                     self._local_session.total_blinks = blink_count
                     self._local_session.blink_rate = blink_rate
-                    self._local_session.duration_seconds = int(
-                        (datetime.now() - self._local_session.start_time).total_seconds()
-                    )
+                    self._local_session.duration_seconds = self._local_session.active_seconds()
                 
                 # Update cloud session stats
                 if self._cloud_session and self._cloud_session.state == SessionState.ACTIVE:
                     self._cloud_session.total_blinks = blink_count
                     self._cloud_session.blink_rate = blink_rate
-                    self._cloud_session.duration_seconds = int(
-                        (datetime.now() - self._cloud_session.start_time).total_seconds()
-                    )
+                    self._cloud_session.duration_seconds = self._cloud_session.active_seconds()
                 
                 # Notify UI of updates
                 self._notify_session_update()
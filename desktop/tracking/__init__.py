@@ -0,0 +1,21 @@
+"""
+Tracking Module
+Camera- and Qt-independent building blocks of the eye tracking pipeline,
+shared by the desktop EyeTracker and the standalone eye_blink.py script.
+"""
+
+from .landmarks import (LEFT_EYE, RIGHT_EYE, EYE_INDICES, new_eye_buffer,
+                        extract_eye_points, eye_aspect_ratios)
+from .blink_detector import BlinkDetector, BlinkRuns, detect
+
+__all__ = [
+    'LEFT_EYE',
+    'RIGHT_EYE',
+    'EYE_INDICES',
+    'new_eye_buffer',
+    'extract_eye_points',
+    'eye_aspect_ratios',
+    'BlinkDetector',
+    'BlinkRuns',
+    'detect'
+]
@@ -0,0 +1,279 @@
+"""
+Landmark Backends
+Interchangeable detectors for the blink pipeline: the legacy MediaPipe
+FaceMesh, the MediaPipe Tasks FaceLandmarker, and a cheap OpenCV Haar-cascade
+eye open/closed estimator for weak machines. Includes the CPU/battery budget
+policy the tracker uses to switch between them at runtime.
+"""
+
+import os
+import logging
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LandmarkResult:
+    """One frame's detection result, in FaceMesh landmark topology"""
+    landmarks: Optional[Any] = None    # Indexable .x/.y landmarks normalized to the input image
+    ears: Optional[np.ndarray] = None  # (left, right) openness for backends without landmarks
+
+    @property
+    def face_found(self) -> bool:
+        return self.landmarks is not None or self.ears is not None
+
+    @classmethod
+    def from_face_mesh(cls, results) -> 'LandmarkResult':
+        """Wrap a FaceMesh(-like) result object"""
+        if results is None or not results.multi_face_landmarks:
+            return cls()
+        return cls(landmarks=results.multi_face_landmarks[0].landmark)
+
+
+class LandmarkBackend:
+    """
+    Base class for landmark backends.
+
+    The tracker converts each frame once, with ``input_color``, into a reused
+    buffer and passes it to process(). ``relative_cost`` is the approximate
+    per-frame cost compared to FaceMesh.
+    """
+
+    name = 'base'
+    input_color = cv2.COLOR_BGR2RGB
+    relative_cost = 1.0
+
+    def open(self) -> bool:
+        """Load the model; False if this backend is unavailable here"""
+        return True
+
+    def process(self, image: np.ndarray, timestamp_ms: int) -> LandmarkResult:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class FaceMeshBackend(LandmarkBackend):
+    """Legacy mp.solutions.face_mesh.FaceMesh"""
+
+    name = 'facemesh'
+
+    def __init__(self, min_detection_confidence: float = 0.3, min_tracking_confidence: float = 0.3,
+                 refine_landmarks: bool = False):
+        self.options = {
+            'max_num_faces': 1,
+            'refine_landmarks': refine_landmarks,  # Iris points for gaze; off for faster processing
+            'min_detection_confidence': min_detection_confidence,
+            'min_tracking_confidence': min_tracking_confidence
+        }
+        self.face_mesh = None
+
+    def open(self) -> bool:
+        try:
+            import mediapipe as mp
+            self.face_mesh = mp.solutions.face_mesh.FaceMesh(**self.options)
+            return True
+        except (ImportError, AttributeError) as e:
+            logger.warning(f"FaceMesh unavailable: {e}")
+            return False
+
+    def process(self, image: np.ndarray, timestamp_ms: int) -> LandmarkResult:
+        return LandmarkResult.from_face_mesh(self.face_mesh.process(image))
+
+    def close(self):
+        if self.face_mesh:
+            self.face_mesh.close()
+            self.face_mesh = None
+
+
+class FaceLandmarkerBackend(LandmarkBackend):
+    """MediaPipe Tasks FaceLandmarker in video mode (needs a face_landmarker.task model file)"""
+
+    name = 'landmarker'
+
+    def __init__(self, model_path: Optional[str] = None):
+        self.model_path = model_path or os.environ.get('FACE_LANDMARKER_MODEL', 'face_landmarker.task')
+        self.landmarker = None
+        self._mp = None
+        self._last_timestamp_ms = -1
+
+    def open(self) -> bool:
+        if not os.path.exists(self.model_path):
+            logger.warning(f"FaceLandmarker model not found: {self.model_path}")
+            return False
+        try:
+            import mediapipe as mp
+            from mediapipe.tasks import python as mp_tasks
+            from mediapipe.tasks.python import vision
+
+            options = vision.FaceLandmarkerOptions(
+                base_options=mp_tasks.BaseOptions(model_asset_path=self.model_path),
+                running_mode=vision.RunningMode.VIDEO,
+                num_faces=1,
+                min_face_detection_confidence=0.3,
+                min_tracking_confidence=0.3
+            )
+            self.landmarker = vision.FaceLandmarker.create_from_options(options)
+            self._mp = mp
+            return True
+        except Exception as e:
+            logger.warning(f"FaceLandmarker unavailable: {e}")
+            return False
+
+    def process(self, image: np.ndarray, timestamp_ms: int) -> LandmarkResult:
+        # Video mode requires strictly increasing timestamps
+        timestamp_ms = max(timestamp_ms, self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+
+        mp_image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=image)
+        result = self.landmarker.detect_for_video(mp_image, timestamp_ms)
+        if not result.face_landmarks:
+            return LandmarkResult()
+        return LandmarkResult(landmarks=result.face_landmarks[0])
+
+    def close(self):
+        if self.landmarker:
+            self.landmarker.close()
+            self.landmarker = None
+
+
+class HaarEyeBackend(LandmarkBackend):
+    """
+    Cheap eye open/closed estimator from OpenCV Haar cascades.
+
+    The eye cascade is trained on open eyes, so a face whose upper half shows
+    no eye detections is treated as closed. The result is reported as a
+    pseudo-EAR (``open_ear`` / ``closed_ear``) so the blink state machine works
+    unchanged. It gives no landmarks and is less accurate than the mesh
+    models, but it is several times cheaper on a small grayscale frame.
+    """
+
+    name = 'opencv'
+    input_color = cv2.COLOR_BGR2GRAY
+    relative_cost = 0.2
+
+    def __init__(self, detect_width: int = 240, open_ear: float = 0.30, closed_ear: float = 0.10):
+        self.detect_width = detect_width
+        self.open_ear = open_ear
+        self.closed_ear = closed_ear
+        self.face_cascade: Optional[cv2.CascadeClassifier] = None
+        self.eye_cascade: Optional[cv2.CascadeClassifier] = None
+        self._small: Optional[np.ndarray] = None
+        self._ears = np.zeros(2, dtype=np.float32)
+
+    def open(self) -> bool:
+        cascades = getattr(cv2, 'data', None)
+        if cascades is None:
+            logger.warning("OpenCV Haar cascades are not available")
+            return False
+        face_path = os.path.join(cascades.haarcascades, 'haarcascade_frontalface_default.xml')
+        eye_path = os.path.join(cascades.haarcascades, 'haarcascade_eye.xml')
+        if not (os.path.exists(face_path) and os.path.exists(eye_path)):
+            logger.warning(f"Haar cascade files not found in {cascades.haarcascades}")
+            return False
+        self.face_cascade = cv2.CascadeClassifier(face_path)
+        self.eye_cascade = cv2.CascadeClassifier(eye_path)
+        return not (self.face_cascade.empty() or self.eye_cascade.empty())
+
+    def process(self, image: np.ndarray, timestamp_ms: int) -> LandmarkResult:
+        h, w = image.shape[:2]
+        scale = min(1.0, self.detect_width / w)
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        if self._small is None or self._small.shape != (size[1], size[0]):
+            self._small = np.empty((size[1], size[0]), dtype=np.uint8)
+        gray = cv2.resize(image, size, dst=self._small, interpolation=cv2.INTER_AREA)
+
+        faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.2, minNeighbors=4,
+                                                   minSize=(size[0] // 6, size[0] // 6))
+        if len(faces) == 0:
+            return LandmarkResult()
+
+        x, y, fw, fh = max(faces, key=lambda f: f[2] * f[3])
+        upper = gray[y:y + fh // 2, x:x + fw]
+        eyes = self.eye_cascade.detectMultiScale(upper, scaleFactor=1.1, minNeighbors=3,
+                                                 minSize=(fw // 8, fw // 8))
+
+        # Left/right by which half of the face the detection falls in
+        left_open = any(ex + ew / 2 < fw / 2 for ex, ey, ew, eh in eyes)
+        right_open = any(ex + ew / 2 >= fw / 2 for ex, ey, ew, eh in eyes)
+        self._ears[0] = self.open_ear if left_open else self.closed_ear
+        self._ears[1] = self.open_ear if right_open else self.closed_ear
+        return LandmarkResult(ears=self._ears)
+
+
+BACKENDS = {
+    FaceMeshBackend.name: FaceMeshBackend,
+    FaceLandmarkerBackend.name: FaceLandmarkerBackend,
+    HaarEyeBackend.name: HaarEyeBackend,
+}
+
+
+def create_backend(name: str, **options) -> LandmarkBackend:
+    """
+    Create a backend by name ('facemesh', 'landmarker' or 'opencv').
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        raise ValueError(f"Unknown landmark backend: {name}")
+    return backend_class(**options)
+
+
+class BackendBudget:
+    """
+    Chooses a position in a chain of backends ordered from most accurate to
+    cheapest, from SystemMonitor readings.
+
+    Steps down when the CPU stays above ``cpu_high`` although frame pacing has
+    already reached its minimum rate, or when running on a battery below
+    ``battery_low`` percent. Steps back up after the CPU has stayed below
+    ``cpu_low`` (and the battery is fine) for ``hold_checks`` readings in a row.
+    """
+
+    def __init__(self, chain: List[str], cpu_high: float = 85.0, cpu_low: float = 40.0,
+                 battery_low: int = 30, hold_checks: int = 3):
+        self.chain = chain
+        self.cpu_high = cpu_high
+        self.cpu_low = cpu_low
+        self.battery_low = battery_low
+        self.hold_checks = hold_checks
+        self.level = 0
+        self.switches = 0
+        self._high_checks = 0
+        self._low_checks = 0
+
+    @property
+    def current(self) -> str:
+        return self.chain[self.level]
+
+    def update(self, cpu_percent: Optional[float], on_battery: bool = False,
+               battery_percent: Optional[int] = None, rate_at_minimum: bool = True) -> str:
+        """Feed one reading; returns the backend name to use"""
+        battery_low = on_battery and battery_percent is not None and battery_percent < self.battery_low
+        overloaded = cpu_percent is not None and cpu_percent >= self.cpu_high and rate_at_minimum
+        relaxed = cpu_percent is not None and cpu_percent <= self.cpu_low and not battery_low
+
+        self._high_checks = self._high_checks + 1 if (overloaded or battery_low) else 0
+        self._low_checks = self._low_checks + 1 if relaxed else 0
+
+        if self._high_checks >= self.hold_checks and self.level < len(self.chain) - 1:
+            self.level += 1
+            self.switches += 1
+            self._high_checks = 0
+        elif self._low_checks >= self.hold_checks and self.level > 0:
+            self.level -= 1
+            self.switches += 1
+            self._low_checks = 0
+
+        return self.current
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'chain': list(self.chain), 'current': self.current, 'switches': self.switches}
@@ -0,0 +1,185 @@
+"""
+Offline Batch Blink Analysis
+Headless command-line tool that runs the blink detection pipeline over many
+recorded videos in parallel (one FaceMesh instance per worker process) and
+writes per-file results as NDJSON.
+
+Usage:
+    python -m desktop.tracking.batch recordings/*.mp4 -o results.ndjson --workers 4
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, List, Dict, Any
+
+import numpy as np
+
+from .landmarks import new_eye_buffer, extract_eye_points, eye_aspect_ratios
+from .blink_detector import EAR_THRESH, CONSEC_FRAMES, detect
+from .inference_worker import DEFAULT_FACE_MESH_OPTIONS
+
+logger = logging.getLogger(__name__)
+
+# FaceMesh instance owned by the current worker process
+_face_mesh = None
+
+
+def _init_worker():
+    """Create this worker's FaceMesh instance (runs once per process)"""
+    global _face_mesh
+    import mediapipe as mp
+
+    _face_mesh = mp.solutions.face_mesh.FaceMesh(**DEFAULT_FACE_MESH_OPTIONS)
+
+
+def analyze_video(path: str, ear_thresh: float = EAR_THRESH, consec_frames: int = CONSEC_FRAMES,
+                  include_trace: bool = True) -> Dict[str, Any]:
+    """
+    Run blink detection over every frame of a recording.
+
+    Args:
+        path: Video file or image directory
+        ear_thresh: EAR below which the eyes count as closed
+        consec_frames: Closed frames required to confirm a blink
+        include_trace: Include the per-frame EAR trace in the result
+
+    Returns:
+        Dict with blink count, blink timestamps (seconds of media time) and
+        the EAR trace (None for frames without a detected face)
+    """
+    import cv2
+    from .frame_source import VideoFileSource
+
+    if _face_mesh is None:
+        _init_worker()
+
+    result = {
+        'file': path,
+        'frames': 0,
+        'fps': None,
+        'face_frames': 0,
+        'blink_count': 0,
+        'blink_timestamps': [],
+        'ear_thresh': ear_thresh,
+        'consec_frames': consec_frames,
+        'processing_seconds': 0.0,
+        'error': None
+    }
+    ears: List[float] = []
+    ear_trace: List[Optional[float]] = []
+
+    source = VideoFileSource(path, realtime=False)
+    started = time.perf_counter()
+    try:
+        if not source.open():
+            result['error'] = "Could not open file"
+            return result
+
+        fps = source.fps
+        result['fps'] = fps
+        eye_points = new_eye_buffer()
+        frame = None
+
+        while True:
+            ret, frame = source.read(frame)
+            if not ret:
+                break
+
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            results = _face_mesh.process(rgb)
+
+            if not results.multi_face_landmarks:
+                ears.append(np.nan)
+                continue
+
+            h, w = frame.shape[:2]
+            eyes = extract_eye_points(results.multi_face_landmarks[0].landmark, w, h, out=eye_points)
+            ears.append(float(eye_aspect_ratios(eyes).mean()))
+            result['face_frames'] += 1
+
+        result['frames'] = source.frames_read
+
+        # Blink detection over the whole trace in one vectorized pass
+        ear = np.array(ears, dtype=np.float64)
+        blinks = detect(ear, np.arange(len(ear)) / fps, ear_thresh, consec_frames)
+        result['blink_count'] = len(blinks)
+        result['blink_timestamps'] = [round(t, 3) for t in blinks.end_t.tolist()]
+        if include_trace:
+            ear_trace = [None if value != value else round(value, 4) for value in ear.tolist()]
+
+    except Exception as e:
+        result['error'] = str(e)
+        logger.error(f"Batch analysis failed for {path}: {e}")
+
+    finally:
+        source.release()
+        result['processing_seconds'] = round(time.perf_counter() - started, 3)
+
+    if include_trace:
+        result['ear'] = ear_trace
+    return result
+
+
+def run_batch(paths: List[str], output, workers: Optional[int] = None, **options) -> int:
+    """
+    Analyze files across a process pool, writing one NDJSON line per file as
+    soon as it finishes.
+
+    Returns:
+        int: Number of files that failed
+    """
+    failures = 0
+    workers = workers or max(1, min(len(paths), (os.cpu_count() or 2) - 1))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(analyze_video, path, **options): path for path in paths}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'file': futures[future], 'error': str(e)}
+            if result.get('error'):
+                failures += 1
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Offline batch blink analysis (NDJSON output)")
+    parser.add_argument('files', nargs='+', help='video files or image directories')
+    parser.add_argument('-o', '--output', help='NDJSON output file (default: stdout)')
+    parser.add_argument('-w', '--workers', type=int, help='worker processes (default: CPUs - 1)')
+    parser.add_argument('--ear-thresh', type=float, default=EAR_THRESH)
+    parser.add_argument('--consec-frames', type=int, default=CONSEC_FRAMES)
+    parser.add_argument('--no-trace', action='store_true', help='omit per-frame EAR traces')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    options = {
+        'ear_thresh': args.ear_thresh,
+        'consec_frames': args.consec_frames,
+        'include_trace': not args.no_trace
+    }
+
+    started = time.perf_counter()
+    if args.output:
+        with open(args.output, 'w') as output:
+            failures = run_batch(args.files, output, args.workers, **options)
+    else:
+        failures = run_batch(args.files, sys.stdout, args.workers, **options)
+
+    logger.info(f"Analyzed {len(args.files)} files in {time.perf_counter() - started:.1f}s "
+                f"({failures} failed)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,424 @@
+"""
+Labeled Blink Benchmark
+Scores the blink detector against per-frame ground-truth labels (such as the
+bundled "Labels_*.json" file) and reports accuracy next to throughput, so
+every tracker optimisation can show it did not cost accuracy. With a recording,
+the gaze-direction classifier is scored against the labels' directions too.
+
+The label file maps frame indices to {"open_closed": "Open"|"Closed",
+"direction": ...}. It is paired with either the original recording (FaceMesh
+runs on every frame, optionally caching a landmark stream) or a cached
+landmark stream (no inference).
+
+Usage:
+    python -m desktop.tracking.benchmark labels.json --video recording.mp4 --cache recording.lms
+    python -m desktop.tracking.benchmark labels.json --stream recording.lms
+    python -m desktop.tracking.benchmark labels.json --video recording.mp4 --max-skip 4
+    python -m desktop.tracking.benchmark labels.json --video recording.mp4 --gaze-iris
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import numpy as np
+from typing import Optional, Tuple, Dict, Any, List
+
+from .landmarks import new_eye_buffer, extract_eye_points, eye_aspect_ratios
+from .landmark_stream import LandmarkStreamWriter, read_landmark_stream
+from .eye_flow import EyePointFlowTracker
+from .blink_detector import EAR_THRESH, CONSEC_FRAMES, BlinkDetector, detect
+from .gaze import (GazeClassifier, DIRECTIONS, STRAIGHT, UNKNOWN, new_gaze_buffer,
+                   extract_gaze_points, gaze_features, direction_names)
+
+logger = logging.getLogger(__name__)
+
+
+def load_labels(path: str) -> Dict[str, np.ndarray]:
+    """
+    Load a per-frame label file.
+
+    Returns:
+        Dict with 'closed' (bool per frame) and 'direction' (str per frame),
+        where position i holds the label of frame i
+
+    Raises:
+        ValueError: If some frame from 0 to the last labeled one has no label,
+            since scoring pairs labels with frames by position
+    """
+    with open(path, 'r') as f:
+        raw = {int(key): value for key, value in json.load(f).items()}
+
+    missing = [i for i in range(max(raw, default=-1) + 1) if i not in raw]
+    if missing:
+        raise ValueError(f"Label file has no label for {len(missing)} frames "
+                         f"(first: frame {missing[0]}): {path}")
+
+    entries = [raw[i] for i in range(len(raw))]
+    return {
+        'closed': np.array([e.get('open_closed') == 'Closed' for e in entries], dtype=bool),
+        'direction': np.array([e.get('direction', '') for e in entries], dtype=object)
+    }
+
+
+def closed_runs(mask: np.ndarray) -> np.ndarray:
+    """Return (start, end) frame index pairs (end exclusive) of every True run"""
+    padded = np.concatenate(([0], np.asarray(mask, dtype=np.int8), [0]))
+    edges = np.flatnonzero(np.diff(padded))
+    return edges.reshape(-1, 2)
+
+
+def _scores(tp: int, n_pred: int, n_true: int) -> Dict[str, float]:
+    precision = tp / n_pred if n_pred else 0.0
+    recall = tp / n_true if n_true else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': round(precision, 4), 'recall': round(recall, 4), 'f1': round(f1, 4)}
+
+
+def frame_metrics(pred_closed: np.ndarray, true_closed: np.ndarray) -> Dict[str, Any]:
+    """Precision/recall of closed-eye frames"""
+    tp = int(np.count_nonzero(pred_closed & true_closed))
+    result = _scores(tp, int(np.count_nonzero(pred_closed)), int(np.count_nonzero(true_closed)))
+    result.update({
+        'true_positives': tp,
+        'predicted_closed': int(np.count_nonzero(pred_closed)),
+        'labeled_closed': int(np.count_nonzero(true_closed))
+    })
+    return result
+
+
+def event_metrics(pred_runs: np.ndarray, true_runs: np.ndarray, tolerance: int = 2) -> Dict[str, Any]:
+    """
+    Precision/recall of blink events.
+
+    A predicted blink matches a labeled one when their closed intervals overlap
+    after widening by ``tolerance`` frames; each label matches at most once
+    (the earliest unmatched one wins).
+    """
+    # Both run lists are sorted and disjoint, so the labels a prediction can
+    # match form a window that only moves forward: one merge-style pass
+    true_runs = np.asarray(true_runs, dtype=np.int64).reshape(-1, 2)
+    true_starts, true_ends = true_runs[:, 0].tolist(), true_runs[:, 1].tolist()
+    n_true = len(true_starts)
+    tp = 0
+    lo = 0    # First label that can still overlap
+    free = 0  # First unmatched label at or after lo
+    for start, end in np.asarray(pred_runs, dtype=np.int64).reshape(-1, 2).tolist():
+        while lo < n_true and true_ends[lo] <= start - tolerance:
+            lo += 1
+        free = max(free, lo)
+        if free < n_true and true_starts[free] < end + tolerance:
+            free += 1
+            tp += 1
+
+    result = _scores(tp, len(pred_runs), len(true_runs))
+    result.update({
+        'true_positives': tp,
+        'predicted_blinks': int(len(pred_runs)),
+        'labeled_blinks': n_true
+    })
+    return result
+
+
+def gaze_metrics(pred_codes: np.ndarray, true_directions: np.ndarray) -> Dict[str, Any]:
+    """
+    Accuracy of predicted gaze directions on frames labeled with one of DIRECTIONS,
+    per-direction recall, the confusion matrix and looking-away (not Straight) scores.
+    """
+    true_codes = np.full(len(true_directions), UNKNOWN, dtype=np.int8)
+    for code, name in enumerate(DIRECTIONS):
+        true_codes[true_directions == name] = code
+    labeled = true_codes != UNKNOWN
+    pred, true = pred_codes[labeled], true_codes[labeled]
+
+    # confusion[true, predicted]; the last column counts frames without a prediction (no face)
+    n = len(DIRECTIONS)
+    confusion = np.zeros((n, n + 1), dtype=np.int64)
+    np.add.at(confusion, (true, np.where(pred == UNKNOWN, n, pred)), 1)
+
+    rows = confusion.sum(axis=1)
+    result: Dict[str, Any] = {
+        'frames_labeled': int(labeled.sum()),
+        'coverage': round(float(np.mean(pred != UNKNOWN)) if len(pred) else 0.0, 4),
+        'accuracy': round(float(np.mean(pred == true)) if len(pred) else 0.0, 4),
+        'recall': {name: round(float(confusion[k, k] / rows[k]), 4) if rows[k] else 0.0
+                   for k, name in enumerate(DIRECTIONS)},
+        'confusion': {name: dict(zip(DIRECTIONS + ('Unknown',), confusion[k].tolist()))
+                      for k, name in enumerate(DIRECTIONS)}
+    }
+
+    away_pred = (pred != STRAIGHT) & (pred != UNKNOWN)
+    away_true = true != STRAIGHT
+    tp = int(np.count_nonzero(away_pred & away_true))
+    result['looking_away'] = _scores(tp, int(np.count_nonzero(away_pred)), int(np.count_nonzero(away_true)))
+    return result
+
+
+def latency_summary(latencies_ns: np.ndarray) -> Dict[str, float]:
+    """Frames per second and per-frame latency percentiles (milliseconds)"""
+    if len(latencies_ns) == 0:
+        return {'frames': 0, 'fps': 0.0, 'p50_ms': 0.0, 'p90_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+
+    ms = np.asarray(latencies_ns, dtype=np.float64) / 1e6
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    total_s = ms.sum() / 1000.0
+    return {
+        'frames': int(len(ms)),
+        'fps': round(len(ms) / total_s, 1) if total_s > 0 else 0.0,
+        'p50_ms': round(float(p50), 3),
+        'p90_ms': round(float(p90), 3),
+        'p99_ms': round(float(p99), 3),
+        'max_ms': round(float(ms.max()), 3)
+    }
+
+
+def run_video(path: str, cache_path: Optional[str] = None, max_skip: int = 0,
+              ear_thresh: float = EAR_THRESH, skip_stats: Optional[Dict[str, Any]] = None,
+              gaze: Optional[Dict[str, Any]] = None, refine_landmarks: bool = False
+              ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Run FaceMesh over every frame of a recording.
+
+    Args:
+        path: Video file or image directory
+        cache_path: Optional landmark stream file to record for later runs
+        max_skip: Skip-frame mode like the live tracker (FaceMesh every k-th frame,
+            optical flow in between); 0 runs FaceMesh on every frame
+        ear_thresh: Detector threshold (sets the skip-frame EAR guard)
+        skip_stats: Optional dict that receives the skip-frame counters
+        gaze: Optional dict that receives the per-frame gaze offsets ('features',
+            (N, 2), NaN where no face was found), computed in one vectorized pass
+        refine_landmarks: Run FaceMesh with iris landmarks (used by the gaze offsets)
+
+    Returns:
+        (per-frame EAR with NaN where no face was found, per-frame latency in ns)
+    """
+    import cv2
+    import mediapipe as mp
+    from .frame_source import VideoFileSource
+
+    source = VideoFileSource(path, realtime=False)
+    if not source.open():
+        raise ValueError(f"Could not open recording: {path}")
+
+    recorder = LandmarkStreamWriter(cache_path) if cache_path else None
+    ears: List[float] = []
+    latencies: List[int] = []
+    eye_points = new_eye_buffer()
+    frame = None
+    flow = EyePointFlowTracker(max_skip=max_skip, ear_guard=ear_thresh + 0.05) if max_skip > 1 else None
+    # Gaze inputs per frame; flow frames reuse the head points of the last inference
+    gaze_eyes: List[np.ndarray] = []
+    gaze_points: List[np.ndarray] = []
+    head_points = new_gaze_buffer()
+
+    try:
+        with mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=refine_landmarks,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        ) as face_mesh:
+            while True:
+                ret, frame = source.read(frame)
+                if not ret:
+                    break
+
+                started = time.perf_counter_ns()
+                eyes = flow.track(frame, out=eye_points) if flow is not None and flow.flow_due() else None
+                if eyes is None:
+                    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    results = face_mesh.process(rgb)
+                    if results.multi_face_landmarks:
+                        h, w = frame.shape[:2]
+                        eyes = extract_eye_points(results.multi_face_landmarks[0].landmark, w, h,
+                                                  out=eye_points)
+                        if gaze is not None:
+                            extract_gaze_points(results.multi_face_landmarks[0].landmark, w, h,
+                                                out=head_points)
+                        if flow is not None:
+                            flow.anchor(frame, eyes)
+                    elif flow is not None:
+                        flow.reset()
+
+                if eyes is not None:
+                    frame_ears = eye_aspect_ratios(eyes)
+                    ears.append(float(frame_ears.mean()))
+                    if flow is not None:
+                        flow.note_ear(ears[-1])
+                else:
+                    frame_ears = None
+                    ears.append(np.nan)
+                latencies.append(time.perf_counter_ns() - started)
+                if gaze is not None:
+                    if eyes is not None:
+                        gaze_eyes.append(eyes.copy())
+                        gaze_points.append(head_points.copy())
+                    else:
+                        gaze_eyes.append(np.full((2, 6, 2), np.nan, dtype=np.float32))
+                        gaze_points.append(new_gaze_buffer())
+
+                if recorder:
+                    media_ns = int((source.frames_read - 1) * 1e9 / source.fps)
+                    recorder.write(media_ns, eyes, frame_ears)
+    finally:
+        source.release()
+        if recorder:
+            recorder.close()
+
+    if flow is not None and skip_stats is not None:
+        skip_stats.update(flow.get_stats())
+    if gaze is not None:
+        gaze['features'] = (gaze_features(np.stack(gaze_eyes), np.stack(gaze_points)) if gaze_eyes
+                            else np.empty((0, 2), dtype=np.float32))
+    return np.array(ears, dtype=np.float32), np.array(latencies, dtype=np.int64)
+
+
+def run_detector(ear: np.ndarray, ear_thresh: float = EAR_THRESH,
+                 consec_frames: int = CONSEC_FRAMES) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Step the streaming blink state machine over an EAR trace.
+
+    Frames with NaN EAR (no face) are skipped, like the live tracker does.
+
+    Returns:
+        (confirmed blink intervals as (start, end) pairs, per-frame latency in ns)
+    """
+    blinks: List[Tuple[int, int]] = []
+    latencies = np.empty(len(ear), dtype=np.int64)
+    detector = BlinkDetector(ear_thresh, consec_frames)
+
+    for i, value in enumerate(ear.tolist()):
+        started = time.perf_counter_ns()
+        if detector.update(value, i):
+            blinks.append((detector.last_blink[0], i))
+        latencies[i] = time.perf_counter_ns() - started
+
+    return np.array(blinks, dtype=np.int64).reshape(-1, 2), latencies
+
+
+def benchmark(labels_path: str, video: Optional[str] = None, stream: Optional[str] = None,
+              cache_path: Optional[str] = None, ear_thresh: float = EAR_THRESH,
+              consec_frames: int = CONSEC_FRAMES, tolerance: int = 2,
+              max_skip: int = 0, gaze_iris: bool = False, gaze_mirror: bool = False) -> Dict[str, Any]:
+    """
+    Score the blink detector against a label file.
+
+    Exactly one of ``video`` (runs FaceMesh) or ``stream`` (cached landmark
+    stream, no inference) must be given. ``max_skip`` enables skip-frame mode
+    and needs ``video``, since optical flow runs on the frames themselves.
+    Gaze direction is scored only with ``video``: landmark streams hold just the
+    eye points. Its center is learned from the first frames, as in the tracker.
+    """
+    if (video is None) == (stream is None):
+        raise ValueError("Pass exactly one of video or stream")
+    if max_skip > 1 and video is None:
+        raise ValueError("Skip-frame mode needs the video")
+
+    labels = load_labels(labels_path)
+    report: Dict[str, Any] = {
+        'labels': labels_path,
+        'source': video or stream,
+        'ear_thresh': ear_thresh,
+        'consec_frames': consec_frames
+    }
+
+    if video is not None:
+        skip_stats: Dict[str, Any] = {}
+        gaze: Dict[str, Any] = {}
+        ear, pipeline_latency = run_video(video, cache_path, max_skip, ear_thresh, skip_stats,
+                                          gaze, refine_landmarks=gaze_iris)
+        report['pipeline'] = latency_summary(pipeline_latency)
+        if skip_stats:
+            report['skip_frames'] = skip_stats
+    else:
+        landmark_stream = read_landmark_stream(stream)
+        ear = np.where(landmark_stream.face_found, landmark_stream.ear, np.nan).astype(np.float32)
+
+    n = min(len(ear), len(labels['closed']))
+    if len(ear) != len(labels['closed']):
+        logger.warning(f"Frame count mismatch: {len(ear)} frames vs {len(labels['closed'])} labels, "
+                       f"scoring the first {n}")
+    ear = ear[:n]
+    true_closed = labels['closed'][:n]
+
+    pred_runs, detector_latency = run_detector(ear, ear_thresh, consec_frames)
+
+    # The vectorized detector must find exactly the streaming detector's blinks
+    started = time.perf_counter_ns()
+    vector_runs = detect(ear, ear_thresh=ear_thresh, consec_frames=consec_frames)
+    vector_ms = (time.perf_counter_ns() - started) / 1e6
+    matches = bool(np.array_equal(vector_runs.intervals, pred_runs))
+    if not matches:
+        logger.error("Vectorized blink detection disagrees with the streaming detector")
+    with np.errstate(invalid='ignore'):
+        pred_closed = ear < ear_thresh  # NaN compares False
+
+    report.update({
+        'frames_scored': int(n),
+        'face_found_ratio': round(float(np.mean(~np.isnan(ear))) if n else 0.0, 4),
+        'closed_frames': frame_metrics(pred_closed, true_closed),
+        'blink_events': event_metrics(pred_runs, closed_runs(true_closed), tolerance),
+        'detector': latency_summary(detector_latency),
+        'detector_vectorized': {'total_ms': round(vector_ms, 3), 'matches_streaming': matches}
+    })
+
+    if video is not None:
+        features = gaze['features'][:n]
+        classifier = GazeClassifier(mirror=gaze_mirror)
+        valid = features[~np.isnan(features).any(axis=1)]
+        classifier.fit_center(valid[:classifier.calibration_frames])
+
+        started = time.perf_counter_ns()
+        codes = classifier.classify(features)
+        elapsed_ns = time.perf_counter_ns() - started
+
+        report['gaze'] = gaze_metrics(codes, labels['direction'][:n])
+        report['gaze'].update({
+            'iris': gaze_iris,
+            'center': [round(float(c), 4) for c in classifier.center],
+            'predicted': {str(name): int(count) for name, count in
+                          zip(*np.unique(direction_names(codes).astype(str), return_counts=True))},
+            'classify_us_per_frame': round(elapsed_ns / 1000 / n, 3) if n else 0.0
+        })
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Blink detector benchmark against labeled frames")
+    parser.add_argument('labels', help='per-frame label JSON file')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--video', help='recording matching the labels (runs FaceMesh)')
+    group.add_argument('--stream', help='cached landmark stream matching the labels')
+    parser.add_argument('--cache', help='write a landmark stream while running --video')
+    parser.add_argument('--ear-thresh', type=float, default=EAR_THRESH)
+    parser.add_argument('--consec-frames', type=int, default=CONSEC_FRAMES)
+    parser.add_argument('--tolerance', type=int, default=2, help='event matching tolerance (frames)')
+    parser.add_argument('--max-skip', type=int, default=0,
+                        help='experimental skip-frame mode: FaceMesh at most every k-th frame '
+                             '(needs --video); use it to measure its blink recall')
+    parser.add_argument('--gaze-iris', action='store_true',
+                        help='run FaceMesh with iris landmarks for the gaze classifier (needs --video)')
+    parser.add_argument('--gaze-mirror', action='store_true',
+                        help='swap Left/Right (labels made on a mirrored preview)')
+    parser.add_argument('-o', '--output', help='write the JSON report to a file')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    report = benchmark(args.labels, video=args.video, stream=args.stream, cache_path=args.cache,
+                       ear_thresh=args.ear_thresh, consec_frames=args.consec_frames,
+                       tolerance=args.tolerance, max_skip=args.max_skip,
+                       gaze_iris=args.gaze_iris, gaze_mirror=args.gaze_mirror)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Blink Detector
+The threshold / consecutive-frame blink state machine (from the original
+eye_blink.py) with two entry points that give identical results: streaming
+update() for live frames and vectorized detect() for whole EAR traces.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Detector defaults (from original eye_blink.py)
+EAR_THRESH = 0.21  # EAR below which the eyes count as closed
+CONSEC_FRAMES = 2  # Closed frames required to confirm a blink
+
+
+@dataclass
+class BlinkRuns:
+    """
+    Blinks found in a trace.
+
+    ``start`` is the first closed frame and ``end`` the frame the eyes
+    reopened on (the frame a streaming detector reports the blink), both as
+    indices into the trace; ``start_t``/``end_t`` are their timestamps.
+    """
+    start: np.ndarray
+    end: np.ndarray
+    start_t: np.ndarray
+    end_t: np.ndarray
+    closed_frames: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @property
+    def intervals(self) -> np.ndarray:
+        """(start, end) index pairs, end exclusive"""
+        return np.stack((self.start, self.end), axis=-1)
+
+
+def _check_consec_frames(consec_frames: int):
+    if consec_frames < 1:
+        raise ValueError("consec_frames must be at least 1")
+
+
+def detect(ear: np.ndarray, t: Optional[np.ndarray] = None, ear_thresh: float = EAR_THRESH,
+           consec_frames: int = CONSEC_FRAMES) -> BlinkRuns:
+    """
+    Find every blink in an EAR trace with run-length operations.
+
+    Frames with NaN EAR (no face) are skipped without breaking a closure, and
+    a closure still running at the end of the trace is not counted - exactly
+    what feeding the frames to BlinkDetector.update() one by one reports.
+
+    Args:
+        ear: Per-frame EAR
+        t: Per-frame timestamps (default: frame indices)
+        ear_thresh: EAR below which the eyes count as closed
+        consec_frames: Closed frames required to confirm a blink
+    """
+    _check_consec_frames(consec_frames)
+    # float64 so the comparison matches the streaming path's Python floats
+    ear = np.asarray(ear, dtype=np.float64)
+    frames = np.flatnonzero(~np.isnan(ear))
+    closed = ear[frames] < ear_thresh
+
+    # Run boundaries of closed frames over the face frames only
+    padded = np.concatenate(([False], closed, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    starts, ends = edges[0::2], edges[1::2]
+    keep = (ends - starts >= consec_frames) & (ends < len(closed))
+    starts, ends = starts[keep], ends[keep]
+
+    start, end = frames[starts], frames[ends]
+    if t is None:
+        t = np.arange(len(ear))
+    t = np.asarray(t)
+    return BlinkRuns(start=start, end=end, start_t=t[start], end_t=t[end],
+                     closed_frames=ends - starts)
+
+
+class BlinkDetector:
+    """
+    Streaming blink state machine.
+
+    update() takes one frame's EAR and timestamp and returns True on the frame
+    the eyes reopen after at least ``consec_frames`` closed frames.
+    """
+
+    def __init__(self, ear_thresh: float = EAR_THRESH, consec_frames: int = CONSEC_FRAMES):
+        _check_consec_frames(consec_frames)
+        self.ear_thresh = ear_thresh
+        self.consec_frames = consec_frames
+        self.frame_counter = 0  # Closed frames in the current closure
+        self._run_start = None
+        self.last_blink: Optional[Tuple[float, float, int]] = None  # (start_t, end_t, closed_frames)
+
+    def reset(self):
+        self.frame_counter = 0
+        self._run_start = None
+        self.last_blink = None
+
+    @property
+    def closed(self) -> bool:
+        """True while the eyes are below the threshold"""
+        return self.frame_counter > 0
+
+    def update(self, ear: float, t=None) -> bool:
+        """Advance by one frame (NaN EAR = no face, ignored); True when a blink completes"""
+        if ear != ear:
+            return False
+
+        # Blink detection logic (from original eye_blink.py)
+        if ear < self.ear_thresh:
+            if self.frame_counter == 0:
+                self._run_start = t
+            self.frame_counter += 1
+            return False
+
+        blink = self.frame_counter >= self.consec_frames
+        if blink:
+            self.last_blink = (self._run_start, t, self.frame_counter)
+        self.frame_counter = 0
+        return blink
@@ -0,0 +1,138 @@
+"""
+Blink Events
+Per-blink records (timing, closed frames, minimum EAR, closing/opening speed)
+built alongside the blink state machine, and batched for delivery to the UI.
+"""
+
+import time
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict, Any
+
+
+@dataclass
+class BlinkEvent:
+    """
+    One completed blink.
+
+    Timestamps are frame timestamps in ns: monotonic capture time for live
+    sources, media time for video files. Velocities are in EAR units per second.
+    """
+    index: int               # 1-based blink number within the session
+    start_ns: int            # First frame with the eyes closed
+    end_ns: int              # First frame with the eyes open again
+    closed_frames: int
+    min_ear: float
+    closing_velocity: float  # EAR drop from the last open frame to the minimum
+    opening_velocity: float  # EAR rise from the minimum to the reopened frame
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data['duration_ms'] = round(self.duration_ms, 1)
+        return data
+
+
+def _velocity(delta_ear: float, delta_ns: int) -> float:
+    return delta_ear * 1e9 / delta_ns if delta_ns > 0 else 0.0
+
+
+class BlinkEventBuilder:
+    """
+    Follows one eye closure frame by frame.
+
+    The blink state machine calls closed() for every frame below the EAR
+    threshold and opened() for every frame above it; opened() returns the
+    finished event when the state machine confirmed the closure as a blink.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._open_ear: Optional[float] = None  # Last open frame before the closure
+        self._open_ns = 0
+        self._start_ns: Optional[int] = None
+        self._min_ear = 0.0
+        self._min_ns = 0
+        self._closed_frames = 0
+
+    def closed(self, ear: float, timestamp_ns: int):
+        """Feed a frame with the eyes closed"""
+        if self._start_ns is None:
+            self._start_ns = timestamp_ns
+            self._min_ear = ear
+            self._min_ns = timestamp_ns
+            self._closed_frames = 0
+        self._closed_frames += 1
+        if ear < self._min_ear:
+            self._min_ear = ear
+            self._min_ns = timestamp_ns
+
+    def opened(self, ear: float, timestamp_ns: int, index: Optional[int] = None) -> Optional[BlinkEvent]:
+        """
+        Feed a frame with the eyes open.
+
+        Args:
+            index: Blink number if the closure that just ended counts as a blink
+
+        Returns:
+            The event for a confirmed blink, else None
+        """
+        event = None
+        if index is not None and self._start_ns is not None:
+            closing = 0.0
+            if self._open_ear is not None:
+                closing = _velocity(self._open_ear - self._min_ear, self._min_ns - self._open_ns)
+            event = BlinkEvent(
+                index=index,
+                start_ns=self._start_ns,
+                end_ns=timestamp_ns,
+                closed_frames=self._closed_frames,
+                min_ear=round(self._min_ear, 4),
+                closing_velocity=round(closing, 3),
+                opening_velocity=round(_velocity(ear - self._min_ear, timestamp_ns - self._min_ns), 3)
+            )
+        self._start_ns = None
+        self._open_ear = ear
+        self._open_ns = timestamp_ns
+        return event
+
+
+class BlinkEventBatch:
+    """
+    Collects events so the tracker emits one signal per ``interval`` seconds
+    (or per ``max_events`` events) instead of one per blink.
+    """
+
+    def __init__(self, interval: float = 1.0, max_events: int = 64):
+        self.interval = interval
+        self.max_events = max_events
+        self._events: List[BlinkEvent] = []
+        self._last_flush = time.monotonic()
+
+    def add(self, event: BlinkEvent):
+        self._events.append(event)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def due(self, now: Optional[float] = None) -> bool:
+        """True when pending events should be delivered now"""
+        if not self._events:
+            return False
+        if now is None:
+            now = time.monotonic()
+        return len(self._events) >= self.max_events or now - self._last_flush >= self.interval
+
+    def take(self) -> List[BlinkEvent]:
+        """Remove and return the pending events"""
+        events, self._events = self._events, []
+        self._last_flush = time.monotonic()
+        return events
+
+    def clear(self):
+        self._events = []
+        self._last_flush = time.monotonic()
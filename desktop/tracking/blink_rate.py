@@ -0,0 +1,99 @@
+"""
+Sliding-Window Blink Rate
+Fixed-capacity ring of blink timestamps (time.monotonic_ns) with O(1)
+amortized blink counts over trailing windows, immune to wall-clock jumps.
+"""
+
+import time
+from typing import Optional, Dict, Iterable
+
+NS_PER_SECOND = 1_000_000_000
+
+# Default trailing windows (seconds) reported by the tracker
+DEFAULT_WINDOWS = (60, 300)
+
+
+class BlinkRateWindow:
+    """
+    Blink event ring with per-window tail pointers.
+
+    Events are appended at the head; each window keeps the index of its
+    oldest event still inside the window and only ever moves it forward, so
+    recording and querying are amortized O(1). ``capacity`` bounds memory;
+    it only needs to exceed the most blinks expected in the longest window.
+    """
+
+    def __init__(self, capacity: int = 2048, windows: Iterable[int] = DEFAULT_WINDOWS):
+        self.capacity = capacity
+        self.windows = tuple(windows)
+        self._times = [0] * capacity
+        self._head = 0  # Total events recorded; slot = index % capacity
+        self._tails: Dict[int, int] = {window: 0 for window in self.windows}
+        self.start_ns: Optional[int] = None
+
+    def reset(self, start_ns: Optional[int] = None):
+        """Forget all events and restart the clock"""
+        self._head = 0
+        for window in self._tails:
+            self._tails[window] = 0
+        self.start_ns = start_ns if start_ns is not None else time.monotonic_ns()
+
+    def record(self, timestamp_ns: Optional[int] = None):
+        """Add one blink (monotonic ns timestamps, non-decreasing)"""
+        if timestamp_ns is None:
+            timestamp_ns = time.monotonic_ns()
+        if self.start_ns is None:
+            self.start_ns = timestamp_ns
+        self._times[self._head % self.capacity] = timestamp_ns
+        self._head += 1
+
+    def count(self, window: int, now_ns: Optional[int] = None) -> int:
+        """Blinks within the last ``window`` seconds"""
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        cutoff = now_ns - window * NS_PER_SECOND
+
+        tail = max(self._tails.get(window, 0), self._head - self.capacity)
+        times = self._times
+        capacity = self.capacity
+        while tail < self._head and times[tail % capacity] <= cutoff:
+            tail += 1
+        if window in self._tails:
+            self._tails[window] = tail
+        return self._head - tail
+
+    def rate(self, window: int, now_ns: Optional[int] = None) -> float:
+        """
+        Blinks per minute over the last ``window`` seconds.
+
+        Until a full window has elapsed, the rate is scaled to the time elapsed
+        so far instead of reading low.
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        if self.start_ns is None:
+            return 0.0
+        span_s = min(window, (now_ns - self.start_ns) / NS_PER_SECOND)
+        if span_s <= 0:
+            return 0.0
+        return self.count(window, now_ns) * 60.0 / span_s
+
+    @property
+    def total(self) -> int:
+        return self._head
+
+    @property
+    def last_blink_ns(self) -> Optional[int]:
+        if self._head == 0:
+            return None
+        return self._times[(self._head - 1) % self.capacity]
+
+    def get_stats(self, now_ns: Optional[int] = None) -> Dict[str, float]:
+        """Blink counts and rates per minute for every configured window"""
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        stats: Dict[str, float] = {}
+        for window in self.windows:
+            stats[f'blinks_{window}s'] = self.count(window, now_ns)
+            stats[f'blink_rate_{window}s'] = round(self.rate(window, now_ns), 1)
+        return stats
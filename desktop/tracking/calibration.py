@@ -0,0 +1,197 @@
+"""
+EAR Calibration
+Per-user blink threshold derived online from the user's own EAR: streaming
+P² quantile estimates of the open-eye baseline and the closed-eye floor, kept
+over a sliding span of frames so they re-converge after lighting or glasses
+change. Constant memory and constant work per frame for any session length.
+"""
+
+from typing import Dict, Any, List, Optional
+
+from .blink_detector import EAR_THRESH
+
+
+class P2Quantile:
+    """
+    P² estimate of one quantile (Jain & Chlamtac, 1985).
+
+    Five markers track the minimum, the quantile, the maximum and two points
+    in between; every sample moves the markers by at most one position, with
+    their heights adjusted by piecewise-parabolic interpolation.
+    """
+
+    def __init__(self, q: float):
+        if not 0.0 < q < 1.0:
+            raise ValueError("q must be between 0 and 1")
+        self.q = q
+        self.reset()
+
+    def reset(self):
+        q = self.q
+        self.count = 0
+        self._heights: List[float] = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1.0, 1.0 + 2.0 * q, 1.0 + 4.0 * q, 3.0 + 2.0 * q, 5.0]
+        self._increments = (0.0, q / 2.0, q, (1.0 + q) / 2.0, 1.0)
+
+    def add(self, x: float):
+        """Add one sample"""
+        self.count += 1
+        h = self._heights
+        if self.count <= 5:
+            h.append(x)
+            h.sort()
+            return
+
+        n = self._positions
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= h[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        desired = self._desired
+        for i in range(5):
+            desired[i] += self._increments[i]
+
+        # Move the middle markers towards their desired positions
+        for i in (1, 2, 3):
+            d = desired[i] - n[i]
+            if (d >= 1.0 and n[i + 1] - n[i] > 1) or (d <= -1.0 and n[i - 1] - n[i] < -1):
+                s = 1 if d > 0 else -1
+                height = h[i] + s / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + s) * (h[i + 1] - h[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - s) * (h[i] - h[i - 1]) / (n[i] - n[i - 1]))
+                if not h[i - 1] < height < h[i + 1]:
+                    height = h[i] + s * (h[i + s] - h[i]) / (n[i + s] - n[i])
+                h[i] = height
+                n[i] += s
+
+    @property
+    def value(self) -> Optional[float]:
+        """Current estimate (None before the first sample)"""
+        if self.count == 0:
+            return None
+        if self.count <= 5:
+            return self._heights[min(int(self.q * self.count), self.count - 1)]
+        return self._heights[2]
+
+
+class SlidingQuantile:
+    """
+    Quantile over roughly the last ``period`` to 2 x ``period`` samples.
+
+    Two P² estimators take every sample; each period the older one restarts,
+    and the estimate comes from the one that has run longer. Old conditions
+    therefore stop influencing the estimate after at most 2 x ``period`` samples.
+    """
+
+    def __init__(self, q: float, period: int):
+        self.period = period
+        self._estimators = (P2Quantile(q), P2Quantile(q))
+        self._samples = 0
+
+    def reset(self):
+        for estimator in self._estimators:
+            estimator.reset()
+        self._samples = 0
+
+    def add(self, x: float):
+        first, second = self._estimators
+        first.add(x)
+        second.add(x)
+        self._samples += 1
+        if self._samples % self.period == 0:
+            (first if first.count >= second.count else second).reset()
+
+    @property
+    def count(self) -> int:
+        """Samples behind the current estimate"""
+        return max(estimator.count for estimator in self._estimators)
+
+    @property
+    def value(self) -> Optional[float]:
+        first, second = self._estimators
+        return (first if first.count >= second.count else second).value
+
+
+class EARCalibrator:
+    """
+    Adaptive blink threshold from the user's EAR distribution.
+
+    The open-eye baseline is a high-mass quantile of the per-frame EAR (eyes
+    are open for nearly every frame) and the closed-eye floor a low quantile
+    (the blink minima). The threshold sits ``ratio`` of the way from floor to
+    baseline, bounded by ``min_thresh`` and ``max_fraction`` of the baseline.
+    Until ``min_samples`` frames have been seen, or while the two estimates are
+    closer than ``min_spread`` (no blinks seen yet), ``default_thresh`` or the
+    last calibrated threshold stays in use.
+    """
+
+    def __init__(self, default_thresh: float = EAR_THRESH, ratio: float = 0.5,
+                 baseline_q: float = 0.5, floor_q: float = 0.01, period: int = 3600,
+                 min_samples: int = 900, update_interval: int = 30, min_thresh: float = 0.12,
+                 max_fraction: float = 0.8, min_spread: float = 0.06):
+        self.default_thresh = default_thresh
+        self.ratio = ratio
+        self.min_samples = min_samples
+        self.update_interval = update_interval
+        self.min_thresh = min_thresh
+        self.max_fraction = max_fraction
+        self.min_spread = min_spread
+        self._baseline = SlidingQuantile(baseline_q, period)
+        self._floor = SlidingQuantile(floor_q, period)
+        self.reset()
+
+    def reset(self):
+        """Forget the user's EAR distribution and return to the default threshold"""
+        self._baseline.reset()
+        self._floor.reset()
+        self._frames = 0
+        self.threshold = self.default_thresh
+        self.calibrated = False
+        self.updates = 0  # Threshold changes so far
+
+    @property
+    def baseline(self) -> Optional[float]:
+        """Open-eye EAR baseline"""
+        return self._baseline.value
+
+    @property
+    def floor(self) -> Optional[float]:
+        """Closed-eye EAR floor"""
+        return self._floor.value
+
+    def update(self, ear: float):
+        """Feed one frame's EAR; ``threshold`` is recomputed every ``update_interval`` frames"""
+        self._baseline.add(ear)
+        self._floor.add(ear)
+        self._frames += 1
+        if self._frames % self.update_interval or self._baseline.count < self.min_samples:
+            return
+
+        baseline, floor = self._baseline.value, self._floor.value
+        if baseline - floor < self.min_spread:
+            return
+        threshold = floor + self.ratio * (baseline - floor)
+        threshold = round(max(self.min_thresh, min(threshold, self.max_fraction * baseline)), 3)
+        if threshold != self.threshold:
+            self.threshold = threshold
+            self.updates += 1
+        self.calibrated = True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current estimates and threshold"""
+        baseline, floor = self.baseline, self.floor
+        return {
+            'ear_baseline': round(baseline, 3) if baseline is not None else None,
+            'ear_floor': round(floor, 3) if floor is not None else None,
+            'ear_threshold': self.threshold,
+            'ear_calibrated': self.calibrated
+        }
@@ -0,0 +1,363 @@
+"""
+Camera Capability Probe
+Lists the capture modes (size, frame rate, FOURCC) a camera supports, picks
+the cheapest one that still meets the tracker's needs, and caches the mode
+list per device so later starts skip probing.
+
+On Linux the modes come straight from the V4L2 driver (no capture started);
+elsewhere candidate modes are negotiated through OpenCV one by one, cheapest
+first. A saved ``v4l2-ctl --list-formats-ext`` listing can stand in for the
+device, which is how the selection is tested without a camera.
+
+Usage:
+    python -m desktop.tracking.camera_probe 0
+    python -m desktop.tracking.camera_probe 0 --refresh --target-fps 15
+    python -m desktop.tracking.camera_probe --listing formats.txt
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import struct
+import logging
+import argparse
+from dataclasses import dataclass, asdict
+from typing import Optional, List, Dict, Any, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Tracker needs: FaceMesh keeps eye landmarks stable down to 640 px wide frames;
+# 15 fps is the least the blink detector needs to confirm a blink (see FramePacer)
+MIN_WIDTH = 640
+MIN_HEIGHT = 360
+MIN_FPS = 15.0
+
+# Preferred pixel formats at equal size and rate: MJPG keeps USB bandwidth low,
+# so webcams offer it at every rate; raw YUYV is often capped well below 30 fps
+FOURCC_PREFERENCE = ('MJPG', 'YUYV', 'NV12', 'YU12')
+
+# Candidates for trial negotiation and for stepwise V4L2 size/rate ranges
+STANDARD_SIZES = [(640, 360), (640, 480), (800, 600), (960, 540), (1280, 720)]
+STANDARD_RATES = [15.0, 24.0, 30.0, 60.0]
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".wellness_at_work", "camera_modes.json")
+
+
+@dataclass
+class CameraMode:
+    """One capture mode"""
+    width: int
+    height: int
+    fps: float
+    fourcc: str
+
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CameraMode':
+        return cls(int(data['width']), int(data['height']), float(data['fps']), str(data['fourcc']))
+
+    def __str__(self) -> str:
+        return f"{self.width}x{self.height}@{self.fps:g} {self.fourcc}"
+
+
+def select_mode(modes: Iterable[CameraMode], target_fps: float = 30.0, min_width: int = MIN_WIDTH,
+                min_height: int = MIN_HEIGHT, min_fps: float = MIN_FPS) -> Optional[CameraMode]:
+    """
+    Pick the cheapest mode that meets the size and rate needs.
+
+    Cheapest means fewest pixels per frame (decode, color conversion and
+    preview scaling all grow with it), then the lowest rate that still reaches
+    ``target_fps``, then FOURCC_PREFERENCE. Modes below ``target_fps`` are
+    used only when none reaches it, fastest first.
+    """
+    def cost(mode: CameraMode):
+        slow = mode.fps < target_fps - 0.5
+        rank = FOURCC_PREFERENCE.index(mode.fourcc) if mode.fourcc in FOURCC_PREFERENCE else len(FOURCC_PREFERENCE)
+        return (slow, mode.pixels, -mode.fps if slow else mode.fps, rank)
+
+    usable = [mode for mode in modes
+              if mode.width >= min_width and mode.height >= min_height and mode.fps >= min_fps - 0.5]
+    return min(usable, key=cost) if usable else None
+
+
+def parse_v4l2_listing(text: str) -> List[CameraMode]:
+    """Parse ``v4l2-ctl --list-formats-ext`` output (discrete sizes and intervals)"""
+    modes: List[CameraMode] = []
+    fourcc, size = None, None
+    for line in text.splitlines():
+        match = re.search(r"\[\d+\]: '(\w+ ?)'", line)
+        if match:
+            fourcc, size = match.group(1).strip(), None
+            continue
+        match = re.search(r"Size: Discrete (\d+)x(\d+)", line)
+        if match:
+            size = (int(match.group(1)), int(match.group(2)))
+            continue
+        match = re.search(r"Interval: Discrete .*\(([\d.]+) fps\)", line)
+        if match and fourcc and size:
+            modes.append(CameraMode(size[0], size[1], float(match.group(1)), fourcc))
+    return modes
+
+
+# V4L2 enumeration ioctls (linux/videodev2.h): _IOWR('V', nr, struct size)
+def _iowr(nr: int, size: int) -> int:
+    return (3 << 30) | (size << 16) | (ord('V') << 8) | nr
+
+
+VIDIOC_ENUM_FMT = _iowr(2, 64)
+VIDIOC_ENUM_FRAMESIZES = _iowr(74, 44)
+VIDIOC_ENUM_FRAMEINTERVALS = _iowr(75, 52)
+V4L2_BUF_TYPE_VIDEO_CAPTURE = 1
+V4L2_FRMSIZE_TYPE_DISCRETE = 1
+V4L2_FRMIVAL_TYPE_DISCRETE = 1
+
+
+def _fourcc_name(code: int) -> str:
+    return struct.pack('<I', code).decode('ascii', errors='replace').strip()
+
+
+def _v4l2_enum(fd: int, request: int, fmt: str, *head) -> Iterable[tuple]:
+    """Yield the unpacked structs of one enumeration ioctl until the driver runs out"""
+    import fcntl
+
+    index = 0
+    while True:
+        buf = bytearray(struct.calcsize(fmt))
+        struct.pack_into('<' + 'I' * (1 + len(head)), buf, 0, index, *head)
+        try:
+            fcntl.ioctl(fd, request, buf)
+        except OSError:
+            return
+        yield struct.unpack(fmt, buf)
+        index += 1
+
+
+def _v4l2_rates(fd: int, pixelformat: int, width: int, height: int) -> List[float]:
+    rates: List[float] = []
+    for entry in _v4l2_enum(fd, VIDIOC_ENUM_FRAMEINTERVALS, '<IIIIIIIIIIIII',
+                            pixelformat, width, height):
+        kind = entry[4]
+        if kind == V4L2_FRMIVAL_TYPE_DISCRETE:
+            numerator, denominator = entry[5], entry[6]
+            if numerator:
+                rates.append(round(denominator / numerator, 3))
+        else:
+            # Stepwise/continuous interval range: (min num, min den, max num, max den, ...)
+            fastest = entry[6] / entry[5] if entry[5] else 0.0
+            slowest = entry[8] / entry[7] if entry[7] else 0.0
+            rates.extend(rate for rate in STANDARD_RATES if slowest <= rate <= fastest)
+            break
+    return rates
+
+
+def v4l2_modes(device: str) -> List[CameraMode]:
+    """Enumerate the capture modes of a V4L2 device node (e.g. /dev/video0)"""
+    modes: List[CameraMode] = []
+    fd = os.open(device, os.O_RDWR | os.O_NONBLOCK)
+    try:
+        for fmt in _v4l2_enum(fd, VIDIOC_ENUM_FMT, '<III32sII12x', V4L2_BUF_TYPE_VIDEO_CAPTURE):
+            pixelformat = fmt[4]
+            fourcc = _fourcc_name(pixelformat)
+            for size in _v4l2_enum(fd, VIDIOC_ENUM_FRAMESIZES, '<IIIIIIIII8x', pixelformat):
+                if size[2] == V4L2_FRMSIZE_TYPE_DISCRETE:
+                    sizes = [(size[3], size[4])]
+                else:
+                    # Stepwise range: (min w, max w, step w, min h, max h, step h)
+                    min_w, max_w, step_w, min_h, max_h, step_h = size[3:9]
+                    sizes = [(w, h) for w, h in STANDARD_SIZES
+                             if min_w <= w <= max_w and min_h <= h <= max_h
+                             and (w - min_w) % max(step_w, 1) == 0 and (h - min_h) % max(step_h, 1) == 0]
+                for width, height in sizes:
+                    for rate in _v4l2_rates(fd, pixelformat, width, height):
+                        modes.append(CameraMode(width, height, rate, fourcc))
+                if size[2] != V4L2_FRMSIZE_TYPE_DISCRETE:
+                    break
+    finally:
+        os.close(fd)
+    return modes
+
+
+def trial_modes(source, target_fps: float = 30.0, min_width: int = MIN_WIDTH,
+                min_height: int = MIN_HEIGHT) -> List[CameraMode]:
+    """
+    Negotiate candidate modes on an opened CameraSource, cheapest first, and
+    return the first one the camera actually delivers (checked on a real frame).
+    """
+    candidates = [CameraMode(w, h, target_fps, fourcc) for w, h in STANDARD_SIZES
+                  if w >= min_width and h >= min_height for fourcc in FOURCC_PREFERENCE[:2]]
+    candidates.sort(key=lambda mode: mode.pixels)
+    for mode in candidates:
+        source.configure(mode.width, mode.height, mode.fps, mode.fourcc)
+        ret, frame = source.read()
+        if ret and frame is not None and frame.shape[1] == mode.width and frame.shape[0] == mode.height:
+            negotiated = source.negotiated_mode()
+            return [CameraMode(mode.width, mode.height, negotiated['fps'] or mode.fps,
+                               negotiated['fourcc'] or mode.fourcc)]
+    return []
+
+
+def device_key(camera_index: int) -> str:
+    """Cache key: camera index plus the device name where the OS reports one"""
+    name_path = f"/sys/class/video4linux/video{camera_index}/name"
+    try:
+        with open(name_path, 'r') as f:
+            return f"{camera_index}:{f.read().strip()}"
+    except OSError:
+        return str(camera_index)
+
+
+class CameraModeCache:
+    """
+    Per-device mode lists in a small JSON file.
+
+    ``complete`` marks a full driver enumeration; trial negotiation stores only
+    the mode it settled on, so a request it cannot satisfy probes again.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, data: Dict[str, Any]):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write camera mode cache {self.path}: {e}")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._load().get(key)
+        if entry is None:
+            return None
+        return {'modes': [CameraMode.from_dict(mode) for mode in entry.get('modes', [])],
+                'complete': bool(entry.get('complete'))}
+
+    def put(self, key: str, modes: List[CameraMode], complete: bool):
+        data = self._load()
+        data[key] = {'modes': [mode.to_dict() for mode in modes], 'complete': complete,
+                     'probed_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+        self._save(data)
+
+    def drop(self, key: str):
+        data = self._load()
+        if data.pop(key, None) is not None:
+            self._save(data)
+
+
+def probe_modes(camera_index: int, source=None, target_fps: float = 30.0,
+                min_width: int = MIN_WIDTH, min_height: int = MIN_HEIGHT):
+    """
+    Probe a camera's modes.
+
+    Returns:
+        (modes, complete): the driver's full list on Linux, else what trial
+        negotiation on ``source`` (an opened CameraSource) settled on
+    """
+    device = f"/dev/video{camera_index}"
+    if sys.platform.startswith('linux') and os.path.exists(device):
+        try:
+            modes = v4l2_modes(device)
+            if modes:
+                return modes, True
+        except OSError as e:
+            logger.debug(f"V4L2 enumeration failed on {device}: {e}")
+
+    if source is None:
+        return [], False
+    return trial_modes(source, target_fps, min_width, min_height), False
+
+
+def choose_camera_mode(camera_index: int, target_fps: float = 30.0, source=None,
+                       cache: Optional[CameraModeCache] = None, refresh: bool = False,
+                       min_width: int = MIN_WIDTH, min_height: int = MIN_HEIGHT,
+                       min_fps: float = MIN_FPS) -> Optional[CameraMode]:
+    """
+    The capture mode to request from a camera, probing only on a cache miss.
+
+    Args:
+        camera_index: OpenCV camera index
+        target_fps: Frame rate the tracker runs at
+        source: The opened CameraSource, used for trial negotiation off Linux
+        cache: Mode cache (default: the per-user cache file)
+        refresh: Probe even when the device is cached
+    """
+    cache = cache or CameraModeCache()
+    key = device_key(camera_index)
+
+    entry = None if refresh else cache.get(key)
+    if entry is not None:
+        mode = select_mode(entry['modes'], target_fps, min_width, min_height, min_fps)
+        if mode is not None or entry['complete']:
+            return mode
+
+    started = time.perf_counter()
+    modes, complete = probe_modes(camera_index, source, target_fps, min_width, min_height)
+    logger.info(f"Probed camera {key}: {len(modes)} modes in "
+                f"{(time.perf_counter() - started) * 1000:.0f} ms")
+    if modes:
+        cache.put(key, modes, complete)
+    return select_mode(modes, target_fps, min_width, min_height, min_fps)
+
+
+def forget_camera_mode(camera_index: int, cache: Optional[CameraModeCache] = None):
+    """Drop a device from the cache (its cached mode did not negotiate)"""
+    (cache or CameraModeCache()).drop(device_key(camera_index))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="List camera modes and the one the tracker would use")
+    parser.add_argument('camera', nargs='?', type=int, default=0, help='camera index')
+    parser.add_argument('--listing', help='saved v4l2-ctl --list-formats-ext output instead of a device')
+    parser.add_argument('--target-fps', type=float, default=30.0)
+    parser.add_argument('--min-width', type=int, default=MIN_WIDTH)
+    parser.add_argument('--min-height', type=int, default=MIN_HEIGHT)
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH, help='mode cache file')
+    parser.add_argument('--refresh', action='store_true', help='probe even if the device is cached')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.listing:
+        with open(args.listing, 'r') as f:
+            modes = parse_v4l2_listing(f.read())
+        selected = select_mode(modes, args.target_fps, args.min_width, args.min_height)
+    else:
+        from .frame_source import CameraSource
+
+        source = CameraSource(args.camera)
+        try:
+            selected = choose_camera_mode(args.camera, args.target_fps,
+                                          source=source if source.open() else None,
+                                          cache=CameraModeCache(args.cache), refresh=args.refresh,
+                                          min_width=args.min_width, min_height=args.min_height)
+        finally:
+            source.release()
+        entry = CameraModeCache(args.cache).get(device_key(args.camera))
+        modes = entry['modes'] if entry else []
+
+    print(json.dumps({
+        'modes': [str(mode) for mode in modes],
+        'selected': selected.to_dict() if selected else None
+    }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
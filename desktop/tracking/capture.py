@@ -0,0 +1,210 @@
+"""
+Camera Capture Thread
+Producer thread that reads frames into a small preallocated ring buffer so the
+inference loop always works on the newest frame instead of a queue backlog.
+"""
+
+import threading
+import time
+import logging
+import numpy as np
+from typing import Optional, Tuple, List
+
+logger = logging.getLogger(__name__)
+
+
+class FrameRingBuffer:
+    """
+    Latest-frame-wins ring of preallocated frame slots.
+
+    The writer fills slots round-robin, skipping the slot currently leased by
+    the reader, so a frame being processed is never overwritten. A frame that
+    is replaced before the reader picked it up is counted as dropped.
+    """
+
+    def __init__(self, slots: int = 3):
+        if slots < 3:
+            raise ValueError("FrameRingBuffer needs at least 3 slots")
+
+        self.slots = slots
+        self._frames: List[Optional[np.ndarray]] = [None] * slots
+        self._timestamps = [0] * slots
+        self._cond = threading.Condition()
+
+        self._write_index = 0
+        self._latest_slot: Optional[int] = None
+        self._leased_slot: Optional[int] = None
+        self._latest_seq = 0
+        self._consumed_seq = 0
+
+        # Counters
+        self.frames_written = 0
+        self.frames_read = 0
+        self.frames_dropped = 0
+
+    def acquire_write_slot(self) -> Tuple[int, Optional[np.ndarray]]:
+        """Reserve the next writable slot and return (slot, existing buffer)"""
+        with self._cond:
+            slot = self._write_index
+            for _ in range(self.slots):
+                if slot != self._leased_slot and slot != self._latest_slot:
+                    break
+                slot = (slot + 1) % self.slots
+            self._write_index = (slot + 1) % self.slots
+            return slot, self._frames[slot]
+
+    def commit(self, slot: int, frame: np.ndarray, timestamp_ns: int):
+        """Publish a filled slot as the newest frame"""
+        with self._cond:
+            self._frames[slot] = frame
+            self._timestamps[slot] = timestamp_ns
+            if self._latest_seq > self._consumed_seq:
+                self.frames_dropped += 1
+            self._latest_slot = slot
+            self._latest_seq += 1
+            self.frames_written += 1
+            self._cond.notify_all()
+
+    def write(self, frame: np.ndarray, timestamp_ns: Optional[int] = None):
+        """Copy a frame into the ring (reusing the slot buffer when shapes match)"""
+        slot, buffer = self.acquire_write_slot()
+        if buffer is None or buffer.shape != frame.shape or buffer.dtype != frame.dtype:
+            buffer = frame.copy()
+        else:
+            np.copyto(buffer, frame)
+        self.commit(slot, buffer, timestamp_ns if timestamp_ns is not None else time.monotonic_ns())
+
+    def read_latest(self, timeout: Optional[float] = None) -> Tuple[Optional[np.ndarray], int]:
+        """
+        Lease the newest unread frame, waiting up to ``timeout`` seconds.
+
+        The returned array stays valid until the next read_latest() call.
+
+        Returns:
+            (frame, capture timestamp in monotonic ns) or (None, 0) on timeout
+        """
+        with self._cond:
+            if self._latest_seq == self._consumed_seq:
+                self._cond.wait_for(lambda: self._latest_seq > self._consumed_seq, timeout)
+            if self._latest_seq == self._consumed_seq:
+                return None, 0
+
+            slot = self._latest_slot
+            self._leased_slot = slot
+            self._latest_slot = None
+            self._consumed_seq = self._latest_seq
+            self.frames_read += 1
+            return self._frames[slot], self._timestamps[slot]
+
+    @property
+    def pending(self) -> int:
+        """Number of unread frames (0 or 1 - older ones have been dropped)"""
+        with self._cond:
+            return 1 if self._latest_seq > self._consumed_seq else 0
+
+    def wake(self):
+        """Wake up a reader blocked in read_latest()"""
+        with self._cond:
+            self._cond.notify_all()
+
+    def get_stats(self) -> dict:
+        """Get ring buffer counters"""
+        with self._cond:
+            return {
+                'frames_captured': self.frames_written,
+                'frames_processed': self.frames_read,
+                'frames_dropped': self.frames_dropped
+            }
+
+
+class CaptureThread(threading.Thread):
+    """
+    Producer thread reading from a cv2.VideoCapture-like object into a
+    FrameRingBuffer. Decoding happens directly into the ring's slot buffers.
+    """
+
+    def __init__(self, cap, ring: Optional[FrameRingBuffer] = None, max_read_failures: int = 3):
+        super().__init__(daemon=True, name="CameraCapture")
+        self.cap = cap
+        self.ring = ring or FrameRingBuffer()
+        self.failed = False
+        self.max_read_failures = max_read_failures  # Consecutive failed reads before giving up
+        self.read_failures = 0  # Failed reads so far, including retried ones
+        self._failures_in_row = 0
+        self._stop_event = threading.Event()
+        self._paused = threading.Event()
+        self._min_interval_ns = 0  # Publish at most one frame per interval (0 = every frame)
+        self._last_publish_ns = 0
+
+    def pause(self):
+        """Keep the camera draining but stop publishing frames"""
+        self._paused.set()
+
+    def resume(self):
+        """Resume publishing frames"""
+        self._paused.clear()
+
+    def set_rate_limit(self, fps: Optional[float]):
+        """Decode and publish at most ``fps`` frames per second; None or 0 removes the limit"""
+        self._min_interval_ns = int(1_000_000_000 / fps) if fps else 0
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the capture loop and wait for the thread to exit"""
+        self._stop_event.set()
+        self.ring.wake()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout=timeout)
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    def _read_failed(self) -> bool:
+        """Count a failed read; True once the device should be considered lost"""
+        self.read_failures += 1
+        self._failures_in_row += 1
+        if self._failures_in_row >= self.max_read_failures:
+            self.failed = True
+            return True
+        time.sleep(0.01)  # Transient hiccup: retry shortly
+        return False
+
+    def run(self):
+        """Capture loop - runs until stopped or the device fails"""
+        while not self._stop_event.is_set():
+            try:
+                if self._paused.is_set():
+                    # Drain the driver buffer without decoding
+                    if not self.cap.grab():
+                        time.sleep(0.05)
+                    continue
+
+                if (self._min_interval_ns
+                        and time.monotonic_ns() - self._last_publish_ns < self._min_interval_ns):
+                    # Rate limited: keep the driver buffer drained, skip decoding
+                    if not self.cap.grab():
+                        if self._read_failed():
+                            break
+                        continue
+                    self._failures_in_row = 0
+                    continue
+
+                slot, buffer = self.ring.acquire_write_slot()
+                ret, frame = self.cap.read(buffer) if buffer is not None else self.cap.read()
+                if not ret or frame is None:
+                    if self._read_failed():
+                        break
+                    continue
+                self._failures_in_row = 0
+                if self._stop_event.is_set():
+                    break  # Stopped while blocked in read: the ring may belong to a new thread
+
+                self._last_publish_ns = time.monotonic_ns()
+                self.ring.commit(slot, frame, self._last_publish_ns)
+
+            except Exception as e:
+                logger.error(f"Capture error: {e}")
+                self.failed = True
+                break
+
+        self.ring.wake()
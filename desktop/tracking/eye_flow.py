@@ -0,0 +1,165 @@
+"""
+Eye Landmark Propagation
+Skip-frame support for the blink pipeline: between sparse FaceMesh inferences
+the 12 eye landmarks are carried forward with pyramidal Lucas-Kanade optical
+flow on a small grayscale crop around the eyes.
+
+Experimental and off by default: blink recall in skip-frame mode has not been
+measured against labeled recordings yet (``benchmark --max-skip`` does that),
+so enable it only where the inference savings matter more than a missed blink.
+"""
+
+import cv2
+import numpy as np
+from typing import Optional, Tuple
+
+Box = Tuple[int, int, int, int]  # x0, y0, x1, y1 in frame pixels
+
+
+class EyePointFlowTracker:
+    """
+    Propagates eye landmarks between FaceMesh inferences.
+
+    FaceMesh runs every ``k``-th frame; ``k`` grows by one while the eyes are
+    still (median flow below ``motion_low`` px) and halves on fast motion, up
+    to ``max_skip``. The tracker asks for a new inference (re-anchors) when:
+      - the flow fails or its error exceeds ``max_error``
+      - a point leaves the crop
+      - the propagated EAR drops below ``ear_guard``, so every blink is
+        confirmed on real landmarks rather than on flow
+    """
+
+    def __init__(self, max_skip: int = 4, max_error: float = 12.0, motion_low: float = 0.5,
+                 motion_high: float = 2.0, ear_guard: float = 0.26, margin: float = 0.6):
+        self.max_skip = max(1, max_skip)
+        self.max_error = max_error      # Mean LK patch error that triggers a re-anchor
+        self.motion_low = motion_low    # Median point motion (px/frame) to lengthen k
+        self.motion_high = motion_high  # Median point motion (px/frame) to shorten k
+        self.ear_guard = ear_guard      # Below this EAR, always run FaceMesh
+        self.margin = margin            # Crop padding as a fraction of the eye span
+        self.lk_params = dict(winSize=(15, 15), maxLevel=2,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+        self.k = 1
+        self.box: Optional[Box] = None
+        self._since_anchor = 0
+        self._forced = True
+        self._points = np.zeros((12, 1, 2), dtype=np.float32)  # Relative to the crop
+        self._last_points = np.zeros((12, 2), dtype=np.float32)  # Frame pixels, last frame
+        self._has_last = False
+        self._prev_gray: Optional[np.ndarray] = None
+        self._next_gray: Optional[np.ndarray] = None
+
+        # Counters
+        self.anchors = 0
+        self.flow_frames = 0
+        self.reanchors = 0  # Flow failures
+        self.guarded = 0    # Inferences forced by a low EAR
+
+    def reset(self):
+        """Drop the anchor (e.g. when the face is lost)"""
+        self.box = None
+        self._forced = True
+        self._has_last = False
+        self.k = 1
+
+    def _adapt(self, motion: float):
+        """Adjust k to the median landmark motion (px/frame)"""
+        if motion > self.motion_high:
+            self.k = max(1, self.k // 2)
+        elif motion < self.motion_low:
+            self.k = min(self.max_skip, self.k + 1)
+
+    def flow_due(self) -> bool:
+        """True when the next frame may use flow instead of a FaceMesh inference"""
+        return not self._forced and self.box is not None and self._since_anchor < self.k - 1
+
+    def _gray_crop(self, frame: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+        x0, y0, x1, y1 = self.box
+        crop = frame[y0:y1, x0:x1]
+        if out is None or out.shape != crop.shape[:2]:
+            out = np.empty(crop.shape[:2], dtype=np.uint8)
+        return cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY, dst=out)
+
+    def anchor(self, frame: np.ndarray, eye_points: np.ndarray):
+        """Start propagating from landmarks FaceMesh just found on ``frame``"""
+        pts = eye_points.reshape(-1, 2)
+        if self._has_last:
+            # Motion since the previous frame's (anchored or propagated) position
+            self._adapt(float(np.median(np.linalg.norm(pts - self._last_points, axis=1))))
+        self._last_points[...] = pts
+        self._has_last = True
+
+        span = float(np.ptp(pts[:, 0])) or 1.0
+        pad = span * self.margin
+        h, w = frame.shape[:2]
+        x0 = max(0, int(pts[:, 0].min() - pad))
+        y0 = max(0, int(pts[:, 1].min() - pad))
+        x1 = min(w, int(pts[:, 0].max() + pad) + 1)
+        y1 = min(h, int(pts[:, 1].max() + pad) + 1)
+        if x1 - x0 < 8 or y1 - y0 < 8:
+            self.reset()
+            return
+
+        self.box = (x0, y0, x1, y1)
+        self._prev_gray = self._gray_crop(frame, self._prev_gray)
+        self._points[:, 0, 0] = pts[:, 0] - x0
+        self._points[:, 0, 1] = pts[:, 1] - y0
+        self._since_anchor = 0
+        self._forced = False
+        self.anchors += 1
+
+    def note_ear(self, ear: float):
+        """Feed back the current EAR; a closing eye forces the next inference"""
+        if ear < self.ear_guard and not self._forced:
+            self._forced = True
+            self.guarded += 1
+
+    def track(self, frame: np.ndarray, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Propagate the landmarks into ``frame``.
+
+        Returns:
+            (2, 6, 2) eye points in frame pixels, or None if FaceMesh must re-anchor
+        """
+        self._next_gray = self._gray_crop(frame, self._next_gray)
+        new_points, status, error = cv2.calcOpticalFlowPyrLK(
+            self._prev_gray, self._next_gray, self._points, None, **self.lk_params
+        )
+        self._since_anchor += 1
+
+        crop_h, crop_w = self._next_gray.shape
+        if (new_points is None or not status.all() or float(error.mean()) > self.max_error
+                or (new_points < 0).any() or (new_points[..., 0] >= crop_w).any()
+                or (new_points[..., 1] >= crop_h).any()):
+            self.reanchors += 1
+            self.k = max(1, self.k // 2)
+            self._forced = True
+            self._has_last = False
+            return None
+
+        self._adapt(float(np.median(np.linalg.norm((new_points - self._points).reshape(-1, 2), axis=1))))
+        self._points[...] = new_points
+        self._prev_gray, self._next_gray = self._next_gray, self._prev_gray
+        self.flow_frames += 1
+
+        if out is None:
+            out = np.empty((2, 6, 2), dtype=np.float32)
+        flat = out.reshape(-1, 2)
+        flat[:, 0] = new_points[:, 0, 0] + self.box[0]
+        flat[:, 1] = new_points[:, 0, 1] + self.box[1]
+        self._last_points[...] = flat
+        return out
+
+    def get_stats(self) -> dict:
+        """Get skip-frame counters"""
+        total = self.anchors + self.flow_frames
+        return {
+            'k': self.k,
+            'max_skip': self.max_skip,
+            'inferences': self.anchors,
+            'flow_frames': self.flow_frames,
+            'flow_ratio': round(self.flow_frames / total, 3) if total else 0.0,
+            'reanchors': self.reanchors,
+            'ear_guarded': self.guarded
+        }
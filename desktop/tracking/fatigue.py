@@ -0,0 +1,133 @@
+"""
+Streaming Fatigue Metrics
+PERCLOS (share of frames with the eyes closed) and the incomplete-blink ratio
+over a sliding window, kept as running sums over fixed-size rings.
+"""
+
+from typing import Dict, List, Optional
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class RunningWindow:
+    """
+    Ring of (timestamp, value) samples with a running sum over the trailing
+    ``window`` seconds.
+
+    push() adds the new sample to the sum and subtracts every sample that fell
+    out of the window (or out of the ring), so each sample is added and removed
+    exactly once: O(1) amortized per update, O(capacity) memory.
+    """
+
+    def __init__(self, window: float, capacity: int):
+        self.window_ns = int(window * NS_PER_SECOND)
+        self.capacity = capacity
+        self._times: List[int] = [0] * capacity
+        self._values: List[int] = [0] * capacity
+        self._head = 0  # Samples pushed; slot = index % capacity
+        self._tail = 0  # Oldest sample still inside the window
+        self.total = 0  # Running sum of values inside the window
+
+    def reset(self):
+        self._head = 0
+        self._tail = 0
+        self.total = 0
+
+    def push(self, timestamp_ns: int, value: int):
+        """Add a sample (non-decreasing timestamps) and expire old ones"""
+        if self._head - self._tail == self.capacity:
+            self.total -= self._values[self._tail % self.capacity]
+            self._tail += 1
+        slot = self._head % self.capacity
+        self._times[slot] = timestamp_ns
+        self._values[slot] = value
+        self._head += 1
+        self.total += value
+        self.expire(timestamp_ns)
+
+    def expire(self, now_ns: int):
+        """Drop samples older than the window relative to ``now_ns``"""
+        cutoff = now_ns - self.window_ns
+        times, values, capacity = self._times, self._values, self.capacity
+        while self._tail < self._head and times[self._tail % capacity] <= cutoff:
+            self.total -= values[self._tail % capacity]
+            self._tail += 1
+
+    @property
+    def count(self) -> int:
+        """Samples inside the window"""
+        return self._head - self._tail
+
+
+class FatigueMetrics:
+    """
+    PERCLOS and incomplete-blink ratio from the per-frame EAR stream.
+
+    A frame counts as closed for PERCLOS when the EAR is below ``closed_ear``.
+    An eyelid movement starts when the EAR drops below ``partial_ear`` and
+    ends when it rises above it again; it is incomplete if its minimum EAR
+    never reached ``closed_ear``. get_stats() expires the window against the
+    current time, so frames stop counting once they are ``window`` seconds
+    old even when no new frames arrive (no face, user away).
+    """
+
+    def __init__(self, window: float = 60.0, closed_ear: float = 0.21, partial_ear: float = 0.26,
+                 capacity: int = 4096, event_capacity: int = 512):
+        self.window = window
+        self.closed_ear = closed_ear
+        self.partial_ear = partial_ear
+        self._frames = RunningWindow(window, capacity)             # value: 1 if closed
+        self._movements = RunningWindow(window, event_capacity)    # value: 1 if incomplete
+        self._in_movement = False
+        self._movement_min = 1.0
+        self.last_timestamp_ns: Optional[int] = None
+
+    def reset(self):
+        self._frames.reset()
+        self._movements.reset()
+        self._in_movement = False
+        self._movement_min = 1.0
+        self.last_timestamp_ns = None
+
+    def update(self, ear: float, timestamp_ns: int):
+        """Feed one frame's EAR"""
+        self._frames.push(timestamp_ns, 1 if ear < self.closed_ear else 0)
+
+        if ear < self.partial_ear:
+            if not self._in_movement:
+                self._in_movement = True
+                self._movement_min = ear
+            elif ear < self._movement_min:
+                self._movement_min = ear
+        elif self._in_movement:
+            self._in_movement = False
+            self._movements.push(timestamp_ns, 0 if self._movement_min < self.closed_ear else 1)
+        else:
+            self._movements.expire(timestamp_ns)
+        self.last_timestamp_ns = timestamp_ns
+
+    @property
+    def perclos(self) -> float:
+        """Percentage of frames in the window with the eyes closed"""
+        count = self._frames.count
+        return 100.0 * self._frames.total / count if count else 0.0
+
+    @property
+    def incomplete_ratio(self) -> float:
+        """Share of eyelid movements in the window that did not close the eye"""
+        count = self._movements.count
+        return self._movements.total / count if count else 0.0
+
+    def get_stats(self, now_ns: Optional[int] = None) -> Dict[str, float]:
+        """PERCLOS and incomplete-blink figures, keyed by window length (expired against ``now_ns``)"""
+        if now_ns is not None:
+            self._frames.expire(now_ns)
+            self._movements.expire(now_ns)
+        suffix = f"{int(self.window)}s"
+        return {
+            f'perclos_{suffix}': round(self.perclos, 1),
+            f'perclos_frames_{suffix}': self._frames.count,
+            f'incomplete_blink_ratio_{suffix}': round(self.incomplete_ratio, 3),
+            f'incomplete_blinks_{suffix}': self._movements.total,
+            f'eyelid_movements_{suffix}': self._movements.count
+        }
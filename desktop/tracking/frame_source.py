@@ -0,0 +1,417 @@
+"""
+Frame Sources
+Pluggable frame providers for the blink pipeline: a live camera, replay of a
+video file or image directory, and a synthetic generator for machines without
+a webcam. All sources follow the cv2.VideoCapture read()/grab()/release()
+interface so they can be used anywhere a capture object is expected.
+"""
+
+import os
+import time
+import logging
+import cv2
+import numpy as np
+from typing import Optional, Tuple, Union, List
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+
+class FrameSource:
+    """
+    Base class for frame sources.
+
+    ``realtime`` sources deliver frames at their natural rate and may be
+    sampled (newest frame wins); offline sources are read as fast as the
+    consumer can process them and every frame should be used.
+    """
+
+    realtime = True
+
+    def __init__(self):
+        self.ended = False  # True once a finite source has delivered its last frame
+        self.frames_read = 0
+
+    @property
+    def fps(self) -> float:
+        """Nominal frame rate of the source"""
+        return 30.0
+
+    @property
+    def name(self) -> str:
+        return self.__class__.__name__
+
+    def open(self) -> bool:
+        """Open the underlying device or file"""
+        return True
+
+    def isOpened(self) -> bool:
+        return True
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        """Read the next frame, decoding into ``image`` when its shape matches"""
+        raise NotImplementedError
+
+    def grab(self) -> bool:
+        """Advance to the next frame without returning it"""
+        ret, _ = self.read()
+        return ret
+
+    def release(self):
+        """Release the underlying device or file"""
+        pass
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class CameraSource(FrameSource):
+    """
+    Live webcam through cv2.VideoCapture.
+
+    With ``auto_mode`` the requested size/rate/FOURCC come from the camera's
+    probed capabilities (cached per device, see camera_probe) instead of the
+    fixed defaults; ``mode`` holds what the driver actually negotiated.
+    """
+
+    def __init__(self, camera_index: int = 0, width: int = 640, height: int = 480,
+                 fps: float = 30.0, buffer_size: int = 1, fourcc: Optional[str] = None,
+                 auto_mode: bool = False):
+        super().__init__()
+        self.camera_index = camera_index
+        self.width = width
+        self.height = height
+        self.requested_fps = fps
+        self.buffer_size = buffer_size
+        self.fourcc = fourcc
+        self.auto_mode = auto_mode
+        self.mode: Optional[dict] = None  # Negotiated width/height/fps/fourcc after open()
+        self.cap: Optional[cv2.VideoCapture] = None
+
+    @property
+    def fps(self) -> float:
+        if self.cap is not None:
+            negotiated = self.cap.get(cv2.CAP_PROP_FPS)
+            if negotiated and negotiated > 0:
+                return negotiated
+        return self.requested_fps
+
+    @property
+    def name(self) -> str:
+        return f"camera:{self.camera_index}"
+
+    def open(self) -> bool:
+        started = time.perf_counter()
+        self.cap = cv2.VideoCapture(self.camera_index)
+        if not self.cap.isOpened():
+            return False
+
+        chosen = None
+        if self.auto_mode:
+            from .camera_probe import choose_camera_mode
+            try:
+                chosen = choose_camera_mode(self.camera_index, self.requested_fps, source=self)
+            except Exception as e:
+                logger.warning(f"Camera mode probe failed, using defaults: {e}")
+        if chosen is not None:
+            self.configure(chosen.width, chosen.height, chosen.fps, chosen.fourcc)
+        else:
+            self._apply_mode()
+
+        self.mode = self.negotiated_mode()
+        logger.info(f"Camera {self.camera_index} negotiated {self.mode} in "
+                    f"{(time.perf_counter() - started) * 1000:.0f} ms")
+        if chosen is not None and (self.mode['width'], self.mode['height']) != (chosen.width, chosen.height):
+            # The cached mode no longer holds (different device on this index, driver change)
+            from .camera_probe import forget_camera_mode
+            logger.warning(f"Camera did not accept cached mode {chosen}, re-probing on next start")
+            forget_camera_mode(self.camera_index)
+        return True
+
+    def configure(self, width: int, height: int, fps: float, fourcc: Optional[str] = None):
+        """Request a capture mode (applied immediately when open)"""
+        self.width = width
+        self.height = height
+        self.requested_fps = fps
+        self.fourcc = fourcc
+        if self.cap is not None:
+            self._apply_mode()
+
+    def _apply_mode(self):
+        # FOURCC first: V4L2 drivers may reset the frame size on a format change
+        if self.fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc.ljust(4)))
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.cap.set(cv2.CAP_PROP_FPS, self.requested_fps)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)  # Reduce buffer size for lower latency
+
+    def negotiated_mode(self) -> dict:
+        """Size, rate and FOURCC the driver reports for the open camera"""
+        if self.cap is None:
+            return {'width': 0, 'height': 0, 'fps': 0.0, 'fourcc': ''}
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        fourcc = ''.join(chr((code >> (8 * k)) & 0xFF) for k in range(4)).strip('\x00 ')
+        return {
+            'width': int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            'fps': round(float(self.cap.get(cv2.CAP_PROP_FPS) or 0.0), 3),
+            'fourcc': fourcc
+        }
+
+    def isOpened(self) -> bool:
+        return self.cap is not None and self.cap.isOpened()
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        if self.cap is None:
+            return False, None
+        ret, frame = self.cap.read(image) if image is not None else self.cap.read()
+        if ret:
+            self.frames_read += 1
+        return ret, frame
+
+    def grab(self) -> bool:
+        return self.cap is not None and self.cap.grab()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class _ReplayClock:
+    """Sleeps so that replayed frames are delivered at their recorded rate"""
+
+    def __init__(self, fps: float):
+        self.period = 1.0 / fps if fps > 0 else 0.0
+        self._start: Optional[float] = None
+        self._count = 0
+
+    def wait(self):
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        due = self._start + self._count * self.period
+        if due > now:
+            time.sleep(due - now)
+        self._count += 1
+
+
+class VideoFileSource(FrameSource):
+    """
+    Replay of a recorded video file or a directory of images.
+
+    With ``realtime=True`` frames are delivered at the recording's frame rate
+    (like a live camera); otherwise as fast as the consumer reads them.
+    """
+
+    def __init__(self, path: str, realtime: bool = False, loop: bool = False,
+                 fps: Optional[float] = None):
+        super().__init__()
+        self.path = path
+        self.realtime = realtime
+        self.loop = loop
+        self._fps_override = fps
+        self.cap: Optional[cv2.VideoCapture] = None
+        self._images: Optional[List[str]] = None
+        self._image_index = 0
+        self._clock: Optional[_ReplayClock] = None
+
+    @property
+    def is_image_directory(self) -> bool:
+        return os.path.isdir(self.path)
+
+    @property
+    def fps(self) -> float:
+        if self._fps_override:
+            return self._fps_override
+        if self.cap is not None:
+            recorded = self.cap.get(cv2.CAP_PROP_FPS)
+            if recorded and recorded > 0:
+                return recorded
+        return 30.0
+
+    @property
+    def name(self) -> str:
+        return self.path
+
+    def open(self) -> bool:
+        self.ended = False
+        if self.is_image_directory:
+            self._images = sorted(
+                os.path.join(self.path, entry) for entry in os.listdir(self.path)
+                if entry.lower().endswith(IMAGE_EXTENSIONS)
+            )
+            self._image_index = 0
+            opened = bool(self._images)
+        else:
+            self.cap = cv2.VideoCapture(self.path)
+            opened = self.cap.isOpened()
+
+        self._clock = _ReplayClock(self.fps) if self.realtime else None
+        if not opened:
+            logger.error(f"Could not open frame source: {self.path}")
+        return opened
+
+    def isOpened(self) -> bool:
+        if self._images is not None:
+            return bool(self._images)
+        return self.cap is not None and self.cap.isOpened()
+
+    def _read_image(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if self._image_index >= len(self._images):
+            if not self.loop:
+                return False, None
+            self._image_index = 0
+        frame = cv2.imread(self._images[self._image_index], cv2.IMREAD_COLOR)
+        self._image_index += 1
+        return frame is not None, frame
+
+    def _read_video(self, image: Optional[np.ndarray]) -> Tuple[bool, Optional[np.ndarray]]:
+        ret, frame = self.cap.read(image) if image is not None else self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(image) if image is not None else self.cap.read()
+        return ret, frame
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.isOpened():
+            return False, None
+
+        if self._clock is not None:
+            self._clock.wait()
+
+        if self._images is not None:
+            ret, frame = self._read_image()
+        else:
+            ret, frame = self._read_video(image)
+
+        if ret:
+            self.frames_read += 1
+        else:
+            self.ended = True
+        return ret, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        self._images = None
+
+
+class SyntheticSource(FrameSource):
+    """
+    Generated frames with a drawn face whose eyes close periodically.
+
+    Useful for throughput measurements and smoke tests on machines without a
+    webcam; FaceMesh is not guaranteed to find landmarks on the drawing.
+    """
+
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 30.0,
+                 num_frames: Optional[int] = None, realtime: bool = False,
+                 blink_interval: float = 3.0, blink_duration: float = 0.2, seed: int = 0):
+        super().__init__()
+        self.width = width
+        self.height = height
+        self._fps = fps
+        self.num_frames = num_frames  # None = endless
+        self.realtime = realtime
+        self.blink_interval = blink_interval
+        self.blink_duration = blink_duration
+        self._rng = np.random.default_rng(seed)
+        self._clock: Optional[_ReplayClock] = None
+        self._background: Optional[np.ndarray] = None
+
+    @property
+    def fps(self) -> float:
+        return self._fps
+
+    @property
+    def name(self) -> str:
+        return f"synthetic:{self.width}x{self.height}@{self._fps:g}"
+
+    def open(self) -> bool:
+        self.ended = False
+        self.frames_read = 0
+        self._clock = _ReplayClock(self._fps) if self.realtime else None
+        self._background = self._rng.integers(90, 130, (self.height, self.width, 3), dtype=np.uint8)
+        return True
+
+    def is_eye_closed(self, frame_index: int) -> bool:
+        """Ground truth for the generated frame: are the eyes drawn closed?"""
+        t = frame_index / self._fps
+        return (t % self.blink_interval) < self.blink_duration
+
+    def read(self, image: Optional[np.ndarray] = None) -> Tuple[bool, Optional[np.ndarray]]:
+        if self._background is None:
+            self.open()
+        if self.num_frames is not None and self.frames_read >= self.num_frames:
+            self.ended = True
+            return False, None
+
+        if self._clock is not None:
+            self._clock.wait()
+
+        if image is None or image.shape != self._background.shape:
+            image = np.empty_like(self._background)
+        np.copyto(image, self._background)
+
+        w, h = self.width, self.height
+        cx, cy = w // 2, h // 2
+        face_w, face_h = w // 6, h // 3
+        cv2.ellipse(image, (cx, cy), (face_w, face_h), 0, 0, 360, (140, 170, 210), -1)
+
+        eye_open_h = max(2, face_h // 10)
+        eye_h = 1 if self.is_eye_closed(self.frames_read) else eye_open_h
+        for dx in (-face_w // 2, face_w // 2):
+            center = (cx + dx, cy - face_h // 4)
+            cv2.ellipse(image, center, (face_w // 4, eye_open_h), 0, 0, 360, (255, 255, 255), -1)
+            cv2.ellipse(image, center, (face_w // 8, eye_h), 0, 0, 360, (40, 30, 20), -1)
+
+        self.frames_read += 1
+        return True, image
+
+    def release(self):
+        self._background = None
+
+
+def open_frame_source(spec: Union[int, str, FrameSource, None] = 0,
+                      realtime: Optional[bool] = None, auto_mode: bool = False) -> FrameSource:
+    """
+    Build a frame source from a simple specification.
+
+    Args:
+        spec: A FrameSource (returned as-is), a camera index (``0``/``"0"``),
+            a video file or image directory path, or ``"synthetic"`` /
+            ``"synthetic:640x480@30"``
+        realtime: Override whether replayed sources run at recorded speed
+        auto_mode: Pick the camera's capture mode from its probed capabilities
+            instead of the default 640x480 at 30 fps (cameras only)
+
+    Returns:
+        FrameSource: An unopened frame source
+    """
+    if isinstance(spec, FrameSource):
+        return spec
+    if spec is None:
+        spec = 0
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec), auto_mode=auto_mode)
+
+    if spec.startswith('synthetic'):
+        width, height, fps = 640, 480, 30.0
+        _, _, params = spec.partition(':')
+        if params:
+            size, _, rate = params.partition('@')
+            if size:
+                width, height = (int(v) for v in size.lower().split('x'))
+            if rate:
+                fps = float(rate)
+        return SyntheticSource(width, height, fps, realtime=bool(realtime))
+
+    return VideoFileSource(spec, realtime=bool(realtime))
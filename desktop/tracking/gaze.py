@@ -0,0 +1,170 @@
+"""
+Gaze Direction
+Coarse gaze direction (Straight/Up/Down/Left/Right) from landmarks FaceMesh
+already returns: head pose from the nose tip against the face outline, refined
+with the iris position between the eye corners when iris landmarks are present.
+Works on one frame or a whole trace of frames in the same NumPy expressions.
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+# Nose tip, forehead, chin and the two face sides (image left, image right)
+HEAD_INDICES = [1, 10, 152, 234, 454]
+# Iris centers (left eye, right eye); only present with refine_landmarks=True
+IRIS_INDICES = [468, 473]
+GAZE_INDICES = HEAD_INDICES + IRIS_INDICES
+
+DIRECTIONS = ('Straight', 'Up', 'Down', 'Left', 'Right')
+STRAIGHT, UP, DOWN, LEFT, RIGHT = range(len(DIRECTIONS))
+UNKNOWN = -1
+
+
+def new_gaze_buffer() -> np.ndarray:
+    """Allocate a (7, 2) float32 buffer for the head and iris pixel coordinates"""
+    return np.full((len(GAZE_INDICES), 2), np.nan, dtype=np.float32)
+
+
+def extract_gaze_points(landmarks, width: int, height: int,
+                        out: Optional[np.ndarray] = None,
+                        origin: Tuple[int, int] = (0, 0)) -> np.ndarray:
+    """
+    Copy the head (and, when available, iris) landmarks into a (7, 2) array
+    of pixel coordinates; iris rows stay NaN without refined landmarks.
+    Arguments as for landmarks.extract_eye_points().
+    """
+    if out is None:
+        out = new_gaze_buffer()
+
+    for k, index in enumerate(HEAD_INDICES):
+        point = landmarks[index]
+        out[k, 0] = point.x
+        out[k, 1] = point.y
+
+    iris = out[len(HEAD_INDICES):]
+    try:
+        for k, index in enumerate(IRIS_INDICES):
+            point = landmarks[index]
+            iris[k, 0] = point.x
+            iris[k, 1] = point.y
+    except (IndexError, KeyError):
+        iris[...] = np.nan
+
+    out[:, 0] = out[:, 0] * width + origin[0]
+    out[:, 1] = out[:, 1] * height + origin[1]
+    return out
+
+
+def gaze_features(eye_points: np.ndarray, gaze_points: np.ndarray,
+                  iris_weight: float = 1.0) -> np.ndarray:
+    """
+    Horizontal and vertical gaze offsets.
+
+    Args:
+        eye_points: (..., 2, 6, 2) eye landmarks (landmarks.extract_eye_points)
+        gaze_points: (..., 7, 2) head/iris landmarks (extract_gaze_points)
+        iris_weight: Weight of the iris offset added to the head pose
+
+    Returns:
+        (..., 2) array of (horizontal, vertical) offsets: head yaw/pitch as the
+        nose tip's offset from the face center in half face widths/heights,
+        plus the iris offset from the eye center in half eye widths. Positive
+        is image right / image down; NaN where the face geometry is degenerate.
+    """
+    g = np.asarray(gaze_points, dtype=np.float32)
+    e = np.asarray(eye_points, dtype=np.float32)
+    nose, forehead, chin, side_a, side_b = (g[..., k, :] for k in range(len(HEAD_INDICES)))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        face_w = np.abs(side_b[..., 0] - side_a[..., 0])
+        face_h = np.abs(chin[..., 1] - forehead[..., 1])
+        yaw = (2.0 * nose[..., 0] - side_a[..., 0] - side_b[..., 0]) / face_w
+        pitch = (2.0 * nose[..., 1] - forehead[..., 1] - chin[..., 1]) / face_h
+
+        # Iris against the eye: corners are points 0 and 3, lids points 1, 2, 4, 5
+        iris = g[..., len(HEAD_INDICES):, :]
+        corner_a, corner_b = e[..., 0, :], e[..., 3, :]
+        eye_w = np.abs(corner_b[..., 0] - corner_a[..., 0])
+        center_x = (corner_a[..., 0] + corner_b[..., 0]) / 2.0
+        center_y = e[..., [1, 2, 4, 5], 1].mean(axis=-1)
+        iris_h = np.mean(2.0 * (iris[..., 0] - center_x) / eye_w, axis=-1)
+        iris_v = np.mean(2.0 * (iris[..., 1] - center_y) / eye_w, axis=-1)
+
+    features = np.stack((yaw, pitch), axis=-1)
+    iris_offset = np.stack((iris_h, iris_v), axis=-1)
+    features += iris_weight * np.where(np.isnan(iris_offset), 0.0, iris_offset)
+    return features
+
+
+class GazeClassifier:
+    """
+    Thresholds gaze offsets into DIRECTIONS.
+
+    Offsets are taken relative to ``center``, the user's resting pose in front
+    of the screen: live use learns it as the median of the first
+    ``calibration_frames`` faces, offline use can fit it to a whole trace. The
+    axis with the larger offset (in threshold units) wins; Left/Right are from
+    the user's point of view for an unmirrored camera (``mirror`` flips them).
+    """
+
+    def __init__(self, yaw_thresh: float = 0.2, pitch_thresh: float = 0.12,
+                 mirror: bool = False, calibration_frames: int = 90):
+        self.thresholds = np.array([yaw_thresh, pitch_thresh], dtype=np.float32)
+        self.mirror = mirror
+        self.calibration_frames = calibration_frames
+        self.center = np.zeros(2, dtype=np.float32)
+        self.calibrated = False
+        self._samples = np.empty((calibration_frames, 2), dtype=np.float32)
+        self._sample_count = 0
+
+    def reset(self):
+        """Forget the learned center"""
+        self.center[...] = 0.0
+        self.calibrated = False
+        self._sample_count = 0
+
+    def fit_center(self, features: np.ndarray) -> np.ndarray:
+        """Set the center to the median offsets of a trace (NaN rows ignored)"""
+        features = np.asarray(features, dtype=np.float32).reshape(-1, 2)
+        valid = features[~np.isnan(features).any(axis=1)]
+        if len(valid):
+            self.center[...] = np.median(valid, axis=0)
+            self.calibrated = True
+        return self.center
+
+    def classify(self, features: np.ndarray) -> np.ndarray:
+        """
+        Direction codes (indices into DIRECTIONS, UNKNOWN for NaN) for
+        (..., 2) offsets.
+        """
+        d = (np.asarray(features, dtype=np.float32) - self.center) / self.thresholds
+        horizontal, vertical = np.abs(d[..., 0]), np.abs(d[..., 1])
+        # Nose towards the image left means the user turned to their right
+        right = d[..., 0] < 0
+        if self.mirror:
+            right = ~right
+
+        codes = np.full(d.shape[:-1], STRAIGHT, dtype=np.int8)
+        sideways = (horizontal >= 1.0) & (horizontal >= vertical)
+        tilted = (vertical >= 1.0) & ~sideways
+        codes[sideways] = np.where(right[sideways], RIGHT, LEFT)
+        codes[tilted] = np.where(d[..., 1][tilted] < 0, UP, DOWN)
+        codes[np.isnan(d).any(axis=-1)] = UNKNOWN
+        return codes
+
+    def update(self, features: np.ndarray) -> int:
+        """Classify one frame's offsets, learning the center from the first frames"""
+        if not self.calibrated and not np.isnan(features).any():
+            self._samples[self._sample_count] = features
+            self._sample_count += 1
+            if self._sample_count == self.calibration_frames:
+                self.fit_center(self._samples)
+            else:
+                return STRAIGHT  # Calibration assumes the user faces the screen
+        return int(self.classify(features))
+
+
+def direction_names(codes: np.ndarray) -> np.ndarray:
+    """Map direction codes to names ('Unknown' for UNKNOWN)"""
+    names = np.array(DIRECTIONS + ('Unknown',), dtype=object)
+    return names[np.asarray(codes, dtype=np.intp)]  # UNKNOWN (-1) picks the last entry
@@ -0,0 +1,312 @@
+"""
+Out-of-Process FaceMesh Inference
+Runs MediaPipe FaceMesh in a supervised worker process so the heavy native
+work does not contend for the GIL with Qt painting and the app's background
+threads. Frames are written (already converted to RGB) straight into a
+multiprocessing.shared_memory ring; only the few landmarks the tracker needs
+come back over a pipe. A crashed or hung worker is restarted with backoff,
+without blocking the tracking loop while the new worker loads.
+"""
+
+import time
+import logging
+import multiprocessing as mp_proc
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+from typing import Optional, Tuple, Dict, Any
+
+import numpy as np
+
+from .landmarks import EYE_INDICES
+from .roi import FACE_EXTENT_INDICES
+from .gaze import HEAD_INDICES
+
+logger = logging.getLogger(__name__)
+
+# Landmarks sent back per frame: the 12 eye points, the face extent points and the gaze head points
+RESULT_INDICES = ([int(i) for i in EYE_INDICES.flat] + list(FACE_EXTENT_INDICES)
+                  + [i for i in HEAD_INDICES if i not in FACE_EXTENT_INDICES])
+
+DEFAULT_FACE_MESH_OPTIONS = {
+    'max_num_faces': 1,
+    'refine_landmarks': False,
+    'min_detection_confidence': 0.3,
+    'min_tracking_confidence': 0.3
+}
+
+
+class _Point:
+    __slots__ = ('x', 'y')
+
+    def __init__(self, x: float, y: float):
+        self.x = x
+        self.y = y
+
+
+class SparseLandmarks:
+    """Indexable like ``face_landmarks.landmark`` but holding only RESULT_INDICES"""
+
+    _positions = {index: position for position, index in enumerate(RESULT_INDICES)}
+
+    def __init__(self, coords: np.ndarray):
+        self.coords = coords  # (len(RESULT_INDICES), 2) normalized x, y
+
+    def __getitem__(self, index: int) -> _Point:
+        x, y = self.coords[self._positions[index]]
+        return _Point(float(x), float(y))
+
+
+def _make_results(coords: Optional[np.ndarray]):
+    """Wrap returned landmarks like a FaceMesh result object"""
+    if coords is None:
+        return SimpleNamespace(multi_face_landmarks=None)
+    face = SimpleNamespace(landmark=SparseLandmarks(coords))
+    return SimpleNamespace(multi_face_landmarks=[face])
+
+
+def _worker_main(shm_name: str, slot_bytes: int, conn, options: Dict[str, Any]):
+    """Worker process entry point: FaceMesh over frames in shared memory"""
+    import mediapipe as mp
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        face_mesh = mp.solutions.face_mesh.FaceMesh(**options)
+        conn.send(('ready', None))
+
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+
+            seq, slot, height, width = message
+            frame = np.ndarray((height, width, 3), dtype=np.uint8, buffer=shm.buf,
+                               offset=slot * slot_bytes)
+            results = face_mesh.process(frame)
+            del frame
+
+            if results.multi_face_landmarks:
+                landmark = results.multi_face_landmarks[0].landmark
+                coords = np.array([(landmark[i].x, landmark[i].y) for i in RESULT_INDICES],
+                                  dtype=np.float32)
+                conn.send((seq, coords))
+            else:
+                conn.send((seq, None))
+
+        face_mesh.close()
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        shm.close()
+
+
+class SharedMemoryInference:
+    """
+    Client side of the inference worker.
+
+    Usage per frame:
+        rgb = inference.input_buffer(source.shape)
+        cv2.cvtColor(source, cv2.COLOR_BGR2RGB, dst=rgb)
+        results = inference.process(rgb)   # None if the worker is unavailable
+    """
+
+    def __init__(self, max_width: int = 1280, max_height: int = 720, slots: int = 2,
+                 options: Optional[Dict[str, Any]] = None, timeout: float = 1.0,
+                 startup_timeout: float = 30.0, max_backoff: float = 10.0):
+        self.max_width = max_width
+        self.max_height = max_height
+        self.slots = slots
+        self.slot_bytes = max_width * max_height * 3
+        self.options = dict(options or DEFAULT_FACE_MESH_OPTIONS)
+        self.timeout = timeout                  # Per-frame result timeout (seconds)
+        self.startup_timeout = startup_timeout  # Model load timeout (seconds)
+        self.max_backoff = max_backoff
+
+        self._context = mp_proc.get_context('spawn')
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._process = None
+        self._conn = None
+        self._slot = 0
+        self._seq = 0
+        self._ready = False
+        self._ready_deadline = 0.0
+
+        # Supervision state
+        self.restarts = 0
+        self.timeouts = 0
+        self._backoff = 0.5
+        self._next_restart = 0.0
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self) -> bool:
+        """Create the shared memory ring and start the worker, waiting for the model to load"""
+        if self._shm is None:
+            self._allocate()
+        self._spawn()
+        return self._check_ready(self.startup_timeout)
+
+    def _allocate(self):
+        self.slot_bytes = self.max_width * self.max_height * 3
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * self.slots)
+
+    def _release(self):
+        if self._shm is not None:
+            self._shm.close()
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+            self._shm = None
+
+    def _spawn(self):
+        """Start a worker process without waiting for it; it reports 'ready' once FaceMesh is loaded"""
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(self._shm.name, self.slot_bytes, child_conn, self.options),
+            daemon=True,
+            name="FaceMeshWorker"
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._ready = False
+        self._ready_deadline = time.monotonic() + self.startup_timeout
+
+    def _check_ready(self, wait: float = 0.0) -> bool:
+        """Poll for the worker's ready message; a worker that missed its startup deadline is killed"""
+        if self._ready:
+            return True
+        if self._conn is None:
+            return False
+        try:
+            if self._conn.poll(wait):
+                status, _ = self._conn.recv()
+                if status == 'ready':
+                    self._ready = True
+                    self._backoff = 0.5
+                    logger.info(f"Inference worker started (pid {self._process.pid})")
+                    return True
+            elif self.alive and time.monotonic() < self._ready_deadline:
+                return False  # Still loading the model
+        except (EOFError, OSError):
+            pass
+
+        logger.error("Inference worker failed to start")
+        self._kill()  # Replaced by the next restart, once the backoff has passed
+        return False
+
+    def _kill(self):
+        self._ready = False
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._process is not None:
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process.join(timeout=2.0)
+            self._process = None
+
+    def _restart(self):
+        """
+        Replace a crashed/hung worker, with exponential backoff between attempts.
+
+        Does not wait for the new worker to load its model: ``process`` returns
+        None until it reports ready, so the tracking loop is never blocked.
+        """
+        now = time.monotonic()
+        if now < self._next_restart:
+            return
+        self._kill()
+        self.restarts += 1
+        logger.warning(f"Restarting inference worker (restart #{self.restarts})")
+        self._spawn()
+        self._next_restart = now + self._backoff
+        self._backoff = min(self._backoff * 2, self.max_backoff)
+
+    def input_buffer(self, shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        Shared-memory array for the next frame, to be filled in place.
+
+        A frame larger than the ring was sized for grows the ring to fit it; the
+        worker is restarted on the new ring, so frames are skipped until it is ready.
+        """
+        height, width = shape[0], shape[1]
+        if width > self.max_width or height > self.max_height:
+            self._grow(width, height)
+        self._slot = (self._slot + 1) % self.slots
+        return np.ndarray((height, width, 3), dtype=np.uint8, buffer=self._shm.buf,
+                          offset=self._slot * self.slot_bytes)
+
+    def _grow(self, width: int, height: int):
+        """Reallocate the shared memory ring for larger frames and restart the worker on it"""
+        self.max_width = max(self.max_width, width)
+        self.max_height = max(self.max_height, height)
+        logger.info(f"Growing inference frame buffer to {self.max_width}x{self.max_height}")
+        self._kill()
+        self._release()
+        self._allocate()
+        self._spawn()
+
+    def process(self, rgb: np.ndarray):
+        """
+        Run FaceMesh in the worker on the frame in the current slot.
+
+        Returns:
+            A FaceMesh-like result, or None if the worker is down, still
+            starting or timed out
+        """
+        if self._process is None:
+            self._restart()
+            return None
+        if not self._check_ready():
+            return None
+        if not self.alive:
+            self._restart()
+            return None
+
+        self._seq += 1
+        seq = self._seq
+        try:
+            self._conn.send((seq, self._slot, rgb.shape[0], rgb.shape[1]))
+            deadline = time.monotonic() + self.timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._conn.poll(remaining):
+                    self.timeouts += 1
+                    logger.warning("Inference worker timed out")
+                    self._restart()
+                    return None
+                result_seq, coords = self._conn.recv()
+                if result_seq == seq:
+                    return _make_results(coords)
+                # Stale answer for an earlier, timed-out frame - keep waiting
+
+        except (EOFError, OSError, BrokenPipeError) as e:
+            logger.error(f"Inference worker connection lost: {e}")
+            self._restart()
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get supervision counters"""
+        return {
+            'alive': self.alive,
+            'ready': self._ready,
+            'pid': self._process.pid if self._process is not None else None,
+            'restarts': self.restarts,
+            'timeouts': self.timeouts
+        }
+
+    def close(self):
+        """Stop the worker and release the shared memory"""
+        if self._conn is not None:
+            try:
+                self._conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+        if self._process is not None:
+            self._process.join(timeout=2.0)
+        self._kill()
+        self._release()
@@ -0,0 +1,190 @@
+"""
+Landmark Stream Recording and Replay
+Compact binary columnar format for per-frame eye landmarks, EAR values and
+monotonic timestamps, so offline experiments can skip MediaPipe entirely.
+
+File layout (little-endian):
+    header   32 bytes  magic b"EYELMS01", uint32 version, uint32 column count,
+                       int64 start timestamp (monotonic ns), 8 reserved bytes
+    records  N fixed-width records, one per frame: int64 ns since the start
+             timestamp, then NUM_COLUMNS float32 values
+
+Records can be memory-mapped with NumPy (see read_landmark_stream). A file
+cut short by a crash stays readable up to the last complete record.
+"""
+
+import os
+import struct
+import logging
+import numpy as np
+from typing import Optional, Dict, Any
+
+from .blink_detector import detect
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"EYELMS01"
+VERSION = 2
+HEADER_FORMAT = "<8sIIq8x"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# Value columns of one record (after its int64 timestamp)
+COL_FACE = 0        # 1.0 if a face was found, else 0.0 (remaining columns NaN)
+COL_EAR_LEFT = 1
+COL_EAR_RIGHT = 2
+COL_EAR = 3         # mean of both eyes, the value the blink detector uses
+COL_POINTS = 4      # 24 columns: (2, 6, 2) eye landmark pixel coordinates
+NUM_COLUMNS = COL_POINTS + 24
+RECORD_DTYPE = np.dtype([('t_ns', '<i8'), ('values', '<f4', (NUM_COLUMNS,))])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+
+
+class LandmarkStreamWriter:
+    """Appends fixed-width float32 records to a landmark stream file"""
+
+    def __init__(self, path: str, flush_every: int = 300):
+        self.path = path
+        self.flush_every = flush_every  # Records between explicit flushes
+        self.records_written = 0
+        self.start_ns: Optional[int] = None
+        self._file = open(path, 'wb')
+        self._record = np.zeros((), dtype=RECORD_DTYPE)
+
+    def _write_header(self, start_ns: int):
+        self.start_ns = start_ns
+        self._file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, NUM_COLUMNS, start_ns))
+
+    def write(self, timestamp_ns: int, eye_points: Optional[np.ndarray] = None,
+              ears: Optional[np.ndarray] = None):
+        """
+        Append one frame.
+
+        Args:
+            timestamp_ns: Monotonic (or media) timestamp of the frame
+            eye_points: (2, 6, 2) eye landmarks, or None when no face was found
+                (or the detector gives no landmarks)
+            ears: (left, right) eye aspect ratios for the same frame
+        """
+        if self._file is None:
+            return
+        if self.start_ns is None:
+            self._write_header(timestamp_ns)
+
+        self._record['t_ns'] = timestamp_ns - self.start_ns
+        record = self._record['values']
+        if ears is None:
+            record[COL_FACE] = 0.0
+            record[COL_EAR_LEFT:] = np.nan
+        else:
+            record[COL_FACE] = 1.0
+            record[COL_EAR_LEFT] = ears[0]
+            record[COL_EAR_RIGHT] = ears[1]
+            record[COL_EAR] = (ears[0] + ears[1]) / 2.0
+            record[COL_POINTS:] = eye_points.reshape(-1) if eye_points is not None else np.nan
+
+        self._file.write(self._record.tobytes())
+        self.records_written += 1
+        if self.records_written % self.flush_every == 0:
+            self._file.flush()
+
+    def close(self):
+        """Flush and close the file"""
+        if self._file is None:
+            return
+        if self.start_ns is None:
+            self._write_header(0)
+        self._file.close()
+        self._file = None
+        logger.info(f"Landmark stream closed: {self.path} ({self.records_written} records)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class LandmarkStream:
+    """Read-only, memory-mapped view of a landmark stream file"""
+
+    def __init__(self, path: str, t_ns: np.ndarray, values: np.ndarray, start_ns: int):
+        self.path = path
+        self.t_ns = t_ns        # int64 ns since the start timestamp
+        self.values = values    # (N, NUM_COLUMNS) float32
+        self.start_ns = start_ns
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def t(self) -> np.ndarray:
+        """Seconds since the start timestamp (float64)"""
+        return self.t_ns / 1e9
+
+    @property
+    def face_found(self) -> np.ndarray:
+        return self.values[:, COL_FACE] > 0.5
+
+    @property
+    def ear(self) -> np.ndarray:
+        return self.values[:, COL_EAR]
+
+    @property
+    def ear_left(self) -> np.ndarray:
+        return self.values[:, COL_EAR_LEFT]
+
+    @property
+    def ear_right(self) -> np.ndarray:
+        return self.values[:, COL_EAR_RIGHT]
+
+    @property
+    def eye_points(self) -> np.ndarray:
+        """(N, 2, 6, 2) eye landmark pixel coordinates (NaN without a face)"""
+        return self.values[:, COL_POINTS:].reshape(-1, 2, 6, 2)
+
+
+def read_landmark_stream(path: str) -> LandmarkStream:
+    """
+    Memory-map a landmark stream file.
+
+    Raises:
+        ValueError: If the file is not a landmark stream
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"Not a landmark stream (truncated header): {path}")
+
+    magic, version, columns, start_ns = struct.unpack(HEADER_FORMAT, header)
+    if magic != MAGIC:
+        raise ValueError(f"Not a landmark stream: {path}")
+    if version != VERSION or columns != NUM_COLUMNS:
+        raise ValueError(f"Unsupported landmark stream version {version} ({columns} columns): {path}")
+
+    count = (os.path.getsize(path) - HEADER_SIZE) // RECORD_SIZE
+    if count == 0:
+        records = np.empty(0, dtype=RECORD_DTYPE)
+    else:
+        records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(count,))
+    return LandmarkStream(path, records['t_ns'], records['values'], start_ns)
+
+
+def replay_blinks(stream: LandmarkStream, ear_thresh: float = 0.21,
+                  consec_frames: int = 2) -> Dict[str, Any]:
+    """
+    Run the blink detector over a recorded stream (no camera, no inference).
+
+    Frames without a face leave the closed-frame counter untouched, exactly
+    like the live tracker.
+
+    Returns:
+        Dict with blink count and blink timestamps (seconds since stream start)
+    """
+    ear = np.where(stream.face_found, stream.ear, np.nan)
+    blink_times = detect(ear, stream.t, ear_thresh, consec_frames).end_t.tolist()
+
+    return {
+        'blink_count': len(blink_times),
+        'blink_timestamps': blink_times,
+        'frames': len(stream)
+    }
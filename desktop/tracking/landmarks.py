@@ -0,0 +1,70 @@
+"""
+Eye Landmark Extraction
+Pulls the 12 eye landmarks out of a MediaPipe face mesh into a preallocated
+(2, 6, 2) array and computes both eye aspect ratios in one NumPy expression.
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+# Eye landmark indices for left and right eyes (from MediaPipe Face Mesh)
+LEFT_EYE = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE = [362, 385, 387, 263, 373, 380]
+EYE_INDICES = np.array([LEFT_EYE, RIGHT_EYE], dtype=np.intp)
+
+# EAR = (|p1-p5| + |p2-p4|) / (2 * |p0-p3|): the three point pairs per eye
+_PAIR_FROM = np.array([1, 2, 0], dtype=np.intp)
+_PAIR_TO = np.array([5, 4, 3], dtype=np.intp)
+
+
+def new_eye_buffer() -> np.ndarray:
+    """Allocate a (2, 6, 2) float32 buffer for left/right eye pixel coordinates"""
+    return np.zeros((2, 6, 2), dtype=np.float32)
+
+
+def extract_eye_points(landmarks, width: int, height: int,
+                       out: Optional[np.ndarray] = None,
+                       origin: Tuple[int, int] = (0, 0)) -> np.ndarray:
+    """
+    Copy the 12 eye landmarks into a (2, 6, 2) array of pixel coordinates.
+
+    Args:
+        landmarks: Indexable landmark sequence (``face_landmarks.landmark``)
+        width: Width in pixels of the image the landmarks were computed on
+        height: Height in pixels of the image the landmarks were computed on
+        out: Optional preallocated buffer from new_eye_buffer()
+        origin: (x, y) offset of that image inside the full frame, used to
+            map landmarks from a region-of-interest crop back to the frame
+
+    Returns:
+        The filled buffer (row 0 = left eye, row 1 = right eye)
+    """
+    if out is None:
+        out = new_eye_buffer()
+
+    flat = out.reshape(12, 2)
+    for k, index in enumerate(EYE_INDICES.flat):
+        point = landmarks[index]
+        flat[k, 0] = point.x
+        flat[k, 1] = point.y
+
+    out[..., 0] *= width
+    out[..., 1] *= height
+    if origin != (0, 0):
+        out[..., 0] += origin[0]
+        out[..., 1] += origin[1]
+    return out
+
+
+def eye_aspect_ratios(points: np.ndarray) -> np.ndarray:
+    """
+    Compute the eye aspect ratio (EAR) for every eye in ``points``.
+
+    Works on a single eye (6, 2), a left/right pair (2, 6, 2) or a whole
+    trace of frames (N, 2, 6, 2); the trailing (6, 2) axes are reduced.
+    """
+    p = np.asarray(points, dtype=np.float32)
+    d = p[..., _PAIR_FROM, :] - p[..., _PAIR_TO, :]
+    dist = np.sqrt(np.einsum('...k,...k->...', d, d))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (dist[..., 0] + dist[..., 1]) / (2.0 * dist[..., 2])
@@ -0,0 +1,79 @@
+"""
+Presence Monitor
+Face presence state machine shared by the trackers: the user counts as away
+after ``absence_timeout`` seconds of frames without a face and as present
+again on the next face, with absence counters for the session statistics.
+"""
+
+from typing import Optional, Dict, Any
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class PresenceMonitor:
+    """
+    Presence from per-frame face detection results.
+
+    Timestamps are the frames' own (monotonic capture time for live sources,
+    media time for offline ones), so away time is measured on the same clock
+    as the blinks.
+    """
+
+    def __init__(self, absence_timeout: float = 10.0):
+        self.absence_timeout = absence_timeout
+        self.reset()
+
+    def reset(self):
+        """Present, with no absences recorded (new session)"""
+        self.present = True
+        self.away_count = 0
+        self._away_ns = 0
+        self._last_face_ns: Optional[int] = None
+        self._away_since_ns: Optional[int] = None
+
+    def update(self, face_found: bool, timestamp_ns: int) -> Optional[bool]:
+        """
+        Advance the state machine with one frame's result.
+
+        Returns:
+            The new presence state when it changed on this frame, else None
+        """
+        if face_found:
+            self._last_face_ns = timestamp_ns
+            if not self.present:
+                self.present = True
+                self._away_ns += max(0, timestamp_ns - self._away_since_ns)
+                self._away_since_ns = None
+                return True
+        elif self.present:
+            if self._last_face_ns is None:
+                self._last_face_ns = timestamp_ns
+            elif timestamp_ns - self._last_face_ns >= self.absence_timeout * NS_PER_SECOND:
+                self.present = False
+                self.away_count += 1
+                self._away_since_ns = timestamp_ns
+                return False
+        return None
+
+    def end_absence(self, now_ns: int) -> bool:
+        """Close an absence still in progress (tracking stopped); True if the user was away"""
+        if self.present:
+            return False
+        self.update(True, now_ns)
+        return True
+
+    def away_seconds(self, now_ns: int) -> float:
+        """Total time away, including an absence still in progress"""
+        away_ns = self._away_ns
+        if self._away_since_ns is not None:
+            away_ns += max(0, now_ns - self._away_since_ns)
+        return away_ns / NS_PER_SECOND
+
+    def get_stats(self, now_ns: int) -> Dict[str, Any]:
+        """Presence state, number of absences and total time away"""
+        return {
+            'user_present': self.present,
+            'away_count': self.away_count,
+            'away_seconds': round(self.away_seconds(now_ns), 1),
+            'absence_timeout': self.absence_timeout
+        }
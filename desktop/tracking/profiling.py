@@ -0,0 +1,157 @@
+"""
+Pipeline Profiling
+Low-overhead per-stage latency instrumentation for the tracking loop, using
+time.perf_counter_ns() laps and fixed-size log-scale histograms (constant
+memory no matter how long the session runs).
+"""
+
+import json
+import time
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Histogram resolution: SUB_BUCKETS buckets per power of two, up to 2**MAX_OCTAVE ns (~69 s)
+SUB_BUCKETS = 4
+MAX_OCTAVE = 36
+NUM_BUCKETS = MAX_OCTAVE * SUB_BUCKETS
+
+
+def _bucket_index(ns: int) -> int:
+    """Log-scale bucket for a duration: octave from bit_length, 2 mantissa bits"""
+    if ns < SUB_BUCKETS:
+        return max(ns, 0)
+    octave = ns.bit_length() - 1
+    index = octave * SUB_BUCKETS + ((ns >> (octave - 2)) & (SUB_BUCKETS - 1))
+    return min(index, NUM_BUCKETS - 1)
+
+
+def _bucket_upper_bound(index: int) -> int:
+    """Largest duration (ns) falling into a bucket"""
+    if index < 2 * SUB_BUCKETS:
+        return min(index, SUB_BUCKETS - 1)
+    octave, sub = divmod(index, SUB_BUCKETS)
+    return ((SUB_BUCKETS + sub + 1) << (octave - 2)) - 1
+
+
+class LatencyHistogram:
+    """Fixed-size log-scale histogram of durations in nanoseconds"""
+
+    __slots__ = ('counts', 'count', 'total_ns', 'min_ns', 'max_ns')
+
+    def __init__(self):
+        self.counts: List[int] = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int):
+        """Add one duration"""
+        self.counts[_bucket_index(ns)] += 1
+        if self.count == 0 or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.count += 1
+        self.total_ns += ns
+
+    def percentile(self, p: float) -> int:
+        """Approximate p-th percentile (ns), accurate to the bucket width (~19%)"""
+        if self.count == 0:
+            return 0
+        rank = max(1, int(round(p / 100.0 * self.count)))
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return min(_bucket_upper_bound(index), self.max_ns)
+        return self.max_ns
+
+    def reset(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def summary(self) -> Dict[str, float]:
+        """Count, mean and percentiles in milliseconds"""
+        mean_ns = self.total_ns / self.count if self.count else 0.0
+        return {
+            'count': self.count,
+            'mean_ms': round(mean_ns / 1e6, 3),
+            'p50_ms': round(self.percentile(50) / 1e6, 3),
+            'p90_ms': round(self.percentile(90) / 1e6, 3),
+            'p99_ms': round(self.percentile(99) / 1e6, 3),
+            'min_ms': round(self.min_ns / 1e6, 3),
+            'max_ms': round(self.max_ns / 1e6, 3)
+        }
+
+
+class PipelineProfiler:
+    """
+    Per-stage latency histograms for the tracking loop.
+
+    Usage inside the hot path (one perf_counter_ns call per stage):
+        t = profiler.start()
+        ...read frame...
+        t = profiler.lap('capture', t)
+        ...inference...
+        t = profiler.lap('inference', t)
+    """
+
+    def __init__(self, stages: Optional[List[str]] = None, enabled: bool = True):
+        self.enabled = enabled
+        self.stages: Dict[str, LatencyHistogram] = {}
+        for stage in stages or []:
+            self.stages[stage] = LatencyHistogram()
+
+    @staticmethod
+    def start() -> int:
+        return time.perf_counter_ns()
+
+    def lap(self, stage: str, start_ns: int) -> int:
+        """Record the time since ``start_ns`` under ``stage`` and return the current time"""
+        now = time.perf_counter_ns()
+        if self.enabled:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = LatencyHistogram()
+            histogram.record(now - start_ns)
+        return now
+
+    def record(self, stage: str, duration_ns: int):
+        """Record an externally measured duration"""
+        if self.enabled:
+            histogram = self.stages.get(stage)
+            if histogram is None:
+                histogram = self.stages[stage] = LatencyHistogram()
+            histogram.record(duration_ns)
+
+    def reset(self):
+        for histogram in self.stages.values():
+            histogram.reset()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Summary per stage (count, mean and percentiles in ms)"""
+        return {stage: histogram.summary() for stage, histogram in list(self.stages.items())}
+
+    def dump(self, path: str):
+        """Write the current summary and raw bucket counts to a JSON file"""
+        data = {
+            'generated_at': time.time(),
+            'stages': self.snapshot(),
+            'histograms': {
+                stage: {
+                    'bucket_upper_ns': [_bucket_upper_bound(i) for i in range(NUM_BUCKETS)
+                                        if histogram.counts[i]],
+                    'counts': [c for c in histogram.counts if c]
+                }
+                for stage, histogram in list(self.stages.items())
+            }
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+        logger.info(f"Pipeline profile written to {path}")
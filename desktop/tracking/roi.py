@@ -0,0 +1,131 @@
+"""
+Face Region-of-Interest Tracking
+Keeps a padded box around the last detected face so FaceMesh can run on a
+crop instead of the full camera frame, falling back to full-frame detection
+when tracking is lost.
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+# Face Mesh landmarks at the extremes of the face: forehead, chin, cheeks
+FACE_EXTENT_INDICES = [10, 152, 234, 454]
+
+Box = Tuple[int, int, int, int]  # x0, y0, x1, y1 in frame pixels
+
+
+class FaceROITracker:
+    """
+    Region-of-interest tracker for the face mesh input.
+
+    The box is built from the face extent landmarks, padded on each side,
+    snapped to a coarse grid and clamped to the frame. It is kept with
+    hysteresis: after an inference it only moves when the face comes within
+    ``margin`` (a fraction of the face size) of one of its edges, or when the
+    face size asks for a box more than ``resize_threshold`` larger or smaller.
+    Landmark noise therefore leaves the crop, and the model input, unchanged.
+    """
+
+    def __init__(self, padding: float = 0.35, min_size: int = 128, grid: int = 16,
+                 margin: float = 0.1, resize_threshold: float = 0.2):
+        self.padding = padding    # Fraction of the face size added on each side
+        self.min_size = min_size  # Smallest crop edge in pixels
+        self.grid = grid          # Box corners are snapped to this many pixels
+        self.margin = margin      # Face-to-edge distance (fraction of face size) that moves the box
+        self.resize_threshold = resize_threshold  # Relative size change that rebuilds the box
+        self.box: Optional[Box] = None
+        self._half = 0.0          # Unclamped half edge the box was built for
+
+        # Counters
+        self.roi_inferences = 0
+        self.full_inferences = 0
+        self.tracking_lost = 0
+        self.box_updates = 0
+        self._points = np.zeros((len(FACE_EXTENT_INDICES), 2), dtype=np.float32)
+
+    def select(self, frame: np.ndarray) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """
+        Pick the image to run inference on.
+
+        Returns:
+            (crop view or full frame, (x, y) origin of that image in the frame)
+        """
+        if self.box is None:
+            self.full_inferences += 1
+            return frame, (0, 0)
+
+        x0, y0, x1, y1 = self.box
+        self.roi_inferences += 1
+        return frame[y0:y1, x0:x1], (x0, y0)
+
+    def update(self, landmarks, origin: Tuple[int, int], image_size: Tuple[int, int],
+               frame_size: Tuple[int, int]):
+        """
+        Move or rebuild the box if the landmarks found on the selected image ask for it.
+
+        Args:
+            landmarks: Indexable landmark sequence (normalized to the selected image)
+            origin: (x, y) origin of the selected image in the frame
+            image_size: (width, height) of the selected image
+            frame_size: (width, height) of the full frame
+        """
+        width, height = image_size
+        for k, index in enumerate(FACE_EXTENT_INDICES):
+            point = landmarks[index]
+            self._points[k, 0] = point.x * width + origin[0]
+            self._points[k, 1] = point.y * height + origin[1]
+
+        (fx0, fy0), (fx1, fy1) = self._points.min(axis=0), self._points.max(axis=0)
+        size = max(fx1 - fx0, fy1 - fy0, 1.0)
+        pad = size * self.padding
+        half = max(size / 2.0 + pad, self.min_size / 2.0)
+        cx, cy = (fx0 + fx1) / 2.0, (fy0 + fy1) / 2.0
+
+        frame_w, frame_h = frame_size
+        if self.box is not None:
+            # An edge on the frame border cannot move further out: it never triggers a move
+            x0, y0, x1, y1 = self.box
+            inset = size * self.margin
+            inside = ((x0 == 0 or fx0 - x0 >= inset) and (y0 == 0 or fy0 - y0 >= inset)
+                      and (x1 == frame_w or x1 - fx1 >= inset) and (y1 == frame_h or y1 - fy1 >= inset))
+            if inside and abs(half - self._half) <= self.resize_threshold * self._half:
+                return
+
+        g = self.grid
+        x0 = max(0, int((cx - half) // g * g))
+        y0 = max(0, int((cy - half) // g * g))
+        x1 = min(frame_w, int(-(-(cx + half) // g) * g))
+        y1 = min(frame_h, int(-(-(cy + half) // g) * g))
+
+        if x1 - x0 < self.min_size or y1 - y0 < self.min_size:
+            self.box = None
+        else:
+            if self.box != (x0, y0, x1, y1):
+                self.box_updates += 1
+            self.box = (x0, y0, x1, y1)
+            self._half = half
+
+    def lost(self):
+        """Drop the box so the next frame goes through full-frame detection"""
+        if self.box is not None:
+            self.tracking_lost += 1
+        self.box = None
+
+    def reset(self):
+        """Forget the box and counters"""
+        self.box = None
+        self.roi_inferences = 0
+        self.full_inferences = 0
+        self.tracking_lost = 0
+        self.box_updates = 0
+
+    def get_stats(self) -> dict:
+        """Get ROI usage counters"""
+        return {
+            'roi_active': self.box is not None,
+            'roi_box': self.box,
+            'roi_inferences': self.roi_inferences,
+            'full_frame_inferences': self.full_inferences,
+            'tracking_lost': self.tracking_lost,
+            'box_updates': self.box_updates
+        }
@@ -0,0 +1,220 @@
+"""
+Blink Detector Tuning
+Grid search of the blink detector parameters (EAR threshold and confirming
+closed frames) against labeled EAR traces, scored with the vectorized detector
+and fanned out over a process pool. Traces come from cached landmark streams,
+so tuning runs no inference and finishes in well under a second per recording.
+
+The best parameters can be stored per user in the local database, where the
+desktop app picks them up when tracking starts.
+
+Usage:
+    python -m desktop.tracking.tuning labels.json recording.lms
+    python -m desktop.tracking.tuning labels.json recording.lms labels2.json recording2.lms
+    python -m desktop.tracking.tuning labels.json recording.lms --db eye_tracker.db --user-id <id>
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import numpy as np
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Sequence, Tuple, Dict, Any, List
+
+from .landmark_stream import read_landmark_stream
+from .blink_detector import EAR_THRESH, CONSEC_FRAMES, detect
+from .benchmark import load_labels, closed_runs, event_metrics
+
+logger = logging.getLogger(__name__)
+
+# Default search grid around the stock parameters
+THRESHOLDS = tuple(np.round(np.arange(0.14, 0.32, 0.005), 3).tolist())
+CONSEC_FRAMES_GRID = (1, 2, 3, 4)
+
+# Below this many frame evaluations (frames x grid points) a pool costs more than it saves
+POOL_MIN_WORK = 2_000_000
+
+
+@dataclass
+class LabeledTrace:
+    """Per-frame EAR (NaN without a face) and the labeled blinks of one recording"""
+    name: str
+    ear: np.ndarray
+    true_runs: np.ndarray  # Labeled closed intervals as (start, end) pairs
+
+    def __len__(self) -> int:
+        return len(self.ear)
+
+
+def load_trace(labels_path: str, stream_path: str) -> LabeledTrace:
+    """Pair a label file with the cached landmark stream of the same recording"""
+    labels = load_labels(labels_path)
+    stream = read_landmark_stream(stream_path)
+    ear = np.where(stream.face_found, stream.ear, np.nan).astype(np.float32)
+
+    n = min(len(ear), len(labels['closed']))
+    if len(ear) != len(labels['closed']):
+        logger.warning(f"Frame count mismatch in {stream_path}: {len(ear)} frames vs "
+                       f"{len(labels['closed'])} labels, using the first {n}")
+    return LabeledTrace(name=stream_path, ear=ear[:n], true_runs=closed_runs(labels['closed'][:n]))
+
+
+def score_params(traces: Sequence[LabeledTrace], ear_thresh: float, consec_frames: int,
+                 tolerance: int = 2) -> Dict[str, Any]:
+    """Blink event precision/recall/F1 of one parameter set, pooled over all traces"""
+    tp = n_pred = n_true = 0
+    for trace in traces:
+        runs = detect(trace.ear, ear_thresh=ear_thresh, consec_frames=consec_frames)
+        metrics = event_metrics(runs.intervals, trace.true_runs, tolerance)
+        tp += metrics['true_positives']
+        n_pred += metrics['predicted_blinks']
+        n_true += metrics['labeled_blinks']
+
+    precision = tp / n_pred if n_pred else 0.0
+    recall = tp / n_true if n_true else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        'ear_thresh': ear_thresh,
+        'consec_frames': consec_frames,
+        'precision': round(precision, 4),
+        'recall': round(recall, 4),
+        'f1': round(f1, 4),
+        'true_positives': tp,
+        'predicted_blinks': n_pred,
+        'labeled_blinks': n_true
+    }
+
+
+# Traces handed to each pool worker once, instead of with every chunk
+_worker_traces: List[LabeledTrace] = []
+
+
+def _init_worker(traces: List[LabeledTrace]):
+    global _worker_traces
+    _worker_traces = traces
+
+
+def _score_chunk(grid: List[Tuple[float, int]], tolerance: int) -> List[Dict[str, Any]]:
+    return [score_params(_worker_traces, thresh, consec, tolerance) for thresh, consec in grid]
+
+
+def _score_serial(traces: List[LabeledTrace], grid: List[Tuple[float, int]],
+                  tolerance: int) -> List[Dict[str, Any]]:
+    return [score_params(traces, thresh, consec, tolerance) for thresh, consec in grid]
+
+
+def _rank(result: Dict[str, Any]) -> Tuple[float, float, float]:
+    # Best F1; ties go to the parameters closest to the stock detector
+    return (result['f1'], -abs(result['ear_thresh'] - EAR_THRESH),
+            -abs(result['consec_frames'] - CONSEC_FRAMES))
+
+
+def tune(traces: Sequence[LabeledTrace], thresholds: Sequence[float] = THRESHOLDS,
+         consec_frames: Sequence[int] = CONSEC_FRAMES_GRID, tolerance: int = 2,
+         workers: Optional[int] = None, top: int = 5) -> Dict[str, Any]:
+    """
+    Score every (threshold, closed frames) pair and pick the best.
+
+    Args:
+        traces: Labeled recordings, scored together
+        thresholds: EAR thresholds to try
+        consec_frames: Confirming closed-frame counts to try
+        tolerance: Event matching tolerance (frames)
+        workers: Pool size (default: CPU count); 1, or a search too small to
+            pay for starting processes, runs in this process
+        top: Number of runner-up parameter sets to report
+
+    Returns:
+        Report with 'best', 'default' (stock parameters) and 'top' results
+    """
+    traces = list(traces)
+    grid = [(float(t), int(c)) for c in consec_frames for t in thresholds]
+    if not grid or not traces:
+        raise ValueError("Nothing to tune: need at least one trace and one grid point")
+
+    started = time.perf_counter()
+    frames = sum(len(trace) for trace in traces)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(grid)))
+    if frames * len(grid) < POOL_MIN_WORK:
+        workers = 1
+
+    if workers == 1:
+        results = _score_serial(traces, grid, tolerance)
+    else:
+        # Interleaved chunks, so every worker gets a mix of cheap and costly settings
+        chunks = [grid[k::workers] for k in range(workers)]
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(traces,)) as pool:
+                results = [result for chunk in pool.map(_score_chunk, chunks, [tolerance] * workers)
+                           for result in chunk]
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"Process pool unavailable ({e}), tuning in this process")
+            workers = 1
+            results = _score_serial(traces, grid, tolerance)
+
+    results.sort(key=_rank, reverse=True)
+    return {
+        'traces': [trace.name for trace in traces],
+        'frames': frames,
+        'grid_points': len(grid),
+        'workers': workers,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        'best': results[0],
+        'default': score_params(traces, EAR_THRESH, CONSEC_FRAMES, tolerance),
+        'top': results[:top]
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Tune the blink detector against labeled recordings")
+    parser.add_argument('pairs', nargs='+', metavar='LABELS STREAM',
+                        help='label JSON file followed by its cached landmark stream, repeated')
+    parser.add_argument('--thresh-min', type=float, default=THRESHOLDS[0])
+    parser.add_argument('--thresh-max', type=float, default=THRESHOLDS[-1])
+    parser.add_argument('--thresh-step', type=float, default=0.005)
+    parser.add_argument('--consec-frames', type=int, nargs='+', default=list(CONSEC_FRAMES_GRID))
+    parser.add_argument('--tolerance', type=int, default=2, help='event matching tolerance (frames)')
+    parser.add_argument('--workers', type=int, help='process pool size (default: CPU count)')
+    parser.add_argument('--db', help='local database to store the best parameters in')
+    parser.add_argument('--user-id', help='user the parameters belong to (with --db)')
+    parser.add_argument('-o', '--output', help='write the JSON report to a file')
+    args = parser.parse_args(argv)
+
+    if len(args.pairs) % 2:
+        parser.error("expected LABELS STREAM pairs")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    traces = [load_trace(args.pairs[k], args.pairs[k + 1]) for k in range(0, len(args.pairs), 2)]
+    thresholds = np.round(np.arange(args.thresh_min, args.thresh_max + args.thresh_step / 2,
+                                    args.thresh_step), 3).tolist()
+    report = tune(traces, thresholds, args.consec_frames, args.tolerance, args.workers)
+
+    if args.db:
+        from ..database import SQLiteManager
+
+        best = report['best']
+        db = SQLiteManager(args.db, user_data={'id': args.user_id} if args.user_id else None)
+        try:
+            report['saved_id'] = db.save_detector_params(best['ear_thresh'], best['consec_frames'],
+                                                         f1=best['f1'], frames=report['frames'])
+        finally:
+            db.close()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Vision Pre-warm
+Background start-up of the heavy tracking pieces (OpenCV/MediaPipe imports,
+landmark model, camera open and first frame) while the user is still at the
+login window, so pressing Start only has to hand them over.
+"""
+
+import time
+import logging
+import threading
+from importlib import import_module
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Heavy third-party modules imported up front; the tracker's own modules follow
+WARM_MODULES = ('numpy', 'cv2', 'mediapipe')
+
+
+class VisionPrewarmer:
+    """
+    Prepares a camera source and a landmark backend on a daemon thread.
+
+    The tracker claims them with take_camera()/take_backend(), which wait up
+    to ``claim_timeout`` seconds for a warm-up still in progress rather than
+    have the tracker open a second camera and model next to it. On timeout the
+    warm-up is cancelled and whatever it still finishes is released. Anything
+    not claimed within ``hold_seconds`` after warm-up is released again, so the
+    camera is not kept busy by a login window that is left open.
+    """
+
+    def __init__(self, camera_index: int = 0, backend: str = 'facemesh',
+                 backend_options: Optional[Dict[str, Any]] = None,
+                 open_camera: bool = True, hold_seconds: float = 120.0,
+                 auto_camera_mode: bool = False, claim_timeout: float = 10.0):
+        self.camera_index = camera_index
+        self.auto_camera_mode = auto_camera_mode  # Probed capture mode instead of 640x480@30
+        self.backend_name = backend
+        self.backend_options = backend_options or {}
+        self.open_camera = open_camera
+        self.hold_seconds = hold_seconds
+        self.claim_timeout = claim_timeout
+
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._backend_done = threading.Event()  # Model stage over (loaded or not)
+        self._cancelled = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._camera = None
+        self._backend = None
+        self.timings_ms: Dict[str, float] = {}
+        self.error: Optional[str] = None
+
+    def start(self):
+        """Start warming up in the background (no-op if already started)"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True, name="VisionPrewarm")
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the warm-up to finish; False on timeout or if never started"""
+        return self._thread is not None and self._done.wait(timeout)
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def _lap(self, stage: str, started: float) -> float:
+        now = time.perf_counter()
+        self.timings_ms[stage] = round((now - started) * 1000, 1)
+        return now
+
+    def _run(self):
+        try:
+            t = time.perf_counter()
+            for name in WARM_MODULES:
+                try:
+                    import_module(name)
+                except ImportError as e:
+                    logger.warning(f"Pre-warm could not import {name}: {e}")
+            t = self._lap('imports', t)
+
+            import cv2
+            import numpy as np
+            from .backends import create_backend
+            from .frame_source import CameraSource
+
+            backend = create_backend(self.backend_name, **self.backend_options)
+            if backend.open():
+                # The first inference initializes the graph; do it on a blank frame
+                shape = (240, 320) if backend.input_color == cv2.COLOR_BGR2GRAY else (240, 320, 3)
+                backend.process(np.zeros(shape, dtype=np.uint8), 0)
+                if not self._hold('_backend', backend):
+                    backend.close()
+            self._backend_done.set()
+            t = self._lap('model', t)
+
+            if self.open_camera and not self._cancelled.is_set():
+                camera = CameraSource(self.camera_index, auto_mode=self.auto_camera_mode)
+                if camera.open():
+                    camera.read()  # First read completes format negotiation
+                    if not self._hold('_camera', camera):
+                        camera.release()
+                else:
+                    camera.release()
+                self._lap('camera', t)
+
+            logger.info(f"Vision pre-warm finished: {self.timings_ms}")
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Vision pre-warm failed: {e}")
+        finally:
+            self._backend_done.set()
+            self._done.set()
+
+        # Release whatever the tracker did not claim in time
+        if not self._cancelled.wait(self.hold_seconds):
+            self.close()
+
+    def _hold(self, attr: str, resource) -> bool:
+        """Keep a finished resource for the tracker; False if the warm-up was cancelled meanwhile"""
+        with self._lock:
+            if self._cancelled.is_set():
+                return False
+            setattr(self, attr, resource)
+            return True
+
+    def _wait_for(self, stage: threading.Event, what: str) -> bool:
+        """Wait for a warm-up stage still in progress; on timeout cancel the warm-up"""
+        if self._thread is None or self._cancelled.is_set() or stage.wait(self.claim_timeout):
+            return True
+        logger.warning(f"Pre-warm {what} not ready after {self.claim_timeout:g} s, opening it directly")
+        self.close()
+        return False
+
+    def take_camera(self, camera_index: int):
+        """Hand over the opened camera source if it matches ``camera_index``, else None"""
+        if not self._wait_for(self._done, 'camera'):
+            return None
+        with self._lock:
+            camera = self._camera
+            if camera is None or camera.camera_index != camera_index:
+                return None
+            self._camera = None
+            return camera
+
+    def take_backend(self, name: str, options: Optional[Dict[str, Any]] = None):
+        """Hand over the loaded backend if it is ``name`` built with ``options``, else None"""
+        # Unset (None/False) options mean the backend default on both sides
+        wanted = {key: value for key, value in (options or {}).items() if value}
+        built = {key: value for key, value in self.backend_options.items() if value}
+        if not self._wait_for(self._backend_done, 'model'):
+            return None
+        with self._lock:
+            backend = self._backend
+            if backend is None or backend.name != name or wanted != built:
+                return None
+            self._backend = None
+            return backend
+
+    def close(self):
+        """Release anything not handed over and stop holding resources"""
+        self._cancelled.set()
+        with self._lock:
+            camera, self._camera = self._camera, None
+            backend, self._backend = self._backend, None
+        if camera is not None:
+            camera.release()
+        if backend is not None:
+            backend.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Warm-up timings and what is still waiting to be claimed"""
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'timings_ms': dict(self.timings_ms),
+                'camera_held': self._camera is not None,
+                'backend_held': self._backend is not None,
+                'error': self.error
+            }
@@ -0,0 +1,146 @@
+"""
+Capture Watchdog
+Notices when a live camera stops delivering (read failure, stall, or
+repeated frame-time spikes) and paces the in-place reopen attempts with
+exponential backoff, keeping counters for the session statistics.
+"""
+
+from collections import deque
+from typing import Optional, Dict, Any
+
+NS_PER_SECOND = 1_000_000_000
+
+# Recovery reasons
+READ_FAILURE = 'read_failure'
+STALL = 'stall'
+SPIKES = 'frame_spikes'
+
+
+class CaptureWatchdog:
+    """
+    Decides when the capture has to be reopened and when to try again.
+
+    A stall is no frame for ``stall_timeout`` seconds (or four expected frame
+    intervals, if longer). A spike is a capture interval above ``spike_factor``
+    expected intervals (at least ``spike_min`` seconds); ``spike_limit`` spikes
+    within ``spike_window`` seconds also trigger a reopen. Reopen attempts wait
+    ``backoff_initial`` seconds, doubling up to ``backoff_max`` while attempts
+    keep failing or the camera drops again within ``stable_after`` seconds.
+    """
+
+    def __init__(self, stall_timeout: float = 3.0, spike_factor: float = 4.0, spike_min: float = 0.5,
+                 spike_limit: int = 5, spike_window: float = 30.0, backoff_initial: float = 0.5,
+                 backoff_max: float = 30.0, stable_after: float = 10.0):
+        self.stall_timeout_ns = int(stall_timeout * NS_PER_SECOND)
+        self.spike_factor = spike_factor
+        self.spike_min_ns = int(spike_min * NS_PER_SECOND)
+        self.spike_limit = spike_limit
+        self.spike_window_ns = int(spike_window * NS_PER_SECOND)
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.stable_after_ns = int(stable_after * NS_PER_SECOND)
+        self._spike_times = deque(maxlen=spike_limit)
+        self.reset()
+
+    def reset(self):
+        """Clear timers and counters (new session)"""
+        self.rearm()
+        self._attempts_in_row = 0
+        self._recovered_ns: Optional[int] = None
+        self._outage_started_ns: Optional[int] = None
+        self.stalls = 0
+        self.read_failures = 0
+        self.frame_spikes = 0
+        self.recoveries = 0
+        self.reopen_attempts = 0
+        self.reopen_failures = 0
+        self.downtime_ns = 0
+        self.last_reason: Optional[str] = None
+
+    def rearm(self):
+        """Forget the last frame (after a pause or a reopen), so no stall is reported for the gap"""
+        self._last_frame_ns: Optional[int] = None
+        self._last_captured = 0
+        self._spike_times.clear()
+
+    def frame_arrived(self, timestamp_ns: int, frames_captured: int,
+                      expected_interval: float) -> Optional[str]:
+        """
+        Note a processed frame.
+
+        Args:
+            timestamp_ns: Monotonic capture time of the frame
+            frames_captured: Frames the capture thread has published so far; frames
+                skipped while processing was busy do not count as a camera gap
+            expected_interval: Nominal seconds between captured frames
+
+        Returns:
+            SPIKES when the capture should be reopened, else None
+        """
+        reason = None
+        if self._last_frame_ns is not None and frames_captured > self._last_captured:
+            interval_ns = (timestamp_ns - self._last_frame_ns) // (frames_captured - self._last_captured)
+            if interval_ns > max(self.spike_min_ns, self.spike_factor * expected_interval * NS_PER_SECOND):
+                self.frame_spikes += 1
+                self._spike_times.append(timestamp_ns)
+                if (len(self._spike_times) == self.spike_limit
+                        and timestamp_ns - self._spike_times[0] <= self.spike_window_ns):
+                    reason = SPIKES
+        self._last_frame_ns = timestamp_ns
+        self._last_captured = frames_captured
+
+        if self._recovered_ns is not None and timestamp_ns - self._recovered_ns >= self.stable_after_ns:
+            # Stable again: the next outage starts with the shortest backoff
+            self._attempts_in_row = 0
+            self._recovered_ns = None
+        return reason
+
+    def check(self, now_ns: int, failed: bool, expected_interval: float) -> Optional[str]:
+        """Called when no frame was available: READ_FAILURE, STALL or None"""
+        if failed:
+            self.read_failures += 1
+            return READ_FAILURE
+        if self._last_frame_ns is None:
+            self._last_frame_ns = now_ns  # Start the stall clock
+            return None
+        timeout_ns = max(self.stall_timeout_ns, int(4 * expected_interval * NS_PER_SECOND))
+        if now_ns - self._last_frame_ns > timeout_ns:
+            self.stalls += 1
+            return STALL
+        return None
+
+    def backoff_delay(self) -> float:
+        """Seconds to wait before the next reopen attempt"""
+        return min(self.backoff_max, self.backoff_initial * (2 ** self._attempts_in_row))
+
+    def recovery_started(self, reason: str, now_ns: int):
+        self.last_reason = reason
+        if self._outage_started_ns is None:
+            self._outage_started_ns = now_ns
+
+    def attempt_finished(self, success: bool, now_ns: int):
+        """Record the outcome of one reopen attempt"""
+        self.reopen_attempts += 1
+        self._attempts_in_row += 1
+        if not success:
+            self.reopen_failures += 1
+            return
+        self.recoveries += 1
+        self._recovered_ns = now_ns
+        if self._outage_started_ns is not None:
+            self.downtime_ns += now_ns - self._outage_started_ns
+            self._outage_started_ns = None
+        self.rearm()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Stall, failure and recovery counters"""
+        return {
+            'camera_stalls': self.stalls,
+            'camera_read_failures': self.read_failures,
+            'camera_frame_spikes': self.frame_spikes,
+            'camera_recoveries': self.recoveries,
+            'camera_reopen_attempts': self.reopen_attempts,
+            'camera_reopen_failures': self.reopen_failures,
+            'camera_downtime_seconds': round(self.downtime_ns / NS_PER_SECOND, 1),
+            'camera_last_failure': self.last_reason
+        }
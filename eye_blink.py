@@ -2,33 +2,30 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import json
+import argparse
+
+from desktop.tracking.frame_source import open_frame_source
+from desktop.tracking.landmarks import new_eye_buffer, extract_eye_points, eye_aspect_ratios
+from desktop.tracking.blink_detector import BlinkDetector
 
 # Initialize MediaPipe Face Mesh and drawing utils
 mp_face_mesh = mp.solutions.face_mesh
 mp_drawing = mp.solutions.drawing_utils
 
-# Eye landmark indices for left and right eyes (from MediaPipe Face Mesh)
-LEFT_EYE = [33, 160, 158, 133, 153, 144]
-RIGHT_EYE = [362, 385, 387, 263, 373, 380]
-
-def euclidean_dist(pt1, pt2):
-    return np.linalg.norm(np.array(pt1) - np.array(pt2))
-
 def eye_aspect_ratio(eye_landmarks):
-    # Compute the eye aspect ratio (EAR)
-    A = euclidean_dist(eye_landmarks[1], eye_landmarks[5])
-    B = euclidean_dist(eye_landmarks[2], eye_landmarks[4])
-    C = euclidean_dist(eye_landmarks[0], eye_landmarks[3])
-    ear = (A + B) / (2.0 * C)
-    return ear
+    # Compute the eye aspect ratio (EAR) of one eye given its 6 (x, y) points
+    return float(eye_aspect_ratios(np.asarray(eye_landmarks, dtype=np.float32)))
 
-def main():
-    cap = cv2.VideoCapture(0)
+def main(source=0, display=True):
+    # source: camera index, video file / image directory path, "synthetic" or a FrameSource
+    cap = open_frame_source(source)
+    if not cap.open():
+        print(json.dumps({"error": f"Could not open frame source: {cap.name}"}), flush=True)
+        return
     blink_count = 0
-    blink_state = False
-    EAR_THRESH = 0.21  # Threshold for blink detection
-    CONSEC_FRAMES = 2  # Frames required to confirm a blink
-    frame_counter = 0
+    # Threshold 0.21 for blink detection, 2 closed frames required to confirm a blink
+    detector = BlinkDetector(ear_thresh=0.21, consec_frames=2)
+    eye_points = new_eye_buffer()
 
     try:
         with mp_face_mesh.FaceMesh(
@@ -47,33 +44,35 @@ def main():
                 if results.multi_face_landmarks:
                     h, w, _ = frame.shape
                     for face_landmarks in results.multi_face_landmarks:
-                        # Get eye landmarks
-                        left_eye = [(int(face_landmarks.landmark[i].x * w), int(face_landmarks.landmark[i].y * h)) for i in LEFT_EYE]
-                        right_eye = [(int(face_landmarks.landmark[i].x * w), int(face_landmarks.landmark[i].y * h)) for i in RIGHT_EYE]
+                        # Get eye landmarks as a (2, 6, 2) array
+                        eyes = extract_eye_points(face_landmarks.landmark, w, h, out=eye_points)
                         # Draw eyes
-                        for pt in left_eye + right_eye:
-                            cv2.circle(frame, pt, 2, (0,255,0), -1)
-                        # Calculate EAR
-                        left_ear = eye_aspect_ratio(left_eye)
-                        right_ear = eye_aspect_ratio(right_eye)
-                        ear = (left_ear + right_ear) / 2.0
+                        for x, y in eyes.reshape(-1, 2).astype(np.int32):
+                            cv2.circle(frame, (int(x), int(y)), 2, (0,255,0), -1)
+                        # Calculate EAR for both eyes at once
+                        ear = float(eye_aspect_ratios(eyes).mean())
                         # Blink detection logic
-                        if ear < EAR_THRESH:
-                            frame_counter += 1
-                        else:
-                            if frame_counter >= CONSEC_FRAMES:
-                                blink_count += 1
-                            frame_counter = 0
+                        if detector.update(ear):
+                            blink_count += 1
                         # Display blink count
                         cv2.putText(frame, f'Blinks: {blink_count}', (30, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,0,255), 2)
                 # Print blink count as JSON on every frame
                 print(json.dumps({"blink_count": blink_count}), flush=True)
-                cv2.imshow('Eye Blink Counter', frame)
-                if cv2.waitKey(1) & 0xFF == 27:  # ESC to quit
-                    break
+                if display:
+                    cv2.imshow('Eye Blink Counter', frame)
+                    if cv2.waitKey(1) & 0xFF == 27:  # ESC to quit
+                        break
     finally:
         cap.release()
-        cv2.destroyAllWindows()
+        if display:
+            cv2.destroyAllWindows()
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Eye Blink Counter")
+    parser.add_argument('--source', default='0',
+                        help='camera index, video file, image directory or "synthetic[:WxH@FPS]"')
+    parser.add_argument('--realtime', action='store_true',
+                        help='replay files at their recorded frame rate')
+    parser.add_argument('--no-display', action='store_true', help='run without the OpenCV window')
+    args = parser.parse_args()
+    main(open_frame_source(args.source, realtime=args.realtime), display=not args.no_display)
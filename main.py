@@ -41,6 +41,7 @@ class ApplicationManager:
         self.app = None
         self.auth_service = None
         self.current_window = None
+        self.prewarmer = None
         self.logger = logging.getLogger(__name__)
     
     def start(self):
@@ -67,6 +68,9 @@ class ApplicationManager:
             # Initialize authentication service
             self.auth_service = AuthService()
             
+            # Warm up OpenCV/MediaPipe, the face model and the camera while the user signs in
+            self.start_prewarm()
+            
             # Start authentication flow
             self.show_auth_or_main()
             
@@ -78,6 +82,17 @@ class ApplicationManager:
             print(f"Error: {e}")
             sys.exit(1)
     
+    def start_prewarm(self):
+        """Start the background vision pre-warm (imports, model load, camera open)"""
+        try:
+            from desktop.tracking.warmup import VisionPrewarmer
+            self.prewarmer = VisionPrewarmer()
+            self.prewarmer.start()
+            self.app.aboutToQuit.connect(self.prewarmer.close)
+        except Exception as e:
+            self.logger.warning(f"Vision pre-warm not started: {e}")
+            self.prewarmer = None
+    
     def show_auth_or_main(self):
         """Show authentication window or main application based on auth status"""
         # Check if user is already authenticated
@@ -142,7 +157,7 @@ class ApplicationManager:
             self.current_window = None
         
         # Launch main application with user data
-        main_window = MainWindow(user_data)
+        main_window = MainWindow(user_data, prewarmer=self.prewarmer)
         main_window.show()
         
         # Connect logout to restart auth flow
@@ -0,0 +1,60 @@
+"""
+Tests for the blink detector (desktop/tracking/blink_detector.py): the
+vectorized detect() must report exactly the blinks the streaming
+BlinkDetector.update() finds frame by frame.
+"""
+
+import numpy as np
+import pytest
+
+from desktop.tracking.blink_detector import BlinkDetector, detect
+
+
+def _stream_intervals(ear: np.ndarray, ear_thresh: float, consec_frames: int) -> np.ndarray:
+    """(start, end) frame pairs from feeding the trace to BlinkDetector one frame at a time"""
+    detector = BlinkDetector(ear_thresh, consec_frames)
+    intervals = []
+    for index, value in enumerate(ear.tolist()):
+        if detector.update(value, index):
+            start, end, _ = detector.last_blink
+            intervals.append((start, end))
+    return np.array(intervals, dtype=np.int64).reshape(-1, 2)
+
+
+def _random_trace(rng: np.random.Generator, frames: int, nan_fraction: float) -> np.ndarray:
+    """Open-eye EAR with closures of random length, and random no-face (NaN) frames"""
+    ear = rng.normal(0.30, 0.03, frames)
+    for start in rng.integers(0, frames, frames // 20):
+        ear[start:start + rng.integers(1, 6)] = rng.uniform(0.05, 0.22)
+    ear[rng.random(frames) < nan_fraction] = np.nan
+    return ear.astype(np.float32)
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('nan_fraction', [0.0, 0.1, 0.5])
+def test_detect_matches_streaming(seed, nan_fraction):
+    rng = np.random.default_rng(seed)
+    ear = _random_trace(rng, int(rng.integers(1, 2000)), nan_fraction)
+    ear_thresh = float(rng.uniform(0.15, 0.28))
+    consec_frames = int(rng.integers(1, 5))
+
+    runs = detect(ear, ear_thresh=ear_thresh, consec_frames=consec_frames)
+    expected = _stream_intervals(ear, ear_thresh, consec_frames)
+    np.testing.assert_array_equal(runs.intervals, expected)
+    np.testing.assert_array_equal(runs.start_t, runs.start)
+    np.testing.assert_array_equal(runs.end_t, runs.end)
+
+
+@pytest.mark.parametrize('ear', [
+    [],
+    [np.nan] * 5,
+    [0.3, 0.1, 0.1, 0.1],                  # Closure still running at the end
+    [0.1, 0.1, 0.3],                       # Closure from the first frame
+    [0.3, 0.1, np.nan, np.nan, 0.1, 0.3],  # No-face frames inside a closure
+    [0.3, 0.1, 0.3, 0.1, 0.3],             # Single closed frames
+])
+@pytest.mark.parametrize('consec_frames', [1, 2, 3])
+def test_detect_matches_streaming_edge_cases(ear, consec_frames):
+    ear = np.array(ear, dtype=np.float32)
+    runs = detect(ear, ear_thresh=0.21, consec_frames=consec_frames)
+    np.testing.assert_array_equal(runs.intervals, _stream_intervals(ear, 0.21, consec_frames))
@@ -0,0 +1,73 @@
+"""
+Tests for the adaptive EAR threshold (desktop/tracking/calibration.py) and how
+the tracker applies it: opt-in, and followed by the fatigue metrics.
+"""
+
+import numpy as np
+import pytest
+
+from desktop.tracking.calibration import EARCalibrator
+
+
+def _ear_trace(frames: int = 3000, open_ear: float = 0.40, closed_ear: float = 0.08,
+               seed: int = 0) -> np.ndarray:
+    """Open eyes with a 3-frame blink every 100 frames"""
+    rng = np.random.default_rng(seed)
+    ear = rng.normal(open_ear, 0.01, frames)
+    for start in range(50, frames, 100):
+        ear[start:start + 3] = closed_ear
+    return ear
+
+
+def test_calibrator_converges_between_floor_and_baseline():
+    calibrator = EARCalibrator(default_thresh=0.21)
+    for ear in _ear_trace().tolist():
+        calibrator.update(ear)
+
+    assert calibrator.calibrated
+    assert calibrator.baseline == pytest.approx(0.40, abs=0.01)
+    assert calibrator.floor == pytest.approx(0.08, abs=0.01)
+    assert calibrator.threshold == pytest.approx(0.24, abs=0.01)
+
+
+def test_calibrator_keeps_default_without_blinks():
+    calibrator = EARCalibrator(default_thresh=0.21)
+    for ear in np.random.default_rng(0).normal(0.30, 0.005, 3000).tolist():
+        calibrator.update(ear)
+
+    assert not calibrator.calibrated
+    assert calibrator.threshold == 0.21
+
+
+def _feed(tracker, ear: np.ndarray):
+    for k, value in enumerate(ear.tolist()):
+        tracker.last_frame_timestamp_ns = k * 33_333_333
+        tracker._update_blink_state(value)
+
+
+def test_tracker_thresholds_follow_calibration():
+    pytest.importorskip('PyQt6')
+    from desktop.eye_tracker import EyeTracker
+
+    tracker = EyeTracker(adaptive_threshold=True)
+    _feed(tracker, _ear_trace())
+
+    assert tracker.calibrator.calibrated
+    assert tracker.EAR_THRESH == tracker.calibrator.threshold != 0.21
+    assert tracker.blink_detector.ear_thresh == tracker.EAR_THRESH
+    assert tracker.fatigue.closed_ear == tracker.EAR_THRESH
+    assert tracker.fatigue.partial_ear == pytest.approx(tracker.EAR_THRESH + 0.05)
+    assert tracker.blink_count == 30
+
+
+def test_tracker_keeps_tuned_threshold_by_default():
+    pytest.importorskip('PyQt6')
+    from desktop.eye_tracker import EyeTracker
+
+    tracker = EyeTracker(ear_thresh=0.18, consec_frames=3)
+    _feed(tracker, _ear_trace())
+
+    assert tracker.calibrator is None
+    assert tracker.EAR_THRESH == 0.18
+    assert tracker.fatigue.closed_ear == 0.18
+    assert tracker.blink_count == 30
@@ -0,0 +1,138 @@
+"""
+Tests for the camera capability probe (desktop/tracking/camera_probe.py):
+mode ranking, the per-device cache and its invalidation, without a camera.
+"""
+
+import numpy as np
+import pytest
+
+from desktop.tracking import camera_probe
+from desktop.tracking.camera_probe import (CameraMode, CameraModeCache, select_mode,
+                                           parse_v4l2_listing, choose_camera_mode,
+                                           forget_camera_mode)
+
+LISTING = """\
+ioctl: VIDIOC_ENUM_FMT
+\tType: Video Capture
+
+\t[0]: 'MJPG' (Motion-JPEG, compressed)
+\t\tSize: Discrete 1280x720
+\t\t\tInterval: Discrete 0.033s (30.000 fps)
+\t\tSize: Discrete 640x480
+\t\t\tInterval: Discrete 0.033s (30.000 fps)
+\t\t\tInterval: Discrete 0.067s (15.000 fps)
+\t\tSize: Discrete 320x240
+\t\t\tInterval: Discrete 0.033s (30.000 fps)
+\t\tSize: Discrete 640x360
+\t\t\tInterval: Discrete 0.033s (30.000 fps)
+\t[1]: 'YUYV' (YUYV 4:2:2)
+\t\tSize: Discrete 640x480
+\t\t\tInterval: Discrete 0.033s (30.000 fps)
+\t\tSize: Discrete 1280x720
+\t\t\tInterval: Discrete 0.100s (10.000 fps)
+"""
+
+
+class FakeCamera:
+    """Opened-CameraSource stand-in that delivers frames only in the modes it supports"""
+
+    def __init__(self, supported):
+        self.supported = set(supported)
+        self.configured = []
+        self._mode = None
+
+    def configure(self, width, height, fps, fourcc):
+        self.configured.append((width, height, fps, fourcc))
+        self._mode = (width, height, fps, fourcc)
+
+    def read(self):
+        if self._mode not in self.supported:
+            return False, None
+        width, height = self._mode[:2]
+        return True, np.zeros((height, width, 3), dtype=np.uint8)
+
+    def negotiated_mode(self):
+        width, height, fps, fourcc = self._mode
+        return {'width': width, 'height': height, 'fps': fps, 'fourcc': fourcc}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(camera_probe, 'device_key', lambda camera_index: f"{camera_index}:Fake Camera")
+    # No V4L2 device: probing falls back to trial negotiation on the fake source
+    monkeypatch.setattr(camera_probe, 'v4l2_modes', lambda device: [])
+    return CameraModeCache(str(tmp_path / 'camera_modes.json'))
+
+
+def test_parse_v4l2_listing():
+    modes = parse_v4l2_listing(LISTING)
+    assert len(modes) == 7
+    assert modes[0] == CameraMode(1280, 720, 30.0, 'MJPG')
+    assert CameraMode(1280, 720, 10.0, 'YUYV') in modes
+
+
+@pytest.mark.parametrize('target_fps, min_height, expected', [
+    (30.0, 360, CameraMode(640, 360, 30.0, 'MJPG')),   # Fewest pixels first
+    (30.0, 480, CameraMode(640, 480, 30.0, 'MJPG')),   # MJPG over YUYV at equal size and rate
+    (15.0, 480, CameraMode(640, 480, 15.0, 'MJPG')),   # Lowest rate that reaches the target
+    (60.0, 480, CameraMode(640, 480, 30.0, 'MJPG')),   # Nothing reaches 60: fastest of the rest
+    (30.0, 720, CameraMode(1280, 720, 30.0, 'MJPG')),  # YUYV 720p is below the minimum rate
+])
+def test_select_mode_ranking(target_fps, min_height, expected):
+    assert select_mode(parse_v4l2_listing(LISTING), target_fps, min_height=min_height) == expected
+
+
+def test_select_mode_none_usable():
+    assert select_mode(parse_v4l2_listing(LISTING), min_width=1920) is None
+    assert select_mode([]) is None
+
+
+def test_cache_round_trip(tmp_path):
+    cache = CameraModeCache(str(tmp_path / 'modes.json'))
+    modes = parse_v4l2_listing(LISTING)
+    assert cache.get('0:cam') is None
+
+    cache.put('0:cam', modes, complete=True)
+    entry = CameraModeCache(cache.path).get('0:cam')
+    assert entry == {'modes': modes, 'complete': True}
+
+    cache.drop('0:cam')
+    assert cache.get('0:cam') is None
+
+
+def test_choose_camera_mode_probes_once(cache):
+    camera = FakeCamera({(640, 480, 30.0, 'YUYV'), (1280, 720, 30.0, 'MJPG')})
+
+    mode = choose_camera_mode(0, 30.0, source=camera, cache=cache)
+    assert mode == CameraMode(640, 480, 30.0, 'YUYV')
+    assert cache.get('0:Fake Camera') == {'modes': [mode], 'complete': False}
+
+    # Cached: no negotiation, not even a source needed
+    tried = len(camera.configured)
+    assert choose_camera_mode(0, 30.0, source=camera, cache=cache) == mode
+    assert choose_camera_mode(0, 30.0, cache=cache) == mode
+    assert len(camera.configured) == tried
+
+
+def test_forget_camera_mode_reprobes(cache):
+    choose_camera_mode(0, 30.0, source=FakeCamera({(640, 480, 30.0, 'YUYV')}), cache=cache)
+
+    forget_camera_mode(0, cache=cache)
+    assert cache.get('0:Fake Camera') is None
+
+    # A different camera on the same index is probed afresh
+    replacement = FakeCamera({(640, 360, 30.0, 'MJPG')})
+    assert choose_camera_mode(0, 30.0, source=replacement, cache=cache) == CameraMode(640, 360, 30.0, 'MJPG')
+    assert replacement.configured
+    assert cache.get('0:Fake Camera')['modes'] == [CameraMode(640, 360, 30.0, 'MJPG')]
+
+
+def test_camera_defaults_without_auto_mode():
+    from desktop.tracking.frame_source import open_frame_source
+    from desktop.tracking.warmup import VisionPrewarmer
+
+    camera = open_frame_source(0)
+    assert not camera.auto_mode
+    assert (camera.width, camera.height, camera.requested_fps) == (640, 480, 30.0)
+    assert open_frame_source(0, auto_mode=True).auto_mode
+    assert not VisionPrewarmer().auto_camera_mode
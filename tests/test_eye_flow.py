@@ -0,0 +1,86 @@
+"""
+Tests for the skip-frame eye landmark propagation (desktop/tracking/eye_flow.py):
+flow follows the eyes between inferences and hands back to FaceMesh when it must.
+"""
+
+import cv2
+import numpy as np
+
+from desktop.tracking.eye_flow import EyePointFlowTracker
+
+# Left / right eye outlines in frame pixels, as extract_eye_points() returns them
+EYES = np.array([[[250, 200], [260, 195], [270, 195], [280, 200], [270, 205], [260, 205]],
+                 [[360, 200], [370, 195], [380, 195], [390, 200], [380, 205], [370, 205]]],
+                dtype=np.float32)
+
+
+def _texture(seed: int = 0) -> np.ndarray:
+    """Smooth random texture that Lucas-Kanade can lock onto"""
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 256, (480, 640, 3), dtype=np.uint8)
+    return cv2.normalize(cv2.GaussianBlur(noise, (0, 0), 3), None, 0, 255, cv2.NORM_MINMAX)
+
+
+def _shift(frame: np.ndarray, dx: float, dy: float) -> np.ndarray:
+    matrix = np.float32([[1, 0, dx], [0, 1, dy]])
+    return cv2.warpAffine(frame, matrix, (frame.shape[1], frame.shape[0]),
+                          borderMode=cv2.BORDER_REFLECT)
+
+
+def _anchored(frame: np.ndarray, **options) -> EyePointFlowTracker:
+    tracker = EyePointFlowTracker(max_skip=4, **options)
+    tracker.anchor(frame, EYES)
+    tracker.k = 4  # As if the eyes had been still for a while
+    return tracker
+
+
+def test_flow_follows_motion():
+    frame = _texture()
+    tracker = _anchored(frame)
+    assert tracker.flow_due()
+
+    eyes = tracker.track(_shift(frame, 2, 1))
+    assert eyes is not None
+    np.testing.assert_allclose(eyes - EYES, np.broadcast_to([2, 1], EYES.shape), atol=0.1)
+    assert tracker.flow_frames == 1
+    assert tracker.reanchors == 0
+
+
+def test_low_ear_forces_inference():
+    tracker = _anchored(_texture(), ear_guard=0.26)
+
+    tracker.note_ear(0.30)
+    assert tracker.flow_due()
+    assert tracker.guarded == 0
+
+    tracker.note_ear(0.25)
+    assert not tracker.flow_due()
+    assert tracker.guarded == 1
+
+    # Anchoring on fresh landmarks lifts the guard
+    tracker.anchor(_texture(), EYES)
+    assert tracker.flow_due()
+
+
+def test_flow_error_above_max_error_reanchors():
+    frame = _texture()
+    rng = np.random.default_rng(1)
+    noisy = np.clip(frame + rng.normal(0, 20, frame.shape), 0, 255).astype(np.uint8)
+
+    assert _anchored(frame, max_error=12.0).track(noisy) is not None
+
+    tracker = _anchored(frame, max_error=5.0)
+    assert tracker.track(noisy) is None
+    assert tracker.reanchors == 1
+    assert tracker.k == 2
+    assert not tracker.flow_due()
+
+
+def test_point_leaving_crop_reanchors():
+    frame = _texture()
+    # A tight crop: the outer eye corners sit 7 px inside its edges
+    tracker = _anchored(frame, margin=0.05)
+
+    assert tracker.track(_shift(frame, -8, 0)) is None
+    assert tracker.reanchors == 1
+    assert not tracker.flow_due()
@@ -0,0 +1,37 @@
+"""
+Tests for the streaming fatigue metrics (desktop/tracking/fatigue.py): the
+window expires by time even when no frames arrive.
+"""
+
+from desktop.tracking.fatigue import FatigueMetrics, NS_PER_SECOND
+
+FRAME_NS = NS_PER_SECOND // 30
+
+
+def _feed(metrics: FatigueMetrics, seconds: float, ear: float, start_ns: int = 0) -> int:
+    frames = int(seconds * 30)
+    for k in range(frames):
+        metrics.update(ear, start_ns + k * FRAME_NS)
+    return start_ns + frames * FRAME_NS
+
+
+def test_perclos_over_window():
+    metrics = FatigueMetrics(window=60.0)
+    now_ns = _feed(metrics, 30, 0.30)
+    now_ns = _feed(metrics, 30, 0.10, now_ns)
+
+    stats = metrics.get_stats(now_ns)
+    assert stats['perclos_60s'] == 50.0
+    assert stats['perclos_frames_60s'] == 1800
+
+
+def test_window_expires_without_frames():
+    metrics = FatigueMetrics(window=60.0)
+    now_ns = _feed(metrics, 10, 0.10)
+    assert metrics.get_stats(now_ns)['perclos_60s'] == 100.0
+
+    # Face lost: two minutes later nothing from before is left in the window
+    stats = metrics.get_stats(now_ns + 120 * NS_PER_SECOND)
+    assert stats['perclos_60s'] == 0.0
+    assert stats['perclos_frames_60s'] == 0
+    assert stats['eyelid_movements_60s'] == 0
@@ -0,0 +1,69 @@
+"""
+Tests for the face ROI tracker (desktop/tracking/roi.py): the crop holds
+still under landmark noise and moves only when the face nears an edge or
+changes size.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from desktop.tracking.roi import FaceROITracker, FACE_EXTENT_INDICES
+
+FRAME = (640, 480)
+
+
+def _face(cx: float, cy: float, size: float) -> dict:
+    """Face extent landmarks (normalized to the full frame) around a center"""
+    half = size / 2.0
+    points = [(cx, cy - half), (cx, cy + half), (cx - half, cy), (cx + half, cy)]
+    return {index: SimpleNamespace(x=x / FRAME[0], y=y / FRAME[1])
+            for index, (x, y) in zip(FACE_EXTENT_INDICES, points)}
+
+
+def _update(tracker: FaceROITracker, cx: float, cy: float, size: float = 160.0):
+    tracker.update(_face(cx, cy, size), (0, 0), FRAME, FRAME)
+
+
+def test_box_holds_under_noise():
+    tracker = FaceROITracker()
+    _update(tracker, 320, 240)
+    box = tracker.box
+
+    rng = np.random.default_rng(0)
+    for dx, dy, ds in rng.normal(0, [3, 3, 4], (200, 3)):
+        _update(tracker, 320 + dx, 240 + dy, 160 + ds)
+    assert tracker.box == box
+    assert tracker.box_updates == 1
+
+
+def test_box_follows_face_to_edge():
+    tracker = FaceROITracker()
+    _update(tracker, 320, 240)
+    x0, _, x1, _ = tracker.box
+
+    # Face edge within the margin of the box edge: the box re-centers on it
+    _update(tracker, 320 + (x1 - 320 - 80) - 10, 240)
+    assert tracker.box[0] > x0
+    assert tracker.box_updates == 2
+
+
+def test_box_rebuilt_on_size_change():
+    tracker = FaceROITracker()
+    _update(tracker, 320, 240, 120)
+    x0, y0, x1, y1 = tracker.box
+
+    _update(tracker, 320, 240, 90)
+    assert tracker.box[2] - tracker.box[0] < x1 - x0
+    assert tracker.box_updates == 2
+
+
+def test_box_at_frame_border_holds():
+    tracker = FaceROITracker()
+    _update(tracker, 70, 240)
+    assert tracker.box[0] == 0
+    box = tracker.box
+
+    for dx in (-2, 1, -1, 2):
+        _update(tracker, 70 + dx, 240)
+    assert tracker.box == box
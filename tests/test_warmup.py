@@ -0,0 +1,93 @@
+"""
+Tests for the vision pre-warm hand-over (desktop/tracking/warmup.py): a claim
+waits for a warm-up still in progress, and a warm-up that finishes after it
+was cancelled releases what it opened.
+"""
+
+import threading
+
+import cv2
+import pytest
+
+from desktop.tracking import backends, frame_source, warmup
+from desktop.tracking.warmup import VisionPrewarmer
+
+
+class FakeBackend:
+    name = 'facemesh'
+    input_color = cv2.COLOR_BGR2RGB
+
+    def __init__(self, gate: threading.Event):
+        self.gate = gate
+        self.closed = False
+
+    def open(self):
+        return self.gate.wait(5)
+
+    def process(self, image, timestamp_ns):
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCamera:
+    def __init__(self, camera_index, auto_mode=False):
+        self.camera_index = camera_index
+        self.released = False
+
+    def open(self):
+        return True
+
+    def read(self):
+        return False, None
+
+    def release(self):
+        self.released = True
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    gate = threading.Event()
+    created = {}
+
+    def create_backend(name, **options):
+        created['backend'] = FakeBackend(gate)
+        return created['backend']
+
+    def camera_source(camera_index, auto_mode=False):
+        created['camera'] = FakeCamera(camera_index, auto_mode)
+        return created['camera']
+
+    monkeypatch.setattr(warmup, 'WARM_MODULES', ())
+    monkeypatch.setattr(backends, 'create_backend', create_backend)
+    monkeypatch.setattr(frame_source, 'CameraSource', camera_source)
+    return gate, created
+
+
+def test_take_waits_for_warmup(fakes):
+    gate, created = fakes
+    prewarmer = VisionPrewarmer(claim_timeout=5.0)
+    prewarmer.start()
+    threading.Timer(0.2, gate.set).start()
+
+    assert prewarmer.take_backend('facemesh') is created['backend']
+    assert prewarmer.take_camera(0) is created['camera']
+    prewarmer.close()
+    assert not created['backend'].closed
+    assert not created['camera'].released
+
+
+def test_take_timeout_releases_late_results(fakes):
+    gate, created = fakes
+    prewarmer = VisionPrewarmer(claim_timeout=0.1)
+    prewarmer.start()
+
+    assert prewarmer.take_backend('facemesh') is None
+    gate.set()
+    assert prewarmer.wait(5)
+
+    # Cancelled before the model finished: closed, and no camera opened at all
+    assert created['backend'].closed
+    assert 'camera' not in created
+    assert not prewarmer.get_stats()['backend_held']